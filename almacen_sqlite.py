@@ -0,0 +1,173 @@
+#!/bin/python
+
+"""
+================================================================================
+CARGA MASIVA A SQLITE - CASINO POR REGIÓN
+================================================================================
+Carga las transacciones procesadas en una base SQLite local para consultarlas
+con SQL después de cada corrida del ETL (ETLCasino.load_db):
+  - Esquema tipado (INTEGER / REAL / TEXT) derivado del esquema del ETL
+  - executemany por lotes dentro de una única transacción
+  - PRAGMAs de carga masiva (journal en memoria, synchronous=OFF)
+  - Índices creados al final, no mantenidos fila por fila
+  - Modo 'agregar' para corridas incrementales
+================================================================================
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from convertir import ESQUEMA_PROCESADO
+
+logger = logging.getLogger(__name__)
+
+MODOS_CARGA = ('reemplazar', 'agregar')
+
+# Tipo lógico (convertir.py) → afinidad SQLite; timestamps como texto ISO con milisegundos
+# ('YYYY-MM-DD HH:MM:SS.SSS', formato que entienden las funciones de fecha de SQLite), booleanos como 0/1
+TIPOS_SQLITE = {
+    'texto': 'TEXT',
+    'entero': 'INTEGER',
+    'decimal': 'REAL',
+    'timestamp': 'TEXT',
+    'booleano': 'INTEGER',
+}
+
+# Índices para los filtros habituales de los reportes
+INDICES = {
+    'fecha': ['fecha'],
+    'provincia': ['provincia'],
+    'username': ['username'],
+    'tipo_fecha': ['tipo', 'fecha'],
+}
+
+PRAGMAS_CARGA = [
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -262144',  # 256 MB
+]
+
+PRAGMAS_CONSULTA = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+]
+
+
+def tipo_logico(nombre, serie):
+    """Tipo lógico de una columna del DataFrame: esquema del ETL o dtype"""
+    if nombre in ESQUEMA_PROCESADO:
+        return ESQUEMA_PROCESADO[nombre]
+    if pd.api.types.is_bool_dtype(serie):
+        return 'booleano'
+    if pd.api.types.is_integer_dtype(serie):
+        return 'entero'
+    if pd.api.types.is_float_dtype(serie):
+        return 'decimal'
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return 'timestamp'
+    return 'texto'
+
+
+def _columnas_python(lote, esquema):
+    """Columnas del lote como listas de valores nativos para sqlite3 (NaN → None)"""
+    columnas = []
+    for columna, tipo in esquema.items():
+        serie = lote[columna]
+        if tipo == 'timestamp':
+            serie = pd.to_datetime(serie).dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3]
+        elif tipo == 'booleano':
+            serie = serie.astype('boolean').astype('Int64')
+        columnas.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return columnas
+
+
+class AlmacenSQLite:
+    """Carga por lotes de un DataFrame procesado en una tabla SQLite"""
+
+    def __init__(self, db_path='casino.db', tabla='transacciones', tam_lote=50_000):
+        self.db_path = str(db_path)
+        self.tabla = tabla
+        self.tam_lote = tam_lote
+
+    def _columnas_existentes(self, con):
+        return {fila[1] for fila in con.execute(f'PRAGMA table_info("{self.tabla}")')}
+
+    def _preparar_tabla(self, con, esquema, modo):
+        """Crea la tabla (o agrega columnas nuevas en modo 'agregar')"""
+        if modo == 'reemplazar':
+            con.execute(f'DROP TABLE IF EXISTS "{self.tabla}"')
+
+        existentes = self._columnas_existentes(con)
+        if not existentes:
+            columnas = ', '.join(f'"{col}" {TIPOS_SQLITE[tipo]}' for col, tipo in esquema.items())
+            con.execute(f'CREATE TABLE "{self.tabla}" ({columnas})')
+            return 0
+
+        for columna, tipo in esquema.items():
+            if columna not in existentes:
+                logger.info(f"  ℹ Columna nueva en {self.tabla}: {columna}")
+                con.execute(f'ALTER TABLE "{self.tabla}" ADD COLUMN "{columna}" {TIPOS_SQLITE[tipo]}')
+        return con.execute(f'SELECT COUNT(*) FROM "{self.tabla}"').fetchone()[0]
+
+    def _borrar_indices(self, con):
+        for nombre in INDICES:
+            con.execute(f'DROP INDEX IF EXISTS "idx_{self.tabla}_{nombre}"')
+
+    def _crear_indices(self, con, columnas):
+        for nombre, claves in INDICES.items():
+            if set(claves) <= columnas:
+                lista = ', '.join(f'"{c}"' for c in claves)
+                con.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.tabla}_{nombre}" ON "{self.tabla}" ({lista})')
+
+    def cargar(self, df, modo='reemplazar'):
+        """
+        Inserta `df` en la tabla.
+        - 'reemplazar': recrea la tabla
+        - 'agregar': agrega filas (y columnas nuevas) a la tabla existente
+        Los índices se reconstruyen al final cuando el lote es mayor que lo ya cargado;
+        en cargas incrementales chicas se mantienen y SQLite los actualiza al insertar.
+        Devuelve un dict con filas, segundos y filas/s.
+        """
+        if modo not in MODOS_CARGA:
+            raise ValueError(f"Modo no soportado: {modo} (opciones: {', '.join(MODOS_CARGA)})")
+
+        inicio = datetime.now()
+        esquema = {col: tipo_logico(col, df[col]) for col in df.columns}
+        columnas = ', '.join(f'"{col}"' for col in esquema)
+        marcadores = ', '.join('?' for _ in esquema)
+        insert = f'INSERT INTO "{self.tabla}" ({columnas}) VALUES ({marcadores})'
+
+        con = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            for pragma in PRAGMAS_CARGA:
+                con.execute(pragma)
+
+            con.execute('BEGIN')
+            previas = self._preparar_tabla(con, esquema, modo)
+            reconstruir_indices = len(df) >= previas
+            if reconstruir_indices:
+                self._borrar_indices(con)
+
+            for i in range(0, len(df), self.tam_lote):
+                lote = df.iloc[i:i + self.tam_lote]
+                con.executemany(insert, zip(*_columnas_python(lote, esquema)))
+
+            if reconstruir_indices:
+                self._crear_indices(con, self._columnas_existentes(con))
+            con.execute('COMMIT')
+        except Exception:
+            if con.in_transaction:
+                con.execute('ROLLBACK')
+            raise
+        finally:
+            for pragma in PRAGMAS_CONSULTA:
+                con.execute(pragma)
+            con.close()
+
+        tiempo = (datetime.now() - inicio).total_seconds()
+        return {'filas': len(df), 'filas_previas': previas, 'segundos': tiempo,
+                'filas_por_segundo': len(df) / max(tiempo, 1e-9)}
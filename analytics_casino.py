@@ -14,107 +14,300 @@ import numpy as np
 from datetime import datetime
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Claves y agregaciones que pueden resolverse desde el rollup diario (serie_temporal.py)
+CLAVES_TEMPORALES = ('anio_mes', 'hora', 'dia_semana')
+AGREGACIONES_ROLLUP = {('monto', 'count'), ('monto', 'sum'), ('monto', 'mean'), ('es_exitoso', 'sum')}
+
 class AnalyticsCasino:
     """Clase para análisis de datos del casino por región"""
     
-    def __init__(self, csv_path='casino_procesado.csv'):
-        """Carga datos procesados"""
+    # Títulos de impresión de cada reporte
+    TITULOS = {
+        'analisis_por_provincia': "TOP PROVINCIAS - DEPÓSITOS",
+        'usuarios_por_ciudad': "TOP 20 CIUDADES - DEPÓSITOS",
+        'analisis_por_ciudad': "TOP 20 CIUDADES - DEPÓSITOS",
+        'analisis_por_operador': "ANÁLISIS POR OPERADOR TELEFÓNICO",
+        'analisis_por_mes': "EVOLUCIÓN MENSUAL DE DEPÓSITOS",
+        'analisis_por_dia': "TENDENCIA DIARIA DE DEPÓSITOS",
+        'analisis_por_hora': "DEPÓSITOS POR HORA DEL DÍA",
+        'analisis_por_dia_semana': "DEPÓSITOS POR DÍA DE LA SEMANA",
+        'analisis_rangos_monto': "DISTRIBUCIÓN POR RANGO DE MONTO",
+        'usuarios_por_volume': "SEGMENTACIÓN DE USUARIOS POR VOLUMEN DE DEPÓSITO",
+        'estadisticas_montos': "ESTADÍSTICAS DESCRIPTIVAS - MONTOS DE DEPÓSITO",
+        'analisis_calidad': "ANÁLISIS DE CALIDAD Y COBERTURA",
+        'analisis_pobreza': "CORRELACIÓN POBREZA vs DEPÓSITOS",
+        'top_usuarios_por_provincia': "TOP USUARIOS DEPOSITANTES POR PROVINCIA",
+    }
+    
+    # Metadatos de la muestra si los datos vienen de un ETL muestreado (ver crear_analytics)
+    muestra = None
+    
+    def __init__(self, csv_path='casino_procesado.csv', rollup_path=None):
+        """
+        Carga datos procesados (CSV o Parquet según la extensión).
+        Con `rollup_path` los reportes temporales se sirven desde el rollup diario del ETL.
+        """
         logger.info(f"Cargando datos desde {csv_path}")
-        self.df = pd.read_csv(csv_path)
+        if str(csv_path).endswith('.parquet'):
+            self.df = pd.read_parquet(csv_path)
+        else:
+            self.df = pd.read_csv(csv_path)
         self.df['fecha'] = pd.to_datetime(self.df['fecha'])
         logger.info(f"✓ {len(self.df):,} registros cargados")
+        
+        self.rollup = None
+        if rollup_path:
+            self.rollup = pd.read_parquet(rollup_path)
+            logger.info(f"✓ Rollup diario cargado: {len(self.rollup):,} filas")
+    
+    def _encabezado(self, titulo):
+        """Encabezado estándar de los reportes (marcado si los datos son una muestra)"""
+        if self.muestra:
+            titulo += f" [MUESTRA: {self.muestra['filas_muestra']:,} de {self.muestra['filas_leidas']:,} filas]"
+        print("\n" + "="*100)
+        print(titulo)
+        print("="*100)
+    
+    def _imprimir_tabla(self, titulo, resultado):
+        """Imprime un resultado con el encabezado estándar de los reportes"""
+        self._encabezado(titulo)
+        print(resultado)
+    
+    def _imprimir_estadisticas(self, stats):
+        """Imprime las estadísticas descriptivas de montos"""
+        self._encabezado(self.TITULOS['estadisticas_montos'])
+        for key, value in stats.items():
+            print(f"{key:.<40} {value:>50}")
+    
+    def _imprimir_calidad(self, c):
+        """Imprime el resumen de calidad y cobertura"""
+        total_registros = c['total_registros']
+        self._encabezado(self.TITULOS['analisis_calidad'])
+        print(f"Total de registros........................ {total_registros:,}")
+        print(f"Depósitos................................. {c['depositos']:,} ({100*c['depositos']/total_registros:.1f}%)")
+        print(f"Transacciones exitosas................... {c['exitosos']:,} ({100*c['exitosos']/total_registros:.1f}%)")
+        print(f"")
+        print(f"Registros con región identificada........ {c['con_region']:,} ({100*c['con_region']/total_registros:.1f}%)")
+        print(f"Registros sin región (sin match)......... {c['sin_region']:,} ({100*c['sin_region']/total_registros:.1f}%)")
+        print(f"")
+        print(f"Provincias únicas........................ {c['provincias']}")
+        print(f"Ciudades únicas.......................... {c['ciudades']}")
+        print(f"Usuarios únicos.......................... {c['usuarios']}")
+        print(f"Operadores identificados................ {c['operadores']}")
+    
+    def imprimir_resultado(self, metodo, resultado):
+        """Imprime el resultado de un reporte ya calculado con el formato de `metodo`"""
+        if metodo == 'estadisticas_montos':
+            self._imprimir_estadisticas(resultado)
+        elif metodo == 'analisis_calidad':
+            self._imprimir_calidad(resultado)
+        else:
+            self._imprimir_tabla(self.TITULOS[metodo], resultado)
+    
+    # ========================================================================
+    # AGREGACIONES BASE (punto de extensión de los backends, ver analytics_sql.py)
+    # ========================================================================
+    
+    def _agregar_depositos(self, clave, agregaciones):
+        """
+        Agrupa los depósitos por `clave` aplicando `agregaciones` [(columna, función), ...].
+        Devuelve un DataFrame indexado por `clave` con una columna por agregación, en orden.
+        La clave 'anio_mes' se deriva de la fecha (periodo mensual).
+        """
+        if self.rollup is not None and clave in CLAVES_TEMPORALES and set(agregaciones) <= AGREGACIONES_ROLLUP:
+            return self._agregar_desde_rollup(clave, agregaciones)
+        
+        df_dep = self.df[self.df['tipo'] == 'DEPOSIT']
+        if clave == 'anio_mes':
+            df_dep = df_dep.assign(anio_mes=df_dep['fecha'].dt.to_period('M'))
+        
+        return df_dep.groupby(clave).agg(**{
+            f"{columna}_{funcion}": (columna, funcion) for columna, funcion in agregaciones
+        })
+    
+    def _agregar_desde_rollup(self, clave, agregaciones):
+        """Versión de _agregar_depositos para claves temporales, leyendo el rollup diario"""
+        totales = self.serie_temporal().agregar(clave, tipo='DEPOSIT')
+        columnas = {
+            ('monto', 'count'): totales['transacciones'],
+            ('monto', 'sum'): totales['total_ars'],
+            ('monto', 'mean'): totales['total_ars'] / totales['transacciones'],
+            ('es_exitoso', 'sum'): totales['exitosas'],
+        }
+        resultado = pd.DataFrame({f"{columna}_{funcion}": columnas[(columna, funcion)]
+                                  for columna, funcion in agregaciones})
+        if clave in self.df.columns:
+            resultado.index = resultado.index.astype(self.df[clave].dtype)
+        return resultado
+    
+    def serie_temporal(self):
+        """API de series temporales sobre el rollup (o uno construido en memoria desde self.df)"""
+        from serie_temporal import SerieTemporal, construir_rollup
+        
+        if self.rollup is None:
+            self.rollup = construir_rollup(self.df)
+        return SerieTemporal(self.rollup)
+    
+    def _agregar_segmentos(self):
+        """
+        Segmenta usuarios por cuartil de total depositado (BAJO / MEDIO-BAJO / MEDIO-ALTO / ALTO).
+        Devuelve por segmento: cantidad de usuarios, total y promedio por usuario.
+        """
+        usuarios_depositos = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('username').agg({
+            'monto': 'sum'
+        }).reset_index()
+        usuarios_depositos.columns = ['username', 'total_depositado']
+        
+        # Cuartiles
+        q1 = usuarios_depositos['total_depositado'].quantile(0.25)
+        q2 = usuarios_depositos['total_depositado'].quantile(0.50)
+        q3 = usuarios_depositos['total_depositado'].quantile(0.75)
+        
+        def clasificar_usuario(monto):
+            if monto <= q1:
+                return 'BAJO'
+            elif monto <= q2:
+                return 'MEDIO-BAJO'
+            elif monto <= q3:
+                return 'MEDIO-ALTO'
+            else:
+                return 'ALTO'
+        
+        usuarios_depositos['segmento'] = usuarios_depositos['total_depositado'].apply(clasificar_usuario)
+        
+        return usuarios_depositos.groupby('segmento').agg({
+            'username': 'count',
+            'total_depositado': ['sum', 'mean']
+        })
+    
+    def _top_usuarios(self, top_n):
+        """
+        Los `top_n` usuarios con mayor total depositado en cada provincia.
+        Devuelve un DataFrame indexado por (provincia, username) con Transacciones y Total_ARS,
+        ordenado por provincia y total descendente (empates por username).
+        """
+        depositos = self.df[(self.df['tipo'] == 'DEPOSIT') & self.df['provincia'].notna()]
+        por_usuario = depositos.groupby(['provincia', 'username'], observed=True).agg(
+            Transacciones=('monto', 'count'), Total_ARS=('monto', 'sum'))
+        mayores = por_usuario.groupby(level='provincia', group_keys=False)['Total_ARS'].nlargest(top_n)
+        return por_usuario.loc[mayores.index]
+    
+    def _resumen_montos(self):
+        """Estadísticas descriptivas (numéricas) de los montos de depósito"""
+        montos = self.df[self.df['tipo'] == 'DEPOSIT']['monto']
+        return {
+            'cantidad': len(montos),
+            'total': montos.sum(),
+            'promedio': montos.mean(),
+            'mediana': montos.median(),
+            'desv_est': montos.std(),
+            'minimo': montos.min(),
+            'maximo': montos.max(),
+            'p25': montos.quantile(0.25),
+            'p50': montos.quantile(0.50),
+            'p75': montos.quantile(0.75),
+            'p95': montos.quantile(0.95),
+        }
+    
+    def _datos_pobreza(self):
+        """Transacciones con columnas de pobreza para CorrelacionPobreza"""
+        return self.df
+    
+    def cantidad_registros(self):
+        """Cantidad de transacciones disponibles"""
+        return len(self.df)
+    
+    def _resumen_calidad(self):
+        """Conteos de cobertura y calidad sobre todo el dataset"""
+        return {
+            'total_registros': len(self.df),
+            'depositos': len(self.df[self.df['tipo'] == 'DEPOSIT']),
+            'exitosos': int(self.df['es_exitoso'].sum()),
+            'con_region': int(self.df['provincia'].notna().sum()),
+            'sin_region': int(self.df['provincia'].isna().sum()),
+            'provincias': self.df['provincia'].nunique(),
+            'ciudades': self.df['ciudad'].nunique(),
+            'usuarios': self.df['username'].nunique(),
+            'operadores': self.df['operador'].nunique(),
+        }
     
     # ========================================================================
     # ANÁLISIS POR PROVINCIA
     # ========================================================================
     
-    def analisis_por_provincia(self):
+    def analisis_por_provincia(self, mostrar=True):
         """Top provincias por depósitos y monto"""
         logger.info("\n📊 ANÁLISIS POR PROVINCIA")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('provincia').agg({
-            'monto': ['count', 'sum', 'mean', 'min', 'max', 'std'],
-            'es_exitoso': 'sum'
-        }).round(2)
+        resultado = self._agregar_depositos('provincia', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean'), ('monto', 'min'),
+            ('monto', 'max'), ('monto', 'std'), ('es_exitoso', 'sum')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio', 'Mín', 'Máx', 'Desv_Est', 'Exitosas']
         resultado['% Exitoso'] = (resultado['Exitosas'] / resultado['Transacciones'] * 100).round(1)
         resultado = resultado.sort_values('Total_ARS', ascending=False)
         
-        print("\n" + "="*100)
-        print("TOP PROVINCIAS - DEPÓSITOS")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_provincia'], resultado)
         
         return resultado
     
-    def top_usuarios_por_provincia(self, top_n=5):
+    def top_usuarios_por_provincia(self, top_n=5, mostrar=True):
         """Top N usuarios depositantes por provincia"""
         logger.info(f"\n👥 TOP {top_n} USUARIOS POR PROVINCIA")
         
-        print("\n" + "="*100)
-        print(f"TOP {top_n} USUARIOS DEPOSITANTES POR PROVINCIA")
-        print("="*100)
+        resultado = self._top_usuarios(top_n).round(2)
         
-        for provincia in self.df['provincia'].dropna().unique()[:10]:
-            usuarios = self.df[
-                (self.df['provincia'] == provincia) & 
-                (self.df['tipo'] == 'DEPOSIT')
-            ].groupby('username').agg({
-                'monto': ['count', 'sum'],
-                'username': 'count'
-            }).round(2)
-            
-            usuarios.columns = ['Transacciones', 'Total_ARS']
-            usuarios = usuarios.sort_values('Total_ARS', ascending=False).head(top_n)
-            
-            print(f"\n🔹 {provincia}")
-            print(usuarios)
-    
-    def usuarios_por_ciudad(self):
+        if mostrar:
+            self._encabezado(f"TOP {top_n} USUARIOS DEPOSITANTES POR PROVINCIA")
+            for provincia, usuarios in resultado.groupby(level='provincia', sort=False):
+                print(f"\n🔹 {provincia}")
+                print(usuarios.droplevel('provincia'))
+        
+        return resultado
+    
+    def usuarios_por_ciudad(self, mostrar=True):
         """Distribución de usuarios por ciudad"""
         logger.info("\n🏙️ DISTRIBUCIÓN POR CIUDAD")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('ciudad').agg({
-            'username': 'nunique',
-            'monto': ['count', 'sum', 'mean']
-        }).round(2)
+        resultado = self._agregar_depositos('ciudad', [
+            ('username', 'nunique'), ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean')
+        ]).round(2)
         
         resultado.columns = ['Usuarios_Unicos', 'Transacciones', 'Total_ARS', 'Promedio']
         resultado = resultado.sort_values('Total_ARS', ascending=False).head(20)
         
-        print("\n" + "="*100)
-        print("TOP 20 CIUDADES - DEPÓSITOS")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['usuarios_por_ciudad'], resultado)
         
         return resultado
     
+    def analisis_por_ciudad(self, mostrar=True):
+        """Top ciudades por depósitos (hoja 'Top Ciudades' de los reportes)"""
+        return self.usuarios_por_ciudad(mostrar=mostrar)
+    
     # ========================================================================
     # ANÁLISIS POR OPERADOR
     # ========================================================================
     
-    def analisis_por_operador(self):
+    def analisis_por_operador(self, mostrar=True):
         """Análisis de depósitos por operador telefónico"""
         logger.info("\n📱 ANÁLISIS POR OPERADOR")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('operador').agg({
-            'monto': ['count', 'sum', 'mean'],
-            'username': 'nunique',
-            'es_exitoso': 'sum'
-        }).round(2)
+        resultado = self._agregar_depositos('operador', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean'),
+            ('username', 'nunique'), ('es_exitoso', 'sum')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio', 'Usuarios_Unicos', 'Exitosas']
         resultado['% Exitoso'] = (resultado['Exitosas'] / resultado['Transacciones'] * 100).round(1)
         resultado = resultado.sort_values('Total_ARS', ascending=False)
         
-        print("\n" + "="*100)
-        print("ANÁLISIS POR OPERADOR TELEFÓNICO")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_operador'], resultado)
         
         return resultado
     
@@ -122,54 +315,60 @@ class AnalyticsCasino:
     # ANÁLISIS TEMPORAL
     # ========================================================================
     
-    def analisis_por_mes(self):
+    def analisis_por_mes(self, mostrar=True):
         """Evolución mensual de depósitos"""
         logger.info("\n📅 ANÁLISIS TEMPORAL MENSUAL")
         
-        df_dep = self.df[self.df['tipo'] == 'DEPOSIT'].copy()
-        df_dep['anio_mes'] = df_dep['fecha'].dt.to_period('M')
-        
-        resultado = df_dep.groupby('anio_mes').agg({
-            'monto': ['count', 'sum', 'mean'],
-            'es_exitoso': 'sum'
-        }).round(2)
+        resultado = self._agregar_depositos('anio_mes', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean'), ('es_exitoso', 'sum')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio', 'Exitosas']
         resultado['% Exitoso'] = (resultado['Exitosas'] / resultado['Transacciones'] * 100).round(1)
         
-        print("\n" + "="*100)
-        print("EVOLUCIÓN MENSUAL DE DEPÓSITOS")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_mes'], resultado)
+        
+        return resultado
+    
+    def analisis_por_dia(self, ultimos_dias=30, mostrar=True):
+        """Tendencia diaria de depósitos con media móvil de 7 días"""
+        logger.info("\n📈 TENDENCIA DIARIA")
+        
+        serie = self.serie_temporal()
+        resultado = serie.serie('D', tipo='DEPOSIT')[['Transacciones', 'Total_ARS', 'Promedio']]
+        resultado['Media_Movil_7'] = resultado['Total_ARS'].rolling(7, min_periods=1).mean().round(2)
+        resultado = resultado.tail(ultimos_dias)
+        
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_dia'], resultado)
         
         return resultado
     
-    def analisis_por_hora(self):
+    def analisis_por_hora(self, mostrar=True):
         """Distribución de depósitos por hora del día"""
         logger.info("\n⏰ ANÁLISIS POR HORA DEL DÍA")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('hora').agg({
-            'monto': ['count', 'sum', 'mean']
-        }).round(2)
+        resultado = self._agregar_depositos('hora', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio']
         resultado['Hora'] = [f"{h:02d}:00" for h in resultado.index]
         resultado = resultado.sort_values('Transacciones', ascending=False)
         
-        print("\n" + "="*100)
-        print("DEPÓSITOS POR HORA DEL DÍA")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_hora'], resultado)
         
         return resultado
     
-    def analisis_por_dia_semana(self):
+    def analisis_por_dia_semana(self, mostrar=True):
         """Depósitos por día de la semana"""
         logger.info("\n📆 ANÁLISIS POR DÍA DE LA SEMANA")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('dia_semana').agg({
-            'monto': ['count', 'sum', 'mean']
-        }).round(2)
+        resultado = self._agregar_depositos('dia_semana', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio']
         
@@ -181,10 +380,8 @@ class AnalyticsCasino:
         resultado.index = [traducciones.get(dia, dia) for dia in resultado.index]
         resultado = resultado.reindex([traducciones[dia] for dia in orden_dias if traducciones[dia] in resultado.index])
         
-        print("\n" + "="*100)
-        print("DEPÓSITOS POR DÍA DE LA SEMANA")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_por_dia_semana'], resultado)
         
         return resultado
     
@@ -192,120 +389,95 @@ class AnalyticsCasino:
     # ANÁLISIS DE MONTOS
     # ========================================================================
     
-    def analisis_rangos_monto(self):
+    def analisis_rangos_monto(self, mostrar=True):
         """Distribución por rango de monto"""
         logger.info("\n💰 ANÁLISIS DE RANGOS DE MONTO")
         
-        resultado = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('rango_monto').agg({
-            'monto': ['count', 'sum', 'mean', 'min', 'max']
-        }).round(2)
+        resultado = self._agregar_depositos('rango_monto', [
+            ('monto', 'count'), ('monto', 'sum'), ('monto', 'mean'), ('monto', 'min'), ('monto', 'max')
+        ]).round(2)
         
         resultado.columns = ['Transacciones', 'Total_ARS', 'Promedio', 'Mínimo', 'Máximo']
         resultado['% del Total'] = (resultado['Total_ARS'] / resultado['Total_ARS'].sum() * 100).round(1)
         
-        print("\n" + "="*100)
-        print("DISTRIBUCIÓN POR RANGO DE MONTO")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_rangos_monto'], resultado)
         
         return resultado
     
-    def estadisticas_montos(self):
+    def estadisticas_montos(self, mostrar=True):
         """Estadísticas descriptivas de montos"""
         logger.info("\n📊 ESTADÍSTICAS DESCRIPTIVAS DE MONTOS")
         
-        montos = self.df[self.df['tipo'] == 'DEPOSIT']['monto']
+        m = self._resumen_montos()
         
         stats = {
-            'Cantidad Transacciones': len(montos),
-            'Monto Total (ARS)': f"${montos.sum():,.2f}",
-            'Promedio': f"${montos.mean():,.2f}",
-            'Mediana': f"${montos.median():,.2f}",
-            'Desviación Estándar': f"${montos.std():,.2f}",
-            'Mínimo': f"${montos.min():,.2f}",
-            'Máximo': f"${montos.max():,.2f}",
-            'P25': f"${montos.quantile(0.25):,.2f}",
-            'P50': f"${montos.quantile(0.50):,.2f}",
-            'P75': f"${montos.quantile(0.75):,.2f}",
-            'P95': f"${montos.quantile(0.95):,.2f}",
+            'Cantidad Transacciones': m['cantidad'],
+            'Monto Total (ARS)': f"${m['total']:,.2f}",
+            'Promedio': f"${m['promedio']:,.2f}",
+            'Mediana': f"${m['mediana']:,.2f}",
+            'Desviación Estándar': f"${m['desv_est']:,.2f}",
+            'Mínimo': f"${m['minimo']:,.2f}",
+            'Máximo': f"${m['maximo']:,.2f}",
+            'P25': f"${m['p25']:,.2f}",
+            'P50': f"${m['p50']:,.2f}",
+            'P75': f"${m['p75']:,.2f}",
+            'P95': f"${m['p95']:,.2f}",
         }
         
-        print("\n" + "="*100)
-        print("ESTADÍSTICAS DESCRIPTIVAS - MONTOS DE DEPÓSITO")
-        print("="*100)
-        for key, value in stats.items():
-            print(f"{key:.<40} {value:>50}")
+        if mostrar:
+            self.imprimir_resultado('estadisticas_montos', stats)
         
         return stats
     
+    # ========================================================================
+    # ANÁLISIS DE POBREZA
+    # ========================================================================
+    
+    def analisis_pobreza(self, nivel='provincia', n_bootstrap=5000, json_pobreza_path=None, mostrar=True):
+        """
+        Correlación entre índice de pobreza y depósitos per cápita (Pearson/Spearman
+        con IC bootstrap), agregando por provincia, aglomerado o ciudad (ver correlacion_pobreza.py)
+        """
+        from correlacion_pobreza import CorrelacionPobreza
+        
+        logger.info(f"\n📉 CORRELACIÓN POBREZA vs DEPÓSITOS (nivel={nivel})")
+        
+        resultado = CorrelacionPobreza(self._datos_pobreza(), json_pobreza_path=json_pobreza_path,
+                                       n_bootstrap=n_bootstrap).correlaciones(nivel)
+        
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['analisis_pobreza'], resultado)
+        
+        return resultado
+    
     # ========================================================================
     # ANÁLISIS DE CALIDAD
     # ========================================================================
     
-    def analisis_calidad(self):
+    def analisis_calidad(self, mostrar=True):
         """Análisis de calidad de datos y tasas de éxito"""
         logger.info("\n✅ ANÁLISIS DE CALIDAD Y TASAS DE ÉXITO")
         
-        total_registros = len(self.df)
-        depositos = len(self.df[self.df['tipo'] == 'DEPOSIT'])
-        exitosos = self.df['es_exitoso'].sum()
-        con_region = self.df['provincia'].notna().sum()
-        sin_region = self.df['provincia'].isna().sum()
+        calidad = self._resumen_calidad()
         
-        print("\n" + "="*100)
-        print("ANÁLISIS DE CALIDAD Y COBERTURA")
-        print("="*100)
-        print(f"Total de registros........................ {total_registros:,}")
-        print(f"Depósitos................................. {depositos:,} ({100*depositos/total_registros:.1f}%)")
-        print(f"Transacciones exitosas................... {exitosos:,} ({100*exitosos/total_registros:.1f}%)")
-        print(f"")
-        print(f"Registros con región identificada........ {con_region:,} ({100*con_region/total_registros:.1f}%)")
-        print(f"Registros sin región (sin match)......... {sin_region:,} ({100*sin_region/total_registros:.1f}%)")
-        print(f"")
-        print(f"Provincias únicas........................ {self.df['provincia'].nunique()}")
-        print(f"Ciudades únicas.......................... {self.df['ciudad'].nunique()}")
-        print(f"Usuarios únicos.......................... {self.df['username'].nunique()}")
-        print(f"Operadores identificados................ {self.df['operador'].nunique()}")
+        if mostrar:
+            self.imprimir_resultado('analisis_calidad', calidad)
+        
+        return calidad
     
-    def usuarios_por_volume(self):
+    def usuarios_por_volume(self, mostrar=True):
         """Segmentación de usuarios por volumen de depósito"""
         logger.info("\n📈 SEGMENTACIÓN DE USUARIOS POR VOLUMEN")
         
-        usuarios_depositos = self.df[self.df['tipo'] == 'DEPOSIT'].groupby('username').agg({
-            'monto': 'sum'
-        }).reset_index()
-        usuarios_depositos.columns = ['username', 'total_depositado']
-        
-        # Cuartiles
-        q1 = usuarios_depositos['total_depositado'].quantile(0.25)
-        q2 = usuarios_depositos['total_depositado'].quantile(0.50)
-        q3 = usuarios_depositos['total_depositado'].quantile(0.75)
-        
-        def clasificar_usuario(monto):
-            if monto <= q1:
-                return 'BAJO'
-            elif monto <= q2:
-                return 'MEDIO-BAJO'
-            elif monto <= q3:
-                return 'MEDIO-ALTO'
-            else:
-                return 'ALTO'
-        
-        usuarios_depositos['segmento'] = usuarios_depositos['total_depositado'].apply(clasificar_usuario)
-        
-        resultado = usuarios_depositos.groupby('segmento').agg({
-            'username': 'count',
-            'total_depositado': ['sum', 'mean']
-        }).round(2)
+        resultado = self._agregar_segmentos().round(2)
         
         resultado.columns = ['Cantidad_Usuarios', 'Total_ARS', 'Promedio_Usuario']
         resultado['% Usuarios'] = (resultado['Cantidad_Usuarios'] / resultado['Cantidad_Usuarios'].sum() * 100).round(1)
         resultado['% Monto'] = (resultado['Total_ARS'] / resultado['Total_ARS'].sum() * 100).round(1)
         
-        print("\n" + "="*100)
-        print("SEGMENTACIÓN DE USUARIOS POR VOLUMEN DE DEPÓSITO")
-        print("="*100)
-        print(resultado)
+        if mostrar:
+            self._imprimir_tabla(self.TITULOS['usuarios_por_volume'], resultado)
         
         return resultado
     
@@ -313,87 +485,107 @@ class AnalyticsCasino:
     # REPORTE EJECUTIVO
     # ========================================================================
     
-    def generar_reporte_ejecutivo(self):
-        """Genera reporte ejecutivo completo"""
+    # Secciones del reporte ejecutivo, en orden de impresión
+    SECCIONES_EJECUTIVAS = [
+        'estadisticas_montos',      # 1. Estadísticas generales
+        'analisis_calidad',         # 2. Análisis de calidad
+        'analisis_por_provincia',   # 3. Provincias
+        'analisis_por_operador',    # 4. Operadores
+        'analisis_por_dia_semana',  # 5. Temporal
+        'analisis_rangos_monto',    # 6. Montos
+        'usuarios_por_volume',      # 7. Segmentación
+    ]
+    
+    def generar_reporte_ejecutivo(self, max_workers=None, modo='thread'):
+        """
+        Genera reporte ejecutivo completo.
+        Las secciones son independientes: se calculan en paralelo (`modo` 'thread'
+        o 'process', `max_workers` configurable) y se imprimen en orden fijo.
+        """
+        from ejecutor_reportes import EjecutorReportes
+        
         logger.info("\n" + "="*100)
         logger.info("GENERANDO REPORTE EJECUTIVO")
         logger.info("="*100)
         
+        resultados = EjecutorReportes(self, max_workers=max_workers, modo=modo).ejecutar(self.SECCIONES_EJECUTIVAS)
+        
         print("\n\n")
         print("╔" + "="*98 + "╗")
         print("║" + " "*30 + "REPORTE EJECUTIVO - CASINO POR REGIÓN" + " "*30 + "║")
         print("║" + " "*98 + "║")
         print("║" + f" Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}".ljust(99) + "║")
+        if self.muestra:
+            print("║" + f" MUESTRA ESTRATIFICADA: {self.muestra['filas_muestra']:,} de {self.muestra['filas_leidas']:,} filas "
+                        f"({self.muestra['estratos']} estratos). Totales sin expandir: ver peso_muestra".ljust(99) + "║")
         print("╚" + "="*98 + "╝")
         
-        # 1. Estadísticas generales
-        self.estadisticas_montos()
-        
-        # 2. Análisis de calidad
-        self.analisis_calidad()
-        
-        # 3. Provincias
-        self.analisis_por_provincia()
-        
-        # 4. Operadores
-        self.analisis_por_operador()
-        
-        # 5. Temporal
-        self.analisis_por_dia_semana()
-        
-        # 6. Montos
-        self.analisis_rangos_monto()
-        
-        # 7. Segmentación
-        self.usuarios_por_volume()
+        for metodo, resultado in resultados.items():
+            self.imprimir_resultado(metodo, resultado)
         
         print("\n" + "="*100)
         print("FIN DEL REPORTE")
         print("="*100 + "\n")
+        
+        return resultados
+
+# ================================================================================
+# BACKENDS
+# ================================================================================
+
+BACKENDS = ('pandas', 'duckdb', 'estrella')
+
+def crear_analytics(ruta, backend='pandas', **opciones):
+    """
+    Crea el analizador con el backend indicado:
+    - 'pandas': carga el dataset completo en memoria (CSV o Parquet); acepta rollup_path
+    - 'duckdb': SQL embebido sobre el Parquet, sin cargarlo (ver analytics_sql.py)
+    - 'estrella': fact_deposito + dimensiones del ETL; `ruta` es el directorio (ver analytics_estrella.py)
+    Si `ruta` es salida de un ETL muestreado (muestra.json al lado) los reportes lo indican.
+    """
+    from muestreo import leer_muestra
+
+    if backend == 'pandas':
+        analytics = AnalyticsCasino(ruta, **opciones)
+    elif backend == 'duckdb':
+        from analytics_sql import AnalyticsCasinoSQL
+        analytics = AnalyticsCasinoSQL(ruta, **opciones)
+    elif backend == 'estrella':
+        from analytics_estrella import AnalyticsCasinoEstrella
+        analytics = AnalyticsCasinoEstrella(ruta, **opciones)
+    else:
+        raise ValueError(f"Backend no soportado: {backend} (opciones: {', '.join(BACKENDS)})")
+
+    analytics.muestra = leer_muestra(ruta)
+    if analytics.muestra:
+        logger.warning(f"⚠ Datos muestreados: {analytics.muestra['filas_muestra']:,} de "
+                       f"{analytics.muestra['filas_leidas']:,} filas (muestra estratificada)")
+    return analytics
 
 # ================================================================================
 # EXPORTAR REPORTES A EXCEL
 # ================================================================================
 
-def exportar_reportes_excel(csv_path='./datos_salida/casino_procesado.csv', output_path='./datos_salida/casino_reportes.xlsx'):
-    """Exporta múltiples análisis a un archivo Excel con múltiples sheets"""
-    try:
-        import openpyxl
-        from openpyxl.styles import Font, PatternFill, Alignment
-    except ImportError:
-        logger.warning("openpyxl no instalado. Instala con: pip install openpyxl")
-        return
-    
-    analytics = AnalyticsCasino(csv_path)
-    
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        logger.info(f"Exportando reportes a {output_path}")
-        
-        analytics.analisis_por_provincia().to_excel(writer, sheet_name='Por Provincia')
-        analytics.analisis_por_operador().to_excel(writer, sheet_name='Por Operador')
-        analytics.analisis_por_mes().to_excel(writer, sheet_name='Temporal Mensual')
-        analytics.analisis_por_hora().to_excel(writer, sheet_name='Por Hora')
-        analytics.analisis_rangos_monto().to_excel(writer, sheet_name='Rangos Monto')
-        analytics.usuarios_por_volume().to_excel(writer, sheet_name='Segmentación Usuarios')
-        analytics.analisis_por_ciudad().to_excel(writer, sheet_name='Top Ciudades')
-        
-    logger.info(f"✓ Reportes exportados a {output_path}")
+def exportar_reportes_excel(csv_path='./datos_salida/casino_procesado.csv', output_path='./datos_salida/casino_reportes.xlsx',
+                            analytics=None):
+    """
+    Exporta múltiples análisis a un archivo Excel con múltiples sheets.
+    Si se pasa `analytics` reutiliza esa instancia en lugar de recargar el CSV.
+    """
+    from exportar_reportes import exportar_excel
+    
+    if analytics is None:
+        analytics = AnalyticsCasino(csv_path)
+    
+    return exportar_excel(analytics, output_path)
 
 # ================================================================================
 # EJECUCIÓN
 # ================================================================================
 
 if __name__ == "__main__":
-    # Crear instancia de analytics
-    analytics = AnalyticsCasino('./datos_salida/casino_procesado.csv')
-    
-    # Generar reporte ejecutivo completo
-    analytics.generar_reporte_ejecutivo()
-    
-    # Exportar a Excel (opcional)
-    try:
-        exportar_reportes_excel()
-    except Exception as e:
-        logger.warning(f"No se pudo exportar a Excel: {e}")
-    
-    logger.info("\n✅ ANÁLISIS COMPLETADO")
\ No newline at end of file
+    # Reporte ejecutivo + Excel; rutas por argumento: python analytics_casino.py --help (ver casino.py)
+    import sys
+    from casino import main
+
+    sys.exit(main(['report', '--excel', './datos_salida/casino_reportes.xlsx'] + sys.argv[1:]))
@@ -0,0 +1,120 @@
+#!/bin/python
+
+"""
+================================================================================
+ANALÍTICAS CASINO - BACKEND ESQUEMA ESTRELLA
+================================================================================
+Ejecuta los reportes de AnalyticsCasino sobre fact_deposito + dimensiones
+(esquema_estrella.py). Cada reporte arma una vista angosta con solo las
+columnas que usa: las medidas salen de la fact y cada atributo de su
+dimensión, indexando por la clave subrogada. Las dimensiones que un reporte
+no necesita no se tocan.
+================================================================================
+"""
+
+import logging
+from types import SimpleNamespace
+
+import pandas as pd
+
+from analytics_casino import AnalyticsCasino
+from esquema_estrella import DIMENSIONES, cargar_estrella
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsCasinoEstrella(AnalyticsCasino):
+    """Backend de AnalyticsCasino sobre el esquema estrella en Parquet"""
+
+    def __init__(self, directorio='./datos_salida/estrella'):
+        logger.info(f"Cargando esquema estrella desde {directorio}")
+        tablas = cargar_estrella(directorio)
+        if 'fact_deposito' not in tablas:
+            raise FileNotFoundError(f"No hay fact_deposito.parquet en {directorio}")
+
+        self.df = None
+        self.rollup = None
+        self.directorio = directorio
+        self.fact = tablas.pop('fact_deposito')
+        self.dimensiones = tablas
+
+        # Columna → dimensión que la provee (la primera que la declara)
+        self._origen = {}
+        for nombre, (clave, _) in DIMENSIONES.items():
+            if nombre in self.dimensiones:
+                for columna in self.dimensiones[nombre].columns:
+                    self._origen.setdefault(columna, (nombre, clave))
+
+        logger.info(f"✓ {len(self.fact):,} registros en fact_deposito, "
+                    f"{len(self.dimensiones)} dimensiones ({', '.join(self.dimensiones)})")
+
+    # ========================================================================
+    # VISTAS
+    # ========================================================================
+
+    def _columna(self, nombre, filas):
+        """Valores de `nombre` para las filas `filas` de la fact (medida, atributo o fecha)"""
+        if nombre in self.fact.columns:
+            return self.fact[nombre].to_numpy()[filas]
+        if nombre == 'fecha':
+            fecha_hora = self._columna('fecha_hora', filas)
+            return fecha_hora + pd.to_timedelta(self.fact['milisegundo'].to_numpy()[filas], unit='ms')
+        if nombre == 'anio_mes':
+            return pd.PeriodIndex(self._columna('fecha_hora', filas), freq='M')
+        if nombre not in self._origen:
+            raise KeyError(f"Columna no disponible en el esquema estrella: {nombre}")
+
+        dimension, clave = self._origen[nombre]
+        valores = self.dimensiones[dimension][nombre]
+        return valores.take(self.fact[clave].to_numpy()[filas]).to_numpy()
+
+    def _vista(self, columnas, solo_depositos=False):
+        """DataFrame angosto con `columnas`, uniendo solo las dimensiones necesarias"""
+        filas = slice(None)
+        if solo_depositos:
+            filas = (self._columna('tipo', slice(None)) == 'DEPOSIT').nonzero()[0]
+        datos = {col: self._columna(col, filas) for col in dict.fromkeys(columnas)}
+        return pd.DataFrame(datos)
+
+    def _sobre_vista(self, metodo, columnas, **kwargs):
+        """Ejecuta la implementación pandas de `metodo` sobre una vista con `columnas`"""
+        return getattr(AnalyticsCasino, metodo)(SimpleNamespace(df=self._vista(columnas)), **kwargs)
+
+    def cantidad_registros(self):
+        return len(self.fact)
+
+    # ========================================================================
+    # AGREGACIONES BASE
+    # ========================================================================
+
+    def _agregar_depositos(self, clave, agregaciones):
+        """Equivalente de AnalyticsCasino._agregar_depositos uniendo solo la dimensión de `clave`"""
+        columnas = [clave] + [columna for columna, _ in agregaciones]
+        return self._vista(columnas, solo_depositos=True).groupby(clave).agg(**{
+            f"{columna}_{funcion}": (columna, funcion) for columna, funcion in agregaciones
+        })
+
+    def _agregar_segmentos(self):
+        return self._sobre_vista('_agregar_segmentos', ['tipo', 'username', 'monto'])
+
+    def _resumen_montos(self):
+        return self._sobre_vista('_resumen_montos', ['tipo', 'monto'])
+
+    def _resumen_calidad(self):
+        return self._sobre_vista('_resumen_calidad', ['tipo', 'es_exitoso', 'provincia', 'ciudad',
+                                                      'username', 'operador'])
+
+    def serie_temporal(self):
+        """API de series temporales sobre un rollup construido desde la fact"""
+        from serie_temporal import SerieTemporal, construir_rollup
+
+        if self.rollup is None:
+            self.rollup = construir_rollup(self._vista(['fecha', 'hora', 'provincia', 'tipo', 'monto', 'es_exitoso']))
+        return SerieTemporal(self.rollup)
+
+    def _datos_pobreza(self):
+        columnas = ['tipo', 'monto', 'username', 'ciudad_pobreza'] + DIMENSIONES['dim_pobreza'][1]
+        return self._vista([c for c in columnas if c in self._origen or c in self.fact.columns])
+
+    def _top_usuarios(self, top_n):
+        return self._sobre_vista('_top_usuarios', ['tipo', 'provincia', 'username', 'monto'], top_n=top_n)
@@ -0,0 +1,256 @@
+#!/bin/python
+
+"""
+================================================================================
+ANALÍTICAS CASINO - BACKEND SQL EMBEBIDO (DuckDB)
+================================================================================
+Ejecuta los mismos reportes de AnalyticsCasino como SQL sobre el Parquet que
+genera el ETL, con un motor columnar embebido (sin servidor):
+  - Escaneo multithread y predicate pushdown sobre el Parquet
+  - Spill a disco cuando una agregación no entra en memoria
+  - Acepta un archivo, una lista o un glob ('historico/*.parquet')
+Los resultados son idénticos a los del backend pandas: el SQL reemplaza solo
+las agregaciones base; el post-procesamiento y la impresión son compartidos.
+================================================================================
+"""
+
+import logging
+
+import pandas as pd
+
+from analytics_casino import AnalyticsCasino
+
+logger = logging.getLogger(__name__)
+
+# Función de agregación de pandas → expresión SQL
+FUNCIONES_SQL = {
+    'count': 'COUNT({col})',
+    'sum': 'SUM({col})',
+    'mean': 'AVG({col})',
+    'min': 'MIN({col})',
+    'max': 'MAX({col})',
+    'std': 'STDDEV_SAMP({col})',
+    'nunique': 'COUNT(DISTINCT {col})',
+}
+
+TIPOS_ENTEROS = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT')
+
+
+class AnalyticsCasinoSQL(AnalyticsCasino):
+    """Backend de AnalyticsCasino que consulta el Parquet con DuckDB sin cargarlo en memoria"""
+
+    def __init__(self, parquet_path='casino_procesado.parquet', threads=None, memory_limit=None,
+                 temp_directory=None):
+        """
+        Registra el Parquet como vista `transacciones`.
+        - threads: hilos de escaneo (por defecto, todos los núcleos)
+        - memory_limit: p. ej. '4GB'; al superarlo DuckDB hace spill a disco
+        - temp_directory: directorio de spill
+        """
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            logger.error("✗ duckdb no instalado. Instala con: pip install duckdb")
+            raise
+
+        self.df = None
+        self.rollup = None
+        self.parquet_path = parquet_path
+        self.config = {'preserve_insertion_order': False}
+        if threads:
+            self.config['threads'] = threads
+        if memory_limit:
+            self.config['memory_limit'] = memory_limit
+        if temp_directory:
+            self.config['temp_directory'] = str(temp_directory)
+
+        self._con = None
+        self._tipos = None
+        logger.info(f"Consultando datos desde {parquet_path} (backend duckdb)")
+        logger.info(f"✓ {self._consultar('SELECT COUNT(*) AS n FROM transacciones')['n'].iloc[0]:,} registros disponibles")
+
+    # ========================================================================
+    # CONEXIÓN
+    # ========================================================================
+
+    def __getstate__(self):
+        # La conexión no se puede serializar (EjecutorReportes en modo 'process')
+        estado = self.__dict__.copy()
+        estado['_con'] = None
+        return estado
+
+    @property
+    def con(self):
+        if self._con is None:
+            import duckdb
+
+            self._con = duckdb.connect(database=':memory:', config=self.config)
+            rutas = self.parquet_path if isinstance(self.parquet_path, (list, tuple)) else [self.parquet_path]
+            lista = ', '.join("'" + str(r).replace("'", "''") + "'" for r in rutas)
+            self._con.execute(f"CREATE VIEW transacciones AS SELECT * FROM read_parquet([{lista}])")
+        return self._con
+
+    def _consultar(self, sql, params=None):
+        """Ejecuta una consulta en un cursor propio (seguro entre threads) y devuelve un DataFrame"""
+        cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    @property
+    def tipos(self):
+        """Tipo SQL de cada columna del Parquet"""
+        if self._tipos is None:
+            esquema = self._consultar('DESCRIBE SELECT * FROM transacciones')
+            self._tipos = dict(zip(esquema['column_name'], esquema['column_type']))
+        return self._tipos
+
+    def _suma(self, columna, origen=None):
+        """
+        SUM que conserva el tipo entero de pandas (DuckDB suma enteros como HUGEINT).
+        `origen` es la columna del Parquet que define el tipo, si `columna` es derivada.
+        """
+        if self.tipos.get(origen or columna) in TIPOS_ENTEROS:
+            return f"CAST(SUM({columna}) AS BIGINT)"
+        return f"SUM({columna})"
+
+    # ========================================================================
+    # AGREGACIONES BASE
+    # ========================================================================
+
+    def _agregar_depositos(self, clave, agregaciones):
+        """Equivalente SQL de AnalyticsCasino._agregar_depositos"""
+        if clave == 'anio_mes':
+            expr_clave = "strftime(CAST(fecha AS TIMESTAMP), '%Y-%m')"
+        else:
+            expr_clave = clave
+
+        columnas = []
+        for i, (columna, funcion) in enumerate(agregaciones):
+            expr = self._suma(columna) if funcion == 'sum' else FUNCIONES_SQL[funcion].format(col=columna)
+            columnas.append(f"{expr} AS c{i}")
+
+        resultado = self._consultar(f"""
+            SELECT {expr_clave} AS {clave}, {', '.join(columnas)}
+            FROM transacciones
+            WHERE tipo = 'DEPOSIT' AND {expr_clave} IS NOT NULL
+            GROUP BY 1
+            ORDER BY 1
+        """)
+
+        tipo_clave = resultado[clave].dtype
+        resultado = resultado.set_index(clave)
+        if clave == 'anio_mes':
+            resultado.index = pd.PeriodIndex(resultado.index, freq='M', name='anio_mes')
+        else:
+            # set_index ensancha enteros chicos a int64; pandas conserva el tipo de la columna
+            resultado.index = resultado.index.astype(tipo_clave)
+        resultado.columns = [f"{columna}_{funcion}" for columna, funcion in agregaciones]
+        return resultado
+
+    def _agregar_segmentos(self):
+        """Equivalente SQL de AnalyticsCasino._agregar_segmentos (cuartiles con interpolación lineal)"""
+        resultado = self._consultar(f"""
+            WITH usuarios AS (
+                SELECT username, {self._suma('monto')} AS total_depositado
+                FROM transacciones
+                WHERE tipo = 'DEPOSIT' AND username IS NOT NULL
+                GROUP BY username
+            ),
+            cuartiles AS (
+                SELECT quantile_cont(total_depositado, 0.25) AS q1,
+                       quantile_cont(total_depositado, 0.50) AS q2,
+                       quantile_cont(total_depositado, 0.75) AS q3
+                FROM usuarios
+            )
+            SELECT CASE
+                       WHEN total_depositado <= q1 THEN 'BAJO'
+                       WHEN total_depositado <= q2 THEN 'MEDIO-BAJO'
+                       WHEN total_depositado <= q3 THEN 'MEDIO-ALTO'
+                       ELSE 'ALTO'
+                   END AS segmento,
+                   COUNT(username) AS c0,
+                   {self._suma('total_depositado', origen='monto')} AS c1,
+                   AVG(total_depositado) AS c2
+            FROM usuarios, cuartiles
+            GROUP BY 1
+            ORDER BY 1
+        """)
+        return resultado.set_index('segmento')
+
+    def _resumen_montos(self):
+        """Equivalente SQL de AnalyticsCasino._resumen_montos"""
+        fila = self._consultar(f"""
+            SELECT COUNT(*) AS cantidad,
+                   COALESCE({self._suma('monto')}, 0) AS total,
+                   AVG(monto) AS promedio,
+                   quantile_cont(monto, 0.5) AS mediana,
+                   STDDEV_SAMP(monto) AS desv_est,
+                   MIN(monto) AS minimo,
+                   MAX(monto) AS maximo,
+                   quantile_cont(monto, 0.25) AS p25,
+                   quantile_cont(monto, 0.50) AS p50,
+                   quantile_cont(monto, 0.75) AS p75,
+                   quantile_cont(monto, 0.95) AS p95
+            FROM transacciones
+            WHERE tipo = 'DEPOSIT'
+        """)
+        return {clave: valores[0] for clave, valores in fila.to_dict('list').items()}
+
+    def _resumen_calidad(self):
+        """Equivalente SQL de AnalyticsCasino._resumen_calidad"""
+        fila = self._consultar("""
+            SELECT COUNT(*) AS total_registros,
+                   COUNT_IF(tipo = 'DEPOSIT') AS depositos,
+                   COALESCE(CAST(SUM(es_exitoso) AS BIGINT), 0) AS exitosos,
+                   COUNT(provincia) AS con_region,
+                   COUNT(*) - COUNT(provincia) AS sin_region,
+                   COUNT(DISTINCT provincia) AS provincias,
+                   COUNT(DISTINCT ciudad) AS ciudades,
+                   COUNT(DISTINCT username) AS usuarios,
+                   COUNT(DISTINCT operador) AS operadores
+            FROM transacciones
+        """).iloc[0]
+        return {clave: int(valor) for clave, valor in fila.items()}
+
+    def _datos_pobreza(self):
+        """Solo las columnas que usa CorrelacionPobreza, leídas del Parquet"""
+        from correlacion_pobreza import INDICES_POBREZA
+
+        columnas = ['tipo', 'monto', 'username', 'provincia', 'provincia_normalizada',
+                    'ciudad_pobreza', 'poblacion_estimada'] + INDICES_POBREZA
+        lista = ', '.join(c for c in columnas if c in self.tipos)
+        return self._consultar(f"SELECT {lista} FROM transacciones WHERE tipo = 'DEPOSIT'")
+    
+    def cantidad_registros(self):
+        return int(self._consultar('SELECT COUNT(*) AS n FROM transacciones')['n'].iloc[0])
+    
+    def serie_temporal(self):
+        """API de series temporales sobre un rollup diario calculado en SQL"""
+        from serie_temporal import SerieTemporal
+
+        if self.rollup is None:
+            self.rollup = self._consultar(f"""
+                SELECT date_trunc('day', CAST(fecha AS TIMESTAMP)) AS fecha_dia, hora, provincia, tipo,
+                       COUNT(monto) AS transacciones,
+                       {self._suma('monto')} AS total_ars,
+                       {self._suma('es_exitoso')} AS exitosas
+                FROM transacciones
+                GROUP BY ALL
+                ORDER BY ALL
+            """)
+        return SerieTemporal(self.rollup)
+
+    def _top_usuarios(self, top_n):
+        """Equivalente SQL de AnalyticsCasino._top_usuarios (ranking por provincia con ROW_NUMBER)"""
+        return self._consultar(f"""
+            SELECT provincia, username,
+                   COUNT(monto) AS Transacciones,
+                   {self._suma('monto')} AS Total_ARS
+            FROM transacciones
+            WHERE tipo = 'DEPOSIT' AND provincia IS NOT NULL AND username IS NOT NULL
+            GROUP BY provincia, username
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY provincia ORDER BY SUM(monto) DESC, username) <= ?
+            ORDER BY provincia, Total_ARS DESC, username
+        """, [top_n]).set_index(['provincia', 'username'])
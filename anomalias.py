@@ -0,0 +1,201 @@
+#!/bin/python
+
+"""
+================================================================================
+VELOCIDAD DE DEPÓSITOS Y DETECCIÓN DE ANOMALÍAS - CASINO POR REGIÓN
+================================================================================
+Etapa del ETL posterior a agregar_campos_derivados. Por cada depósito calcula:
+  - Cantidad y monto depositado por el mismo usuario en ventanas de tiempo
+    (p. ej. últimos 10 minutos, 1 hora, 24 horas)
+  - Desvío del monto respecto del historial previo del usuario (z-score)
+y emite flags de ráfaga / salto de monto, un score y una tabla de alertas.
+
+Todo se calcula con un único ordenamiento por (username, fecha): las ventanas
+se resuelven con searchsorted sobre una clave compuesta usuario+tiempo y
+sumas acumuladas, sin loops por usuario. En modo streaming el detector
+conserva la cola de depósitos recientes y los acumulados de cada usuario
+entre chunks.
+================================================================================
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNAS_FLAGS = ['z_monto', 'flag_rafaga', 'flag_salto_monto', 'score_anomalia', 'es_anomalia']
+
+
+class DetectorAnomalias:
+    """
+    Detector de ráfagas de depósitos y saltos de monto por usuario.
+    Llamar a `procesar` con el dataset completo o con chunks sucesivos en orden temporal.
+    El estado entre chunks vive en la instancia: solo se conserva si se reutiliza el
+    mismo detector (ETLCasino.ejecutar crea uno nuevo en cada corrida).
+    """
+
+    def __init__(self, ventanas=('10min', '1h', '24h'), ventana_rafaga='10min', umbral_rafaga=5,
+                 umbral_z=3.0, factor_salto=2.0, min_historial=5):
+        """
+        - ventanas: ventanas de conteo/suma por usuario (columnas depositos_<v> y monto_<v>)
+        - ventana_rafaga / umbral_rafaga: ráfaga = umbral_rafaga o más depósitos en la ventana
+        - umbral_z / factor_salto: salto = z ≥ umbral_z y monto ≥ factor_salto × promedio previo
+        - min_historial: depósitos previos necesarios para evaluar saltos de monto
+        """
+        if ventana_rafaga not in ventanas:
+            raise ValueError(f"ventana_rafaga ({ventana_rafaga}) debe estar en ventanas {ventanas}")
+        self.ventanas = {v: pd.Timedelta(v) for v in ventanas}
+        self.ventana_rafaga = ventana_rafaga
+        self.umbral_rafaga = umbral_rafaga
+        self.umbral_z = umbral_z
+        self.factor_salto = factor_salto
+        self.min_historial = min_historial
+
+        # Estado entre chunks
+        self._cola = pd.DataFrame({'username': pd.Series(dtype=object),
+                                   'fecha': pd.Series(dtype='datetime64[ns]'),
+                                   'monto': pd.Series(dtype=float)})
+        self._acumulados = pd.DataFrame(columns=['n', 'suma', 'suma_cuadrados'], dtype=float)
+        self._alertas = []
+
+    @property
+    def columnas(self):
+        """Columnas que agrega `procesar`"""
+        ventanas = [c for v in self.ventanas for c in (f'depositos_{v}', f'monto_{v}')]
+        return ventanas + COLUMNAS_FLAGS
+
+    # ========================================================================
+    # VENTANAS POR USUARIO
+    # ========================================================================
+
+    def _ventanas(self, codigos, tiempos_ms, montos):
+        """
+        Conteo y suma por usuario en cada ventana, sobre filas ya ordenadas por (usuario, fecha).
+        La clave usuario * span + tiempo es monótona, así que el inicio de cada ventana
+        es un searchsorted global.
+        """
+        max_ventana_ms = int(max(self.ventanas.values()).total_seconds() * 1000)
+        t0 = tiempos_ms.min()
+        span = int(tiempos_ms.max() - t0) + max_ventana_ms + 1
+        clave = codigos.astype(np.int64) * span + (tiempos_ms - t0)
+
+        posiciones = np.arange(len(clave))
+        suma_acumulada = np.concatenate([[0.0], np.cumsum(montos)])
+
+        resultado = {}
+        for nombre, ventana in self.ventanas.items():
+            ventana_ms = int(ventana.total_seconds() * 1000)
+            # Ventana (t - ventana, t]: incluye el depósito actual
+            inicio = np.searchsorted(clave, clave - ventana_ms, side='right')
+            resultado[f'depositos_{nombre}'] = posiciones - inicio + 1
+            resultado[f'monto_{nombre}'] = suma_acumulada[posiciones + 1] - suma_acumulada[inicio]
+        return resultado
+
+    # ========================================================================
+    # PROCESAMIENTO
+    # ========================================================================
+
+    def procesar(self, df):
+        """
+        Agrega a `df` las columnas de velocidad, flags y score (filas no DEPOSIT o sin username
+        quedan en 0/False: un depósito anónimo no tiene historial contra el cual compararse).
+        Devuelve una copia con el mismo índice y orden que `df`.
+        """
+        resultado = df.copy()
+        for nombre in self.ventanas:
+            resultado[f'depositos_{nombre}'] = 0
+            resultado[f'monto_{nombre}'] = 0.0
+        resultado['z_monto'] = np.nan
+        resultado['flag_rafaga'] = False
+        resultado['flag_salto_monto'] = False
+        resultado['score_anomalia'] = 0.0
+        resultado['es_anomalia'] = False
+
+        mascara = resultado['tipo'] == 'DEPOSIT' if 'tipo' in resultado.columns else pd.Series(True, index=resultado.index)
+        # Sin username no hay usuario al que atribuir la ventana (y factorize daría -1, rompiendo la clave monótona)
+        mascara &= resultado['username'].notna()
+        nuevos = resultado.loc[mascara, ['username', 'fecha', 'monto']].assign(_fila=np.flatnonzero(mascara))
+        if nuevos.empty:
+            return resultado
+
+        # 1. Un único ordenamiento (username, fecha) con la cola del chunk anterior delante
+        todo = pd.concat([self._cola.assign(_fila=-1), nuevos], ignore_index=True)
+        todo = todo.sort_values(['username', 'fecha'], kind='mergesort', ignore_index=True)
+        codigos, _ = pd.factorize(todo['username'])
+        tiempos_ms = todo['fecha'].values.astype('datetime64[ms]').astype(np.int64)
+        montos = todo['monto'].to_numpy(dtype=float)
+
+        # 2. Conteos y sumas por ventana
+        for columna, valores in self._ventanas(codigos, tiempos_ms, montos).items():
+            todo[columna] = valores
+
+        # 3. Historial previo del usuario (acumulados de chunks anteriores + posición en este)
+        es_nuevo = todo['_fila'].to_numpy() >= 0
+        todo = todo[es_nuevo].copy()
+        grupos = todo.groupby('username', sort=False)
+        previos = self._acumulados.reindex(todo['username']).fillna(0).to_numpy()
+        n_previo = previos[:, 0] + grupos.cumcount().to_numpy()
+        suma_previa = previos[:, 1] + grupos['monto'].cumsum().to_numpy() - todo['monto'].to_numpy()
+        cuadrados = todo['monto'] ** 2
+        cuadrados_previos = previos[:, 2] + cuadrados.groupby(todo['username'], sort=False).cumsum().to_numpy() - cuadrados.to_numpy()
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            promedio_previo = suma_previa / n_previo
+            varianza = (cuadrados_previos - n_previo * promedio_previo ** 2) / (n_previo - 1)
+            desvio = np.sqrt(np.clip(varianza, 0, None))
+            diferencia = todo['monto'].to_numpy() - promedio_previo
+            z = np.where(desvio > 0, diferencia / desvio, np.where(diferencia > 0, np.inf, 0.0))
+        z = np.where(n_previo >= self.min_historial, z, np.nan)
+
+        # 4. Flags y score (score ≥ 1 ⇔ algún umbral superado)
+        rafaga = todo[f'depositos_{self.ventana_rafaga}'].to_numpy()
+        todo['z_monto'] = np.round(z, 2)
+        todo['flag_rafaga'] = rafaga >= self.umbral_rafaga
+        todo['flag_salto_monto'] = (z >= self.umbral_z) & (todo['monto'].to_numpy() >= self.factor_salto * promedio_previo)
+        todo['score_anomalia'] = np.round(np.clip(np.fmax(rafaga / self.umbral_rafaga,
+                                                          np.nan_to_num(z, posinf=10.0) / self.umbral_z), 0, 10), 2)
+        todo['es_anomalia'] = todo['flag_rafaga'] | todo['flag_salto_monto']
+
+        # 5. Volcar a las filas originales
+        filas = todo['_fila'].to_numpy()
+        for columna in self.columnas:
+            resultado.iloc[filas, resultado.columns.get_loc(columna)] = todo[columna].to_numpy()
+
+        self._actualizar_estado(todo, cuadrados)
+        alertas = self.alertas(resultado)
+        self._alertas.append(alertas)
+        logger.info(f"  ✓ Anomalías: {len(alertas)} alertas sobre {len(todo):,} depósitos "
+                    f"({int(todo['flag_rafaga'].sum())} ráfagas, {int(todo['flag_salto_monto'].sum())} saltos de monto)")
+        return resultado
+
+    def _actualizar_estado(self, nuevos, cuadrados):
+        """Guarda la cola dentro de la ventana más larga y los acumulados por usuario"""
+        limite = nuevos['fecha'].max() - max(self.ventanas.values())
+        cola = pd.concat([self._cola, nuevos[['username', 'fecha', 'monto']]], ignore_index=True)
+        self._cola = cola[cola['fecha'] > limite].reset_index(drop=True)
+
+        chunk = pd.DataFrame({'n': 1.0, 'suma': nuevos['monto'].astype(float), 'suma_cuadrados': cuadrados.astype(float),
+                              'username': nuevos['username']}).groupby('username').sum()
+        self._acumulados = chunk.add(self._acumulados, fill_value=0) if not self._acumulados.empty else chunk
+
+    # ========================================================================
+    # ALERTAS
+    # ========================================================================
+
+    @staticmethod
+    def alertas(df):
+        """Tabla de alertas: una fila por depósito anómalo, con motivo y score"""
+        anomalos = df[df['es_anomalia'].astype(bool)]
+        motivo = np.where(anomalos['flag_rafaga'] & anomalos['flag_salto_monto'], 'RAFAGA+SALTO_MONTO',
+                          np.where(anomalos['flag_rafaga'], 'RAFAGA', 'SALTO_MONTO'))
+        columnas = [c for c in ['username', 'phone', 'provincia', 'fecha', 'monto', 'estado'] if c in df.columns]
+        columnas += [c for c in df.columns if c.startswith(('depositos_', 'monto_'))] + ['z_monto', 'score_anomalia']
+        return anomalos[columnas].assign(motivo=motivo).sort_values('score_anomalia', ascending=False)
+
+    def tabla_alertas(self):
+        """Alertas acumuladas de todos los chunks procesados"""
+        if not self._alertas:
+            return pd.DataFrame()
+        return pd.concat(self._alertas).sort_values('score_anomalia', ascending=False)
@@ -0,0 +1,342 @@
+#!/bin/python
+
+"""
+================================================================================
+BENCHMARK ETL + ANALÍTICAS - CASINO POR REGIÓN
+================================================================================
+Mide tiempo y memoria de ETLCasino.ejecutar y de cada etapa de su DAG
+(corrido con un worker) y de cada reporte de AnalyticsCasino sobre datos sintéticos
+(generador_datos.py) a varias escalas, y agrega la corrida a un historial
+JSON para comparar entre versiones:
+  - segundos:  time.perf_counter de la etapa
+  - pico_mb:   memoria extra que necesitó la etapa (pico de RSS muestreado
+               en un hilo, así cuenta también los buffers Arrow y numpy)
+  - rss_mb:    RSS del proceso al terminar la etapa
+Cada corrida se compara con la última del historial con la misma escala y
+configuración; las etapas que empeoran más que `umbral` se reportan.
+================================================================================
+"""
+
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics_casino import AnalyticsCasino, crear_analytics
+from etl_casino import ARCHIVOS_SALIDA, ETLCasino
+from generador_datos import generar_transacciones
+
+logger = logging.getLogger(__name__)
+
+TAMANIOS = (100_000, 1_000_000, 10_000_000)
+
+METODOS_ANALYTICS = list(AnalyticsCasino.TITULOS)
+
+# Loggers que se silencian durante las mediciones (sus mensajes no son parte del benchmark)
+LOGGERS_MEDIDOS = ('etl_casino', 'dag_etl', 'normalizacion', 'analytics_casino', 'analytics_sql', 'analytics_estrella', 'anomalias',
+                   'serie_temporal', 'esquema_estrella', 'almacen_sqlite', 'correlacion_pobreza')
+
+
+# ================================================================================
+# MEDICIÓN
+# ================================================================================
+
+def rss_mb():
+    """RSS actual del proceso en MB (psutil o /proc; None si no hay forma de medirlo)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MonitorMemoria(threading.Thread):
+    """Muestrea el RSS cada `intervalo` segundos y guarda el máximo (incluye buffers Arrow y numpy)"""
+
+    def __init__(self, intervalo=0.01):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.inicial = rss_mb()
+        self.maximo = self.inicial
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            self.maximo = max(self.maximo, rss_mb())
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+        self.maximo = max(self.maximo, rss_mb())
+        return self.maximo
+
+
+@contextmanager
+def midiendo(memoria=True):
+    """
+    Mide el bloque: el dict que entrega se completa al salir con segundos y, con `memoria`,
+    pico_mb (memoria extra que necesitó la etapa sobre el RSS inicial) y rss_mb (RSS al terminar).
+    """
+    gc.collect()
+    monitor = MonitorMemoria() if memoria and rss_mb() is not None else None
+    if monitor:
+        monitor.start()
+    medida = {}
+    inicio = time.perf_counter()
+    try:
+        yield medida
+        medida['segundos'] = round(time.perf_counter() - inicio, 4)
+    finally:
+        if monitor:
+            maximo = monitor.detener()
+    if monitor:
+        medida['pico_mb'] = round(maximo - monitor.inicial, 1)
+        medida['rss_mb'] = round(rss_mb(), 1)
+
+
+def medir(funcion, memoria=True):
+    """Ejecuta `funcion()` y devuelve (resultado, medida) (ver midiendo)"""
+    with midiendo(memoria) as medida:
+        resultado = funcion()
+    return resultado, medida
+
+
+@contextmanager
+def _silenciar(nivel=logging.ERROR):
+    """Sube el nivel de los loggers del ETL y analytics mientras se mide"""
+    anteriores = {nombre: logging.getLogger(nombre).level for nombre in LOGGERS_MEDIDOS}
+    for nombre in LOGGERS_MEDIDOS:
+        logging.getLogger(nombre).setLevel(nivel)
+    try:
+        yield
+    finally:
+        for nombre, anterior in anteriores.items():
+            logging.getLogger(nombre).setLevel(anterior)
+
+
+def _entorno():
+    """Versión del código (commit git) y del entorno de la corrida"""
+    try:
+        version = subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                                 cwd=Path(__file__).parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        version = None
+
+    entorno = {'version': version, 'python': platform.python_version(), 'pandas': pd.__version__,
+               'numpy': np.__version__, 'plataforma': platform.platform(), 'cpus': os.cpu_count()}
+    try:
+        import pyarrow as pa
+        entorno['pyarrow'] = pa.__version__
+    except ImportError:
+        pass
+    return entorno
+
+
+# ================================================================================
+# HISTORIAL
+# ================================================================================
+
+def cargar_historial(path):
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_historial(path, historial):
+    """Escritura atómica: un historial a medio escribir no pisa el anterior"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporal = path.with_suffix('.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(historial, f, ensure_ascii=False, indent=2)
+    temporal.replace(path)
+
+
+def comparar(anterior, actual, umbral=1.25, minimo_segundos=0.05):
+    """
+    Regresiones de `actual` respecto de `anterior` (dos corridas del historial):
+    mediciones de la misma escala cuyo tiempo creció más que `umbral` veces.
+    Las de menos de `minimo_segundos` se ignoran (ruido).
+    """
+    regresiones = []
+    for tamanio, grupos in actual['resultados'].items():
+        previos = anterior['resultados'].get(tamanio, {})
+        for grupo, medidas in _medidas_planas(grupos):
+            antes = dict(_medidas_planas(previos)).get(grupo, {})
+            for nombre, medida in medidas.items():
+                previa = antes.get(nombre)
+                if not previa or 'segundos' not in previa or 'segundos' not in medida:
+                    continue
+                if max(previa['segundos'], medida['segundos']) < minimo_segundos:
+                    continue
+                ratio = medida['segundos'] / max(previa['segundos'], 1e-9)
+                if ratio > umbral:
+                    regresiones.append({'filas': int(tamanio), 'grupo': grupo, 'medicion': nombre,
+                                        'antes': previa['segundos'], 'ahora': medida['segundos'],
+                                        'ratio': round(ratio, 2)})
+    return regresiones
+
+
+def _medidas_planas(grupos):
+    """('etl', {...}), ('analytics.pandas', {...}), ... de los resultados de una escala"""
+    for grupo, medidas in grupos.items():
+        if grupo == 'analytics':
+            for backend, por_metodo in medidas.items():
+                yield f"analytics.{backend}", por_metodo
+        elif grupo == 'etl':
+            yield grupo, medidas
+
+
+def _ultima_comparable(historial, corrida):
+    for previa in reversed(historial):
+        if previa.get('config') == corrida['config'] and set(previa['resultados']) & set(corrida['resultados']):
+            return previa
+    return None
+
+
+# ================================================================================
+# BENCHMARK
+# ================================================================================
+
+class BenchmarkCasino:
+    """Benchmark de ETLCasino y AnalyticsCasino sobre datos sintéticos a varias escalas"""
+
+    def __init__(self, tamanios=TAMANIOS[:2], directorio='./benchmarks', historial=None, semilla=42,
+                 regiones_path='./datos_entrada/regiones_argentina.json',
+                 pobreza_path='./datos_entrada/datos_pobreza.json',
+                 backends=('pandas',), memoria=True, umbral=1.25):
+        self.tamanios = [int(t) for t in tamanios]
+        self.directorio = Path(directorio)
+        self.historial_path = Path(historial) if historial else self.directorio / 'historial.json'
+        self.semilla = semilla
+        self.regiones_path = regiones_path
+        self.pobreza_path = pobreza_path
+        self.backends = list(backends)
+        self.memoria = memoria
+        self.umbral = umbral
+
+    def preparar_datos(self, filas):
+        """CSV sintético de `filas` filas; se reutiliza si ya existe (el generador es determinístico)"""
+        csv_path = self.directorio / 'datos' / f"casino_transacciones_{filas}_s{self.semilla}.csv"
+        if csv_path.exists():
+            logger.info(f"  ✓ Reutilizando {csv_path}")
+            return csv_path, None
+        _, medida = medir(lambda: generar_transacciones(csv_path, filas, semilla=self.semilla,
+                                                        regiones_path=self.regiones_path), memoria=False)
+        return csv_path, medida
+
+    def medir_etl(self, csv_path, salida):
+        """
+        ETLCasino.ejecutar() de punta a punta ('ejecutar') y cada etapa del DAG, con tiempo
+        y memoria. El DAG corre con un solo worker para que el pico de memoria de cada
+        etapa no incluya el de otras en paralelo.
+        """
+        por_etapa = {}
+
+        @contextmanager
+        def medir_etapa(nombre):
+            with midiendo(self.memoria) as medida:
+                yield
+            por_etapa[nombre] = medida
+
+        with _silenciar():
+            etl = ETLCasino(str(csv_path), self.regiones_path, self.pobreza_path or None)
+            df, total = medir(lambda: etl.ejecutar(output_dir=salida, max_workers=1, medir_etapa=medir_etapa),
+                              self.memoria)
+        total['filas'] = len(df) if df is not None else 0
+        for etapa, medida in por_etapa.items():
+            logger.info(f"    {etapa:.<40} {medida['segundos']:>9.3f} s  {self._memoria(medida)}")
+        return {'ejecutar': total, **por_etapa}
+
+    def medir_analytics(self, salida, backend):
+        """Carga del backend y cada reporte de AnalyticsCasino (sin imprimir)"""
+        ruta = salida / ARCHIVOS_SALIDA['estrella' if backend == 'estrella' else 'parquet']
+        with _silenciar():
+            analytics, carga = medir(lambda: crear_analytics(str(ruta), backend=backend), self.memoria)
+        medidas = {'cargar': carga}
+        logger.info(f"    [{backend}] {'cargar':.<31} {carga['segundos']:>9.3f} s  {self._memoria(carga)}")
+
+        for metodo in METODOS_ANALYTICS:
+            with _silenciar():
+                _, medidas[metodo] = medir(lambda: getattr(analytics, metodo)(mostrar=False), self.memoria)
+            logger.info(f"    [{backend}] {metodo:.<31} {medidas[metodo]['segundos']:>9.3f} s  "
+                        f"{self._memoria(medidas[metodo])}")
+        return medidas
+
+    @staticmethod
+    def _memoria(medida):
+        partes = [f"{clave}={medida[clave]:,.1f}" for clave in ('pico_mb', 'rss_mb') if clave in medida]
+        return ' '.join(partes)
+
+    def ejecutar(self):
+        """Corre todas las escalas, agrega la corrida al historial y devuelve (corrida, regresiones)"""
+        corrida = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'entorno': _entorno(),
+            'config': {'semilla': self.semilla, 'memoria': self.memoria, 'pobreza': bool(self.pobreza_path)},
+            'resultados': {},
+        }
+        logger.info("=" * 80)
+        logger.info(f"BENCHMARK CASINO - versión {corrida['entorno']['version'] or 'desconocida'}")
+        logger.info("=" * 80)
+
+        for filas in self.tamanios:
+            logger.info(f"\n📏 {filas:,} filas")
+            csv_path, generacion = self.preparar_datos(filas)
+            salida = self.directorio / 'salida' / str(filas)
+
+            logger.info("  🔄 ETL")
+            resultados = {'etl': self.medir_etl(csv_path, salida), 'analytics': {}}
+            if generacion:
+                resultados['generacion'] = generacion
+            total = resultados['etl']['ejecutar']
+            logger.info(f"    {'TOTAL ETL (ejecutar)':.<40} {total['segundos']:>9.3f} s  {self._memoria(total)}")
+
+            logger.info("  📊 Analytics")
+            for backend in self.backends:
+                resultados['analytics'][backend] = self.medir_analytics(salida, backend)
+            corrida['resultados'][str(filas)] = resultados
+
+        historial = cargar_historial(self.historial_path)
+        anterior = _ultima_comparable(historial, corrida)
+        regresiones = comparar(anterior, corrida, self.umbral) if anterior else []
+        historial.append(corrida)
+        guardar_historial(self.historial_path, historial)
+
+        logger.info(f"\n💾 Corrida agregada a {self.historial_path} ({len(historial)} corridas)")
+        if anterior is None:
+            logger.info("  ℹ Sin corrida anterior comparable (misma configuración y escala)")
+        elif regresiones:
+            logger.warning(f"  ⚠ {len(regresiones)} regresiones (> {self.umbral}x) vs versión "
+                           f"{anterior['entorno'].get('version')} del {anterior['fecha']}:")
+            for r in regresiones:
+                logger.warning(f"    - {r['filas']:,} filas {r['grupo']}.{r['medicion']}: "
+                               f"{r['antes']:.3f}s → {r['ahora']:.3f}s ({r['ratio']}x)")
+        else:
+            logger.info(f"  ✓ Sin regresiones vs versión {anterior['entorno'].get('version')} del {anterior['fecha']}")
+        return corrida, regresiones
+
+
+if __name__ == "__main__":
+    # python casino.py bench --help
+    from casino import main
+
+    sys.exit(main(['bench'] + sys.argv[1:]))
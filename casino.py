@@ -0,0 +1,297 @@
+#!/bin/python
+
+"""
+================================================================================
+CLI CASINO - PUNTO DE ENTRADA UNIFICADO
+================================================================================
+Uso:
+  python casino.py etl     [--csv ...] [--salida DIR] [--etapas csv parquet ...] [--muestra 200]
+  python casino.py report  [--datos ...] [--reportes analisis_por_mes ...]
+  python casino.py export  [--datos ...] [--formato xlsx|parquet|csv|json]
+  python casino.py to-sql  [--csv ...] [--sql ...] [--formato insert|copy|load_data]
+  python casino.py serve   [--datos ...] [--puerto 8765]
+  python casino.py generate [--filas 1M] [--salida ...] [--semilla 42]
+  python casino.py bench   [--tamanios 100k 1M 10M] [--backends pandas duckdb estrella]
+
+Los módulos pesados (pandas, ETL, analytics) se importan dentro de cada
+subcomando: `--help` o un reporte puntual no pagan el costo de los demás.
+================================================================================
+"""
+
+import argparse
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+DATOS_PROCESADOS = './datos_salida/casino_procesado.csv'
+
+
+# ================================================================================
+# SUBCOMANDOS
+# ================================================================================
+
+def comando_etl(args):
+    """Ejecuta el ETL con las rutas y etapas indicadas"""
+    from etl_casino import ETLCasino, configurar_logging
+
+    configurar_logging(args.log, nivel=args.nivel_log)
+    if args.muestra and args.indice:
+        logger.error("✗ --muestra y --indice no se combinan: la muestra no debe marcar filas como cargadas")
+        return 2
+    if args.indice and args.modo_db == 'reemplazar':
+        logger.error("✗ --indice carga la base en modo agregar: --modo-db reemplazar borraría las corridas anteriores")
+        return 2
+    # La vista previa escribe en su propio directorio para no pisar las salidas completas
+    salida = args.salida or ('./datos_salida/muestra' if args.muestra else './datos_salida')
+    etl = ETLCasino(args.csv, args.regiones, args.pobreza, lectores=args.lectores, muestra=args.muestra,
+                    semilla_muestra=args.semilla)
+    df_final = etl.ejecutar(output_dir=salida, etapas=args.etapas, modo_db=args.modo_db,
+                            indice_path=args.indice, checkpoint_dir=args.checkpoints, forzar=args.forzar)
+    if df_final.empty:
+        return 0
+
+    if args.resumen:
+        logger.info("\n📈 ESTADÍSTICAS FINALES:")
+        logger.info(f"Total registros: {len(df_final):,}")
+        logger.info(f"Monto total: ${df_final['monto'].sum():,.2f}")
+        logger.info(f"Monto promedio: ${df_final['monto'].mean():,.2f}")
+        logger.info(f"Provincias: {df_final['provincia'].nunique()}")
+        logger.info(f"Ciudades: {df_final['ciudad'].nunique()}")
+        logger.info(f"\nDepositos por provincia:\n{df_final.groupby('provincia')['monto'].agg(['count', 'sum', 'mean']).round(2)}")
+    return 0
+
+
+def _crear_analytics(args):
+    from analytics_casino import crear_analytics
+
+    opciones = {'rollup_path': args.rollup} if args.rollup and args.backend == 'pandas' else {}
+    return crear_analytics(args.datos, backend=args.backend, **opciones)
+
+
+def comando_report(args):
+    """Reporte ejecutivo completo o solo los reportes pedidos"""
+    analytics = _crear_analytics(args)
+
+    if args.reportes:
+        from ejecutor_reportes import EjecutorReportes
+
+        desconocidos = [r for r in args.reportes if r not in analytics.TITULOS]
+        if desconocidos:
+            logger.error(f"✗ Reportes desconocidos: {', '.join(desconocidos)} "
+                         f"(opciones: {', '.join(analytics.TITULOS)})")
+            return 2
+        resultados = EjecutorReportes(analytics, max_workers=args.workers, modo=args.modo).ejecutar(args.reportes)
+        for metodo, resultado in resultados.items():
+            analytics.imprimir_resultado(metodo, resultado)
+    else:
+        analytics.generar_reporte_ejecutivo(max_workers=args.workers, modo=args.modo)
+
+    if args.excel:
+        from exportar_reportes import exportar_excel
+
+        try:
+            exportar_excel(analytics, args.excel)
+        except Exception as e:
+            logger.warning(f"No se pudo exportar a Excel: {e}")
+
+    logger.info("\n✅ ANÁLISIS COMPLETADO")
+    return 0
+
+
+def comando_export(args):
+    """Exporta las hojas del reporte a Excel o como bundle para BI"""
+    from exportar_reportes import exportar_bundle, exportar_excel
+
+    analytics = _crear_analytics(args)
+    if args.formato == 'xlsx':
+        exportar_excel(analytics, args.salida or './datos_salida/casino_reportes.xlsx')
+    else:
+        exportar_bundle(analytics, args.salida or './datos_salida/reportes', formato=args.formato)
+    return 0
+
+
+def comando_to_sql(args):
+    """Convierte el CSV procesado en un script SQL"""
+    from convertir import convertir
+
+    convertir(args.csv, args.sql, tabla=args.tabla, formato=args.formato, tam_lote=args.tam_lote,
+              crear_tabla=args.crear_tabla)
+    return 0
+
+
+def comando_serve(args):
+    """Servicio HTTP/JSON de consultas con los datos en memoria"""
+    from servidor_analytics import ServicioAnalytics
+
+    servicio = ServicioAnalytics(args.datos, backend=args.backend, rollup_path=args.rollup,
+                                 intervalo_recarga=args.intervalo_recarga, json_pobreza_path=args.pobreza or None)
+    servicio.servir(args.host, args.puerto)
+    return 0
+
+
+def _filas(texto):
+    """'100k' → 100000, '1M' → 1000000, '2500' → 2500"""
+    texto = str(texto).strip().lower().replace('_', '')
+    multiplicador = {'k': 1_000, 'm': 1_000_000}.get(texto[-1:], 1)
+    try:
+        return int(float(texto[:-1] if multiplicador > 1 else texto) * multiplicador)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"cantidad de filas inválida: {texto!r}")
+
+
+def _tasas(pares):
+    """['telefono_invalido=0.02', ...] → {'telefono_invalido': 0.02, ...}"""
+    tasas = {}
+    for par in pares or []:
+        nombre, _, valor = par.partition('=')
+        if not valor:
+            raise ValueError(f"Tasa inválida: {par!r} (formato NOMBRE=VALOR)")
+        tasas[nombre] = float(valor)
+    return tasas
+
+
+def comando_generate(args):
+    """Genera un CSV de transacciones sintético y determinístico"""
+    from generador_datos import generar_transacciones
+
+    generar_transacciones(args.salida, args.filas, semilla=args.semilla, regiones_path=args.regiones,
+                          usuarios=args.usuarios, tasas_sucias=_tasas(args.tasa))
+    return 0
+
+
+def comando_bench(args):
+    """Benchmark del ETL y los reportes a varias escalas, con historial JSON"""
+    from benchmark_casino import BenchmarkCasino
+
+    benchmark = BenchmarkCasino(args.tamanios, directorio=args.dir, historial=args.historial,
+                                semilla=args.semilla, regiones_path=args.regiones, pobreza_path=args.pobreza,
+                                backends=args.backends, memoria=args.memoria, umbral=args.umbral)
+    _, regresiones = benchmark.ejecutar()
+    return 3 if regresiones and args.fallar_con_regresion else 0
+
+
+# ================================================================================
+# ARGUMENTOS
+# ================================================================================
+
+def _argumentos_datos(parser, datos=DATOS_PROCESADOS):
+    parser.add_argument('--datos', default=datos, help=f"CSV/Parquet procesado por el ETL (default: {datos})")
+    parser.add_argument('--backend', choices=('pandas', 'duckdb', 'estrella'), default='pandas',
+                        help="pandas (en memoria), duckdb (SQL sobre Parquet) o estrella (--datos = directorio)")
+    parser.add_argument('--rollup', help="rollup diario del ETL para los reportes temporales (backend pandas)")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='casino', description="ETL y analíticas de depósitos de casino por región")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log en nivel DEBUG")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    etl = subparsers.add_parser('etl', help="ejecutar el ETL")
+    etl.add_argument('--csv', default='./datos_entrada/casino_transacciones.csv',
+                     help="CSV de transacciones, directorio o glob ('dumps/*.csv.gz'); acepta .gz/.bz2/.zip/.xz")
+    etl.add_argument('--lectores', type=int, default=8, help="archivos leídos en paralelo")
+    etl.add_argument('--regiones', default='./datos_entrada/regiones_argentina.json', help="JSON de regiones")
+    etl.add_argument('--pobreza', default='./datos_entrada/datos_pobreza.json',
+                     help="JSON de pobreza ('' para omitir)")
+    etl.add_argument('--salida', help="directorio de salida (default: ./datos_salida, o ./datos_salida/muestra con --muestra)")
+    etl.add_argument('--etapas', nargs='+', default=['anomalias', 'csv', 'parquet', 'rollup', 'alertas', 'db', 'estrella'],
+                     metavar='ETAPA',
+                     help="etapas opcionales: anomalias csv parquet rollup alertas db estrella (default: todas)")
+    etl.add_argument('--modo-db', choices=('reemplazar', 'agregar'),
+                     help="carga SQLite: recrear la tabla o agregar filas (default: agregar con --indice, "
+                          "si no reemplazar)")
+    etl.add_argument('--indice', help="índice de ingesta (.npy): descarta transacciones ya cargadas "
+                                      "en corridas anteriores (exportaciones solapadas)")
+    etl.add_argument('--muestra', type=int, metavar='FILAS',
+                     help="vista previa: muestra estratificada (provincia × tipo × mes) de FILAS por estrato")
+    etl.add_argument('--semilla', type=int, default=42, help="semilla de la muestra")
+    etl.add_argument('--checkpoints', metavar='DIR',
+                     help="guardar el resultado de cada etapa y retomar desde la primera que cambió")
+    etl.add_argument('--forzar', action='store_true', help="ignorar los checkpoints y ejecutar todas las etapas")
+    etl.add_argument('--log', default='etl_casino.log', help="archivo de log ('' para solo consola)")
+    etl.add_argument('--sin-resumen', dest='resumen', action='store_false', help="no loguear estadísticas finales")
+    etl.set_defaults(funcion=comando_etl)
+
+    report = subparsers.add_parser('report', help="imprimir reportes")
+    _argumentos_datos(report)
+    report.add_argument('--reportes', nargs='+', metavar='METODO',
+                        help="métodos de AnalyticsCasino (default: reporte ejecutivo completo)")
+    report.add_argument('--workers', type=int, help="reportes en paralelo")
+    report.add_argument('--modo', choices=('thread', 'process'), default='thread')
+    report.add_argument('--excel', help="además exportar las hojas a este .xlsx")
+    report.set_defaults(funcion=comando_report)
+
+    export = subparsers.add_parser('export', help="exportar reportes a Excel o bundle BI")
+    _argumentos_datos(export)
+    export.add_argument('--formato', choices=('xlsx', 'parquet', 'csv', 'json'), default='xlsx')
+    export.add_argument('--salida', help="archivo .xlsx o directorio del bundle")
+    export.set_defaults(funcion=comando_export)
+
+    to_sql = subparsers.add_parser('to-sql', help="convertir el CSV procesado a SQL")
+    to_sql.add_argument('--csv', default=DATOS_PROCESADOS, help="CSV procesado")
+    to_sql.add_argument('--sql', default='./datos_salida/casino_procesado.sql', help="script SQL de salida")
+    to_sql.add_argument('--tabla', default='MY_TABLE', help="tabla destino")
+    to_sql.add_argument('--formato', choices=('insert', 'insert_mysql', 'copy', 'load_data'), default='insert',
+                        help="INSERTs multi-fila, COPY de PostgreSQL o LOAD DATA de MySQL")
+    to_sql.add_argument('--tam-lote', type=int, default=1000, help="filas por INSERT")
+    to_sql.add_argument('--crear-tabla', action='store_true', help="anteponer CREATE TABLE con tipos")
+    to_sql.set_defaults(funcion=comando_to_sql)
+
+    serve = subparsers.add_parser('serve', help="servicio HTTP/JSON de consultas")
+    _argumentos_datos(serve, datos='./datos_salida/casino_procesado.parquet')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--puerto', type=int, default=8765)
+    serve.add_argument('--intervalo-recarga', type=float, default=2.0,
+                       help="segundos entre chequeos de salida nueva del ETL (0 = sin recarga)")
+    serve.add_argument('--pobreza', default='./datos_entrada/datos_pobreza.json',
+                       help="JSON de pobreza para analisis_pobreza por aglomerado/ciudad ('' para omitir)")
+    serve.set_defaults(funcion=comando_serve)
+
+    generate = subparsers.add_parser('generate', help="generar transacciones sintéticas")
+    generate.add_argument('--filas', type=_filas, default=100_000, help="cantidad de filas (100k, 1M, ...)")
+    generate.add_argument('--salida', default='./datos_entrada/casino_transacciones.csv', help="CSV a escribir")
+    generate.add_argument('--semilla', type=int, default=42)
+    generate.add_argument('--regiones', default='./datos_entrada/regiones_argentina.json', help="JSON de regiones")
+    generate.add_argument('--usuarios', type=_filas, help="usuarios distintos (default: filas/40)")
+    generate.add_argument('--tasa', action='append', metavar='NOMBRE=VALOR',
+                          help="fracción de filas sucias: telefono_invalido, area_desconocida, fecha_invalida, "
+                               "monto_invalido, duplicado (repetible)")
+    generate.set_defaults(funcion=comando_generate)
+
+    bench = subparsers.add_parser('bench', help="benchmark de ETL y reportes")
+    bench.add_argument('--tamanios', nargs='+', type=_filas, default=[100_000, 1_000_000],
+                       metavar='FILAS', help="escalas a medir (default: 100k 1M)")
+    bench.add_argument('--backends', nargs='+', choices=('pandas', 'duckdb', 'estrella'), default=['pandas'])
+    bench.add_argument('--dir', default='./benchmarks', help="datos sintéticos y salidas del ETL")
+    bench.add_argument('--historial', help="JSON de corridas (default: DIR/historial.json)")
+    bench.add_argument('--semilla', type=int, default=42)
+    bench.add_argument('--regiones', default='./datos_entrada/regiones_argentina.json', help="JSON de regiones")
+    bench.add_argument('--pobreza', default='./datos_entrada/datos_pobreza.json', help="JSON de pobreza ('' para omitir)")
+    bench.add_argument('--sin-memoria', dest='memoria', action='store_false',
+                       help="no muestrear memoria (solo tiempos)")
+    bench.add_argument('--umbral', type=float, default=1.25, help="ratio de tiempo que cuenta como regresión")
+    bench.add_argument('--fallar-con-regresion', action='store_true', help="código de salida 3 si hay regresiones")
+    bench.set_defaults(funcion=comando_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    args.nivel_log = logging.DEBUG if args.verbose else logging.INFO
+    if args.comando != 'etl':
+        logging.basicConfig(level=args.nivel_log)
+    try:
+        return args.funcion(args)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"✗ {e}")
+        return 1
+
+
+# ================================================================================
+# EJECUCIÓN
+# ================================================================================
+
+if __name__ == "__main__":
+    sys.exit(main())
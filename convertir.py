@@ -1,25 +1,254 @@
 #!/bin/python
 
-import csv
+"""
+================================================================================
+EXPORTACIÓN A SQL EN STREAMING - CASINO POR REGIÓN
+================================================================================
+Convierte el CSV procesado por el ETL en un script SQL leyendo por lotes
+(memoria constante, sin importar el tamaño del archivo):
+  - 'insert':       INSERTs multi-fila de `tam_lote` filas (PostgreSQL / SQLite)
+  - 'insert_mysql': ídem, escapando también barras invertidas (MySQL)
+  - 'copy':         bloque COPY ... FROM stdin de PostgreSQL
+  - 'load_data':    archivo .tsv + sentencia LOAD DATA LOCAL INFILE de MySQL
+Los valores salen como literales tipados: números sin comillas, NULL para
+vacíos, timestamps normalizados y texto con las comillas escapadas.
+================================================================================
+"""
 
-csv_file = "./datos_salida/casino_procesado.csv"
-sql_file = "./datos_salida/casino_procesado.sql"
+import logging
+from datetime import datetime
+from functools import reduce
+from pathlib import Path
 
-with open(csv_file, mode="r", encoding="utf-8") as file:
-    csv_reader = csv.reader(file)
-    headers = next(csv_reader)  # Lee la primera fila como encabezados
-    values_list = []
+import pandas as pd
 
-    for row in csv_reader:
-        values = ", ".join(f"'{v}'" for v in row)  # Escapa los valores
-        values_list.append(f"({values})")  # Añade cada fila como una tupla
+logger = logging.getLogger(__name__)
 
-    # Crea la sentencia SQL
-    insert_statement = (
-        f"INSERT INTO MY_TABLE ({', '.join(headers)}) VALUES {',\n'.join(values_list)};"
-    )
+FORMATOS = ('insert', 'insert_mysql', 'copy', 'load_data')
 
-    with open(sql_file, mode="w", encoding="utf-8") as sql:
-        sql.write(insert_statement + "\n")
+# Tipos de las columnas que genera ETLCasino.load_csv; el resto se infiere del primer lote
+ESQUEMA_PROCESADO = {
+    'username': 'texto', 'phone': 'texto', 'area_code': 'texto', 'provincia': 'texto',
+    'ciudad': 'texto', 'operador': 'texto', 'monto': 'decimal', 'fecha': 'timestamp',
+    'anio': 'entero', 'mes': 'entero', 'dia': 'entero', 'hora': 'entero',
+    'rango_monto': 'texto', 'estado': 'texto', 'tipo': 'texto', 'es_exitoso': 'entero',
+    'dia_semana': 'texto', 'archivo_origen': 'texto', 'estrato_muestra': 'texto', 'peso_muestra': 'decimal',
+    'z_monto': 'decimal', 'flag_rafaga': 'booleano', 'flag_salto_monto': 'booleano',
+    'score_anomalia': 'decimal', 'es_anomalia': 'booleano',
+    'provincia_normalizada': 'texto', 'ciudad_pobreza': 'texto', 'indice_pobreza_personas': 'decimal',
+    'indice_pobreza_hogares': 'decimal', 'indice_indigencia_personas': 'decimal',
+    'indice_indigencia_hogares': 'decimal', 'ingreso_promedio_familia': 'decimal',
+    'canasta_basica_total': 'decimal', 'brecha_pobreza_pct': 'decimal', 'poblacion_estimada': 'decimal',
+}
 
-print(f"Conversión completada. Consulta el archivo {sql_file}.")
+# Tipo lógico → tipo SQL del CREATE TABLE (válido en PostgreSQL, MySQL y SQLite).
+# Los timestamps llevan milisegundos: MySQL necesita DATETIME(3) (TIMESTAMP/DATETIME sin
+# precisión los redondea al segundo, y TIMESTAMP convierte por zona horaria).
+TIPOS_SQL = {
+    'texto': 'TEXT',
+    'entero': 'BIGINT',
+    'decimal': 'DOUBLE PRECISION',
+    'timestamp': 'TIMESTAMP(3)',
+    'booleano': 'BOOLEAN',
+}
+TIPOS_SQL_MYSQL = {**TIPOS_SQL, 'timestamp': 'DATETIME(3)'}
+FORMATOS_MYSQL = ('insert_mysql', 'load_data')
+
+FILAS_LECTURA = 50_000
+NULL = 'NULL'
+
+# Validación de números sobre el texto del CSV (más rápida que convertir a float y volver a texto)
+PATRONES_NUMERO = {
+    'entero': r'[+-]?\d+(?:\.0*)?',
+    'decimal': r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?',
+}
+NO_FINITOS = ['nan', 'inf', '-inf', '+inf', 'infinity', '-infinity']
+
+
+# ================================================================================
+# TIPOS DE COLUMNA
+# ================================================================================
+
+def tipo_columna(nombre, muestra):
+    """Tipo lógico de una columna: esquema conocido, prefijo de columna derivada o inferencia"""
+    if nombre in ESQUEMA_PROCESADO:
+        return ESQUEMA_PROCESADO[nombre]
+    if nombre.startswith('depositos_'):
+        return 'entero'
+    if nombre.startswith('monto_'):
+        return 'decimal'
+
+    valores = muestra.dropna()
+    if valores.empty:
+        return 'texto'
+    if valores.isin(['True', 'False']).all():
+        return 'booleano'
+    numeros = pd.to_numeric(valores, errors='coerce')
+    if numeros.notna().all():
+        return 'entero' if (~valores.str.contains(r'[.eE]')).all() else 'decimal'
+    return 'texto'
+
+
+def esquema_de(csv_file):
+    """{columna: tipo lógico} del CSV, leyendo solo el primer lote"""
+    muestra = pd.read_csv(csv_file, dtype=str, keep_default_na=False, na_values=[''], nrows=FILAS_LECTURA)
+    return {col: tipo_columna(col, muestra[col]) for col in muestra.columns}
+
+
+def crear_tabla_sql(tabla, esquema, formato='insert'):
+    tipos = TIPOS_SQL_MYSQL if formato in FORMATOS_MYSQL else TIPOS_SQL
+    columnas = ',\n'.join(f"    {col} {tipos[tipo]}" for col, tipo in esquema.items())
+    return f"CREATE TABLE IF NOT EXISTS {tabla} (\n{columnas}\n);\n"
+
+
+# ================================================================================
+# LITERALES (vectorizados por columna)
+# ================================================================================
+
+def _numeros(valores, columna, tipo):
+    """Valida una columna numérica sobre su texto; NaN/inf quedan como nulo y '5.0' entero → '5'"""
+    texto = valores.str.strip()
+    nulos = texto.isna() | texto.str.lower().isin(NO_FINITOS)
+    validos = texto.str.fullmatch(PATRONES_NUMERO[tipo]).fillna(False).astype(bool)
+    invalidos = ~nulos & ~validos
+    if invalidos.any():
+        raise ValueError(f"Valor no {tipo} en columna '{columna}': {valores[invalidos].iloc[0]!r}")
+
+    if tipo == 'entero':
+        texto = texto.str.replace(r'\.0*$', '', regex=True)
+    return texto.where(~nulos)
+
+
+def _timestamps(valores, columna):
+    """Timestamps como 'YYYY-MM-DD HH:MM:SS.mmm' (los milisegundos de la fecha original se conservan)"""
+    fechas = pd.to_datetime(valores, format='ISO8601', errors='coerce')
+    invalidos = valores.notna() & fechas.isna()
+    if invalidos.any():
+        raise ValueError(f"Timestamp inválido en columna '{columna}': {valores[invalidos].iloc[0]!r}")
+    return fechas.dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3].where(fechas.notna())
+
+
+def _escapar_sql(texto, barras):
+    """Comillas simples duplicadas; con `barras` también se escapan las barras invertidas (MySQL)"""
+    if barras:
+        texto = texto.str.replace('\\', '\\\\', regex=False)
+    return "'" + texto.str.replace("'", "''", regex=False) + "'"
+
+
+def _escapar_tsv(texto):
+    """Escapado del formato texto de COPY / LOAD DATA (barra, tab y saltos de línea)"""
+    for original, escapado in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+        texto = texto.str.replace(original, escapado, regex=False)
+    return texto
+
+
+def literales(lote, esquema, formato):
+    """
+    Convierte cada columna del lote (leído como texto) en su literal SQL o campo TSV.
+    Devuelve un DataFrame de strings sin nulos.
+    """
+    sql = formato in ('insert', 'insert_mysql')
+    nulo = NULL if sql else '\\N'
+    verdadero, falso = {'insert': ('TRUE', 'FALSE'), 'insert_mysql': ('1', '0'),
+                        'copy': ('t', 'f'), 'load_data': ('1', '0')}[formato]
+
+    columnas = {}
+    for columna, tipo in esquema.items():
+        valores = lote[columna]
+        if tipo in ('entero', 'decimal'):
+            literal = _numeros(valores, columna, tipo)
+        elif tipo == 'timestamp':
+            literal = _timestamps(valores, columna)
+            if sql:
+                literal = "'" + literal + "'"
+        elif tipo == 'booleano':
+            texto = valores.str.strip().str.lower()
+            literal = texto.map({'true': verdadero, '1': verdadero, 'false': falso, '0': falso})
+            invalidos = valores.notna() & literal.isna()
+            if invalidos.any():
+                raise ValueError(f"Booleano inválido en columna '{columna}': {valores[invalidos].iloc[0]!r}")
+        else:
+            literal = _escapar_sql(valores, formato == 'insert_mysql') if sql else _escapar_tsv(valores)
+        # Relleno antes del cast: en pandas < 3 astype(str) convierte los nulos en 'nan'
+        columnas[columna] = literal.fillna(nulo).astype(str)
+    return pd.DataFrame(columnas, index=lote.index)
+
+
+def _unir_filas(literales_lote, separador):
+    """Une las columnas de cada fila con `separador` (concatenación vectorizada por columna)"""
+    return reduce(lambda a, b: a + separador + b, (literales_lote[col] for col in literales_lote.columns))
+
+
+# ================================================================================
+# CONVERSIÓN
+# ================================================================================
+
+def convertir(csv_file="./datos_salida/casino_procesado.csv", sql_file="./datos_salida/casino_procesado.sql",
+              tabla="MY_TABLE", formato='insert', tam_lote=1000, crear_tabla=False):
+    """
+    Convierte el CSV procesado en un script SQL, en streaming.
+    - formato: 'insert', 'insert_mysql', 'copy' (PostgreSQL) o 'load_data' (MySQL)
+    - tam_lote: filas por sentencia INSERT
+    - crear_tabla: anteponer CREATE TABLE IF NOT EXISTS con el esquema tipado
+    Para 'load_data' los datos van a un .tsv junto a `sql_file`.
+    Devuelve la ruta del script SQL.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (opciones: {', '.join(FORMATOS)})")
+    if tam_lote < 1:
+        raise ValueError("tam_lote debe ser al menos 1")
+
+    inicio = datetime.now()
+    esquema = esquema_de(csv_file)
+    nombres = ', '.join(esquema)
+    filas_lectura = max(tam_lote, FILAS_LECTURA // tam_lote * tam_lote)
+    tsv_file = Path(sql_file).with_suffix('.tsv')
+    logger.info(f"💾 Convirtiendo {csv_file} → {sql_file} (formato={formato}, lote={tam_lote:,})")
+
+    lector = pd.read_csv(csv_file, dtype=str, keep_default_na=False, na_values=[''], chunksize=filas_lectura)
+    total = 0
+    with open(sql_file, mode="w", encoding="utf-8", newline='\n') as sql:
+        if crear_tabla:
+            sql.write(crear_tabla_sql(tabla, esquema, formato) + "\n")
+
+        if formato == 'load_data':
+            datos = open(tsv_file, mode="w", encoding="utf-8", newline='\n')
+            ruta = str(tsv_file.resolve()).replace('\\', '\\\\').replace("'", "''")
+            sql.write(f"LOAD DATA LOCAL INFILE '{ruta}'\nINTO TABLE {tabla}\nCHARACTER SET utf8mb4\n"
+                      f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\nLINES TERMINATED BY '\\n'\n({nombres});\n")
+        elif formato == 'copy':
+            datos = sql
+            sql.write(f"COPY {tabla} ({nombres}) FROM stdin;\n")
+        else:
+            datos = sql
+            sql.write("BEGIN;\n")
+
+        try:
+            for lote in lector:
+                if formato in ('insert', 'insert_mysql'):
+                    filas = ('(' + _unir_filas(literales(lote, esquema, formato), ', ') + ')').tolist()
+                    for i in range(0, len(filas), tam_lote):
+                        datos.write(f"INSERT INTO {tabla} ({nombres}) VALUES\n")
+                        datos.write(',\n'.join(filas[i:i + tam_lote]))
+                        datos.write(";\n")
+                else:
+                    datos.write('\n'.join(_unir_filas(literales(lote, esquema, formato), '\t')) + '\n')
+                total += len(lote)
+        finally:
+            if formato == 'load_data':
+                datos.close()
+
+        if formato == 'copy':
+            sql.write("\\.\n")
+        elif formato != 'load_data':
+            sql.write("COMMIT;\n")
+
+    tiempo = (datetime.now() - inicio).total_seconds()
+    logger.info(f"✓ Conversión completada: {total:,} filas en {tiempo:.2f} segundos "
+                f"({total / max(tiempo, 1e-9):,.0f} filas/s). Consulta el archivo {sql_file}.")
+    return sql_file
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    convertir()
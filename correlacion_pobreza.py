@@ -0,0 +1,278 @@
+#!/bin/python
+
+"""
+================================================================================
+CORRELACIÓN POBREZA vs DEPÓSITOS - CASINO POR REGIÓN
+================================================================================
+Implementa las métricas de documentacion/analisis_pobreza_casino.md:
+  - Correlación de Pearson y Spearman entre índice de pobreza y depósitos
+  - Depósitos per cápita y por tramo de pobreza
+  - Relación depósito / ingreso promedio familiar
+Los datos se agregan primero por unidad geográfica (provincia, aglomerado o
+ciudad del aglomerado EPH que asigna el ETL),
+ya que los índices de pobreza son por unidad y no por transacción. Los
+intervalos de confianza salen de un bootstrap vectorizado con NumPy: todas
+las réplicas se remuestrean y calculan en una sola pasada matricial.
+================================================================================
+"""
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NIVELES = ('provincia', 'aglomerado', 'ciudad')
+
+# Tramos de pobreza (% de personas) de analisis_pobreza_casino.md §5.2
+TRAMOS_POBREZA = [0, 25, 30, 35, 50]
+ETIQUETAS_TRAMOS = ['Baja', 'Media', 'Media-Alta', 'Alta']
+
+INDICES_POBREZA = [
+    'indice_pobreza_personas', 'indice_pobreza_hogares',
+    'indice_indigencia_personas', 'indice_indigencia_hogares',
+    'ingreso_promedio_familia', 'canasta_basica_total', 'brecha_pobreza_pct'
+]
+
+# Pares (x, y) a correlacionar por defecto
+PARES_CORRELACION = [
+    ('indice_pobreza_personas', 'depositos_per_capita'),
+    ('indice_pobreza_personas', 'monto_promedio'),
+    ('indice_pobreza_personas', 'ratio_deposito_ingreso_pct'),
+    ('indice_indigencia_personas', 'depositos_per_capita'),
+    ('ingreso_promedio_familia', 'depositos_per_capita'),
+]
+
+
+def _plegar_provincias(serie):
+    """Provincias en mayúsculas y sin acentos, como provincia_normalizada del ETL ('Córdoba' → 'CORDOBA')"""
+    return (serie.str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('ascii')
+            .str.upper().str.strip())
+
+
+# ================================================================================
+# ESTADÍSTICOS VECTORIZADOS (una fila = una réplica)
+# ================================================================================
+
+def _pearson_filas(x, y):
+    """Pearson por fila de dos matrices (réplicas × observaciones)"""
+    xc = x - x.mean(axis=1, keepdims=True)
+    yc = y - y.mean(axis=1, keepdims=True)
+    num = (xc * yc).sum(axis=1)
+    den = np.sqrt((xc * xc).sum(axis=1) * (yc * yc).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return num / den
+
+
+def _rangos_filas(a):
+    """Rangos promedio (empates → rango medio) por fila, sin loops de Python"""
+    n = a.shape[1]
+    orden = np.argsort(a, axis=1, kind='stable')
+    ordenado = np.take_along_axis(a, orden, axis=1)
+    posiciones = np.broadcast_to(np.arange(n), a.shape)
+
+    inicio_grupo = np.ones(a.shape, dtype=bool)
+    inicio_grupo[:, 1:] = ordenado[:, 1:] != ordenado[:, :-1]
+    fin_grupo = np.ones(a.shape, dtype=bool)
+    fin_grupo[:, :-1] = inicio_grupo[:, 1:]
+
+    primero = np.maximum.accumulate(np.where(inicio_grupo, posiciones, 0), axis=1)
+    ultimo = np.minimum.accumulate(np.where(fin_grupo, posiciones, n)[:, ::-1], axis=1)[:, ::-1]
+
+    rangos = np.empty(a.shape, dtype=float)
+    np.put_along_axis(rangos, orden, (primero + ultimo) / 2 + 1, axis=1)
+    return rangos
+
+
+def _spearman_filas(x, y):
+    """Spearman por fila = Pearson sobre rangos"""
+    return _pearson_filas(_rangos_filas(x), _rangos_filas(y))
+
+
+def bootstrap_correlacion(x, y, n_bootstrap=5000, confianza=0.95, semilla=42):
+    """
+    Pearson y Spearman con IC por bootstrap percentil.
+    Genera las `n_bootstrap` réplicas como una matriz de índices y calcula todos
+    los coeficientes de una vez. Devuelve un dict con coeficientes e intervalos.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    rng = np.random.default_rng(semilla)
+    indices = rng.integers(0, n, size=(n_bootstrap, n))
+    xb, yb = x[indices], y[indices]
+
+    pearson_b = _pearson_filas(xb, yb)
+    spearman_b = _spearman_filas(xb, yb)
+
+    alfa = (1 - confianza) / 2 * 100
+    percentiles = [alfa, 100 - alfa]
+    with np.errstate(invalid='ignore'):
+        ic_pearson = np.nanpercentile(pearson_b, percentiles) if np.isfinite(pearson_b).any() else [np.nan] * 2
+        ic_spearman = np.nanpercentile(spearman_b, percentiles) if np.isfinite(spearman_b).any() else [np.nan] * 2
+
+    return {
+        'n': n,
+        'pearson': _pearson_filas(x[None, :], y[None, :])[0],
+        'pearson_ic_inf': ic_pearson[0],
+        'pearson_ic_sup': ic_pearson[1],
+        'spearman': _spearman_filas(x[None, :], y[None, :])[0],
+        'spearman_ic_inf': ic_spearman[0],
+        'spearman_ic_sup': ic_spearman[1],
+    }
+
+
+def interpretar(r):
+    """Interpretación de r según analisis_pobreza_casino.md §5.1"""
+    if pd.isna(r):
+        return 'Indeterminada'
+    if r > 0.5:
+        return 'Positiva fuerte'
+    if r > 0.3:
+        return 'Positiva moderada'
+    if r < -0.3:
+        return 'Negativa'
+    return 'Sin correlación'
+
+
+# ================================================================================
+# ANÁLISIS
+# ================================================================================
+
+class CorrelacionPobreza:
+    """
+    Correlación entre pobreza y depósitos sobre el dataset procesado por el ETL
+    (requiere las columnas de pobreza que agrega merge_datos).
+    """
+
+    def __init__(self, df, json_pobreza_path=None, n_bootstrap=5000, confianza=0.95, semilla=42):
+        """
+        - df: transacciones procesadas (p. ej. AnalyticsCasino.df)
+        - json_pobreza_path: datos_pobreza.json, necesario para los niveles 'aglomerado' y 'ciudad'
+        """
+        if 'indice_pobreza_personas' not in df.columns:
+            raise ValueError("El dataset no tiene columnas de pobreza: ejecutar el ETL con json_pobreza_path")
+        self.df = df
+        self.json_pobreza_path = json_pobreza_path
+        self.n_bootstrap = n_bootstrap
+        self.confianza = confianza
+        self.semilla = semilla
+
+    def _provincia_a_aglomerado(self):
+        """
+        Asigna a cada provincia el aglomerado (región EPH) de mayor población
+        dentro de ella según datos_pobreza.json.
+        """
+        from normalizacion import NormalizadorProvincias
+
+        pobreza = self._pobreza('aglomerado')
+        pobreza['unidad'] = NormalizadorProvincias().normalizar_serie(pobreza['provincia'])
+        principal = pobreza.sort_values('poblacion_estimada', ascending=False).drop_duplicates('unidad')
+        return principal.set_index('unidad')['aglomerado']
+
+    def _pobreza(self, nivel):
+        """datos_pobreza.json: una fila por aglomerado EPH"""
+        if not self.json_pobreza_path:
+            raise ValueError(f"El nivel '{nivel}' requiere json_pobreza_path")
+        with open(self.json_pobreza_path, 'r', encoding='utf-8') as f:
+            return pd.DataFrame(json.load(f))
+
+    def _por_ciudad(self, df):
+        """Depósitos por ciudad del aglomerado (ETLCasino.merge_datos) con los índices de esa ciudad"""
+        if 'ciudad_pobreza' not in df.columns:
+            raise ValueError("El dataset no tiene 'ciudad_pobreza': re-ejecutar el ETL con datos de pobreza")
+        pobreza = self._pobreza('ciudad').drop_duplicates('ciudad').set_index('ciudad')
+        indices = [col for col in INDICES_POBREZA if col in pobreza.columns]
+
+        por_ciudad = df[df['ciudad_pobreza'].notna()].groupby('ciudad_pobreza').agg(
+            depositos=('monto', 'count'),
+            total_ars=('monto', 'sum'),
+            usuarios=('username', 'nunique'),
+        )
+        resultado = por_ciudad.join(pobreza[['poblacion_estimada'] + indices], how='inner')
+        resultado.index.name = 'unidad'
+        return resultado
+
+    def agregar(self, nivel='provincia'):
+        """
+        Agrega depósitos por unidad geográfica y les une sus índices de pobreza.
+        Devuelve una fila por unidad con totales, per cápita y ratio depósito/ingreso.
+        """
+        if nivel not in NIVELES:
+            raise ValueError(f"Nivel no soportado: {nivel} (opciones: {', '.join(NIVELES)})")
+
+        df = self.df[(self.df['tipo'] == 'DEPOSIT') & self.df['indice_pobreza_personas'].notna()]
+        if nivel == 'ciudad':
+            return self._metricas(self._por_ciudad(df))
+
+        # Unidad de pobreza: la provincia normalizada del JOIN (CABA comparte índices con Buenos Aires)
+        clave = 'provincia_normalizada' if 'provincia_normalizada' in df.columns else 'provincia'
+
+        por_provincia = df.groupby(clave).agg(
+            depositos=('monto', 'count'),
+            total_ars=('monto', 'sum'),
+            usuarios=('username', 'nunique'),
+            poblacion_estimada=('poblacion_estimada', 'first'),
+            **{col: (col, 'first') for col in INDICES_POBREZA if col in df.columns}
+        )
+        por_provincia.index.name = 'unidad'
+
+        resultado = por_provincia
+        if nivel == 'aglomerado':
+            aglomerados = _plegar_provincias(por_provincia.index.to_series()).map(self._provincia_a_aglomerado())
+            indices = [col for col in INDICES_POBREZA if col in por_provincia.columns]
+            # Índices ponderados por población, como en ETLCasino.transform_pobreza
+            # (los usuarios se suman por provincia)
+            ponderados = por_provincia[indices].mul(por_provincia['poblacion_estimada'], axis=0)
+            resultado = pd.concat([por_provincia[['depositos', 'total_ars', 'usuarios', 'poblacion_estimada']],
+                                   ponderados], axis=1).groupby(aglomerados.values).sum()
+            resultado[indices] = resultado[indices].div(resultado['poblacion_estimada'], axis=0)
+            resultado.index.name = 'unidad'
+        return self._metricas(resultado)
+
+    @staticmethod
+    def _metricas(resultado):
+        """Per cápita, ratio depósito/ingreso y tramo de pobreza de cada unidad"""
+        resultado['monto_promedio'] = resultado['total_ars'] / resultado['depositos']
+        resultado['depositos_per_capita'] = resultado['total_ars'] / resultado['poblacion_estimada']
+        resultado['usuarios_cada_10k'] = resultado['usuarios'] / resultado['poblacion_estimada'] * 10_000
+        resultado['ratio_deposito_ingreso_pct'] = resultado['monto_promedio'] / resultado['ingreso_promedio_familia'] * 100
+        resultado['tramo_pobreza'] = pd.cut(resultado['indice_pobreza_personas'],
+                                            bins=TRAMOS_POBREZA, labels=ETIQUETAS_TRAMOS)
+        return resultado.sort_values('indice_pobreza_personas', ascending=False)
+
+    def correlaciones(self, nivel='provincia', pares=None):
+        """
+        Pearson y Spearman con IC bootstrap para cada par (x, y) sobre las unidades agregadas.
+        """
+        unidades = self.agregar(nivel)
+        filas = []
+        for x, y in pares or PARES_CORRELACION:
+            datos = unidades[[x, y]].dropna()
+            if len(datos) < 3:
+                logger.warning(f"  ⚠ {x} vs {y}: menos de 3 unidades, se omite")
+                continue
+            fila = {'x': x, 'y': y}
+            fila.update(bootstrap_correlacion(datos[x].values, datos[y].values,
+                                              self.n_bootstrap, self.confianza, self.semilla))
+            fila['interpretacion'] = interpretar(fila['pearson'])
+            filas.append(fila)
+
+        logger.info(f"  ✓ {len(filas)} correlaciones calculadas ({self.n_bootstrap:,} réplicas bootstrap, nivel={nivel})")
+        return pd.DataFrame(filas).set_index(['x', 'y']).round(4)
+
+    def por_tramo_pobreza(self, nivel='provincia'):
+        """Depósitos agregados por tramo de pobreza (Baja / Media / Media-Alta / Alta)"""
+        unidades = self.agregar(nivel)
+        resultado = unidades.groupby('tramo_pobreza', observed=False).agg(
+            Unidades=('depositos', 'count'),
+            Transacciones=('depositos', 'sum'),
+            Total_ARS=('total_ars', 'sum'),
+            Poblacion=('poblacion_estimada', 'sum'),
+        )
+        resultado['Per_Capita'] = (resultado['Total_ARS'] / resultado['Poblacion']).round(4)
+        resultado['% Monto'] = (resultado['Total_ARS'] / resultado['Total_ARS'].sum() * 100).round(1)
+        return resultado
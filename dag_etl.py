@@ -0,0 +1,268 @@
+#!/bin/python
+
+"""
+================================================================================
+EJECUCIÓN DEL ETL COMO DAG CON CHECKPOINTS
+================================================================================
+Cada etapa del ETL declara qué artefactos lee y cuáles produce (DataFrames
+con nombre: 'transacciones_crudas', 'regiones', 'derivadas', ...):
+  - Las etapas cuyas entradas están listas corren en paralelo (p. ej. la
+    preparación de regiones / pobreza mientras se parsean las transacciones)
+  - Cada etapa tiene una clave: hash de su nombre, parámetros, código (fuente
+    de los módulos que usa), archivos externos (tamaño + mtime) y las claves
+    de sus entradas. Cambiar algo invalida la etapa y todo lo que depende de ella
+  - Con `checkpoint_dir` las salidas se guardan como Parquet junto a un
+    manifiesto con la clave; en la próxima corrida las etapas sin cambios se
+    omiten y sus artefactos se leen del disco solo si una etapa posterior
+    tiene que correr
+  - Las cargas no producen artefactos: se omiten si la clave coincide y los
+    archivos que escribieron siguen intactos
+================================================================================
+"""
+
+import copy
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class Etapa:
+    """Nodo del DAG: un método de ETLCasino con sus artefactos de entrada y salida"""
+
+    def __init__(self, metodo, entradas=None, salidas=None, argumentos=(), parametros=None, archivos=(),
+                 modulos=(), produce=(), opcional=False, cortar_si_vacio=False):
+        self.nombre = metodo
+        self.metodo = metodo
+        self.entradas = entradas or {}          # atributo del ETL ← artefacto
+        self.salidas = salidas or {}            # atributo del ETL → artefacto
+        self.argumentos = tuple(argumentos)     # argumentos del método (entran en la clave)
+        self.parametros = parametros or {}
+        self.archivos = [str(a) for a in archivos]  # archivos externos que lee
+        self.modulos = ('etl_casino',) + tuple(modulos)  # código que determina el resultado
+        self.produce = [str(p) for p in produce]     # archivos que escribe (cargas)
+        self.opcional = opcional                # con alguna entrada None, las salidas son None sin ejecutar
+        self.cortar_si_vacio = cortar_si_vacio  # sin transacciones, no se ejecuta nada más
+
+
+def _huella_archivo(path):
+    """Tamaño y mtime: identifica una versión de un archivo sin leerlo"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [str(path), None]
+    return [str(path), stat.st_size, stat.st_mtime_ns]
+
+
+_fuentes = {}
+
+
+def _version_codigo(modulo):
+    """Hash del código fuente de un módulo (cacheado por proceso)"""
+    if modulo not in _fuentes:
+        spec = importlib.util.find_spec(modulo)
+        with open(spec.origin, 'rb') as f:
+            _fuentes[modulo] = hashlib.sha256(f.read()).hexdigest()
+    return _fuentes[modulo]
+
+
+class _Checkpoint:
+    """Artefacto guardado en disco que todavía no se leyó"""
+
+    def __init__(self, path, filas):
+        self.path = path
+        self.filas = filas
+
+
+class EjecutorDAG:
+    """Ejecuta las etapas en orden de dependencias, en paralelo y con checkpoints opcionales"""
+
+    def __init__(self, etl, etapas, checkpoint_dir=None, max_workers=4, forzar=False, medir_etapa=None):
+        """
+        `medir_etapa(nombre)`: context manager opcional que envuelve cada etapa
+        (p. ej. el benchmark mide la memoria de cada una; con max_workers=1 no se solapan)
+        """
+        self.etl = etl
+        self.medir_etapa = medir_etapa
+        self.etapas = list(etapas)
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.max_workers = max_workers
+        self.forzar = forzar
+        self.artefactos = {}
+        self.claves = {}
+        self.estado = {}        # etapa → 'ejecutada' / 'omitida'
+        self.segundos = {}      # etapa → duración (ejecución o restauración del checkpoint)
+        self.cortado = False
+        self._lock = threading.Lock()
+        self._validar()
+
+    def _validar(self):
+        productores = {}
+        for etapa in self.etapas:
+            for artefacto in etapa.salidas.values():
+                if artefacto in productores:
+                    raise ValueError(f"Artefacto '{artefacto}' producido por {productores[artefacto]} y {etapa.nombre}")
+                productores[artefacto] = etapa.nombre
+        for etapa in self.etapas:
+            faltantes = set(etapa.entradas.values()) - set(productores)
+            if faltantes:
+                raise ValueError(f"La etapa {etapa.nombre} lee artefactos que nadie produce: {', '.join(sorted(faltantes))}")
+
+    # ========================================================================
+    # CLAVES Y CHECKPOINTS
+    # ========================================================================
+
+    def _clave(self, etapa):
+        contenido = {
+            'etapa': etapa.nombre,
+            'argumentos': etapa.argumentos,
+            'parametros': etapa.parametros,
+            'archivos': [_huella_archivo(a) for a in etapa.archivos],
+            'codigo': [_version_codigo(m) for m in etapa.modulos],
+            'pandas': pd.__version__,
+            'entradas': {atributo: self.claves[artefacto] for atributo, artefacto in sorted(etapa.entradas.items())},
+        }
+        return hashlib.sha256(json.dumps(contenido, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _manifiesto(self, etapa):
+        return self.checkpoint_dir / f"{etapa.nombre}.json"
+
+    def _restaurar(self, etapa, clave):
+        """Artefactos del checkpoint de `etapa` si sigue vigente (misma clave, archivos intactos)"""
+        path = self._manifiesto(etapa)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            manifiesto = json.load(f)
+        if manifiesto.get('clave') != clave:
+            return None
+        if any(_huella_archivo(p) != huella for p, huella in zip(etapa.produce, manifiesto.get('produce', []))):
+            return None
+
+        salidas = {}
+        for artefacto, guardado in manifiesto['salidas'].items():
+            if guardado is None:
+                salidas[artefacto] = None
+            elif (self.checkpoint_dir / guardado['archivo']).exists():
+                salidas[artefacto] = _Checkpoint(self.checkpoint_dir / guardado['archivo'], guardado['filas'])
+            else:
+                return None
+        return salidas
+
+    def _guardar(self, etapa, clave, salidas, segundos):
+        """Parquet por artefacto + manifiesto con la clave (escrito al final: un checkpoint a medias no vale)"""
+        archivos = {}
+        try:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            self._manifiesto(etapa).unlink(missing_ok=True)
+            for artefacto, valor in salidas.items():
+                if valor is None:
+                    archivos[artefacto] = None
+                    continue
+                archivos[artefacto] = {'archivo': f"{artefacto}.parquet", 'filas': len(valor)}
+                valor.to_parquet(self.checkpoint_dir / archivos[artefacto]['archivo'])
+
+            manifiesto = {'clave': clave, 'salidas': archivos, 'produce': [_huella_archivo(p) for p in etapa.produce],
+                          'fecha': datetime.now().isoformat(timespec='seconds'), 'segundos': round(segundos, 3)}
+            temporal = self._manifiesto(etapa).with_suffix('.tmp')
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+            temporal.replace(self._manifiesto(etapa))
+        except ImportError:
+            logger.warning("⚠ pyarrow no instalado. Instala con: pip install pyarrow")
+        except Exception as e:
+            # El checkpoint es una optimización: si no se puede guardar, la corrida sigue
+            logger.warning(f"  ⚠ No se pudo guardar el checkpoint de {etapa.nombre}: {e}")
+
+    def artefacto(self, nombre):
+        """Valor de un artefacto (lo lee del checkpoint si hace falta)"""
+        with self._lock:
+            valor = self.artefactos[nombre]
+        if isinstance(valor, _Checkpoint):
+            valor = pd.read_parquet(valor.path)
+            with self._lock:
+                self.artefactos[nombre] = valor
+        return valor
+
+    # ========================================================================
+    # EJECUCIÓN
+    # ========================================================================
+
+    def _ejecutar_etapa(self, etapa):
+        with self.medir_etapa(etapa.nombre) if self.medir_etapa else nullcontext():
+            self._correr_etapa(etapa)
+
+    def _correr_etapa(self, etapa):
+        comienzo = datetime.now()
+        clave = self._clave(etapa)
+        salidas = None
+        if self.checkpoint_dir and not self.forzar:
+            salidas = self._restaurar(etapa, clave)
+
+        if salidas is not None:
+            estado = 'omitida'
+            logger.info(f"⏭  {etapa.nombre}: sin cambios, se usa el checkpoint")
+        else:
+            estado = 'ejecutada'
+            inicio = datetime.now()
+            entradas = {atributo: self.artefacto(artefacto) for atributo, artefacto in etapa.entradas.items()}
+            if etapa.opcional and any(valor is None for valor in entradas.values()):
+                salidas = dict.fromkeys(etapa.salidas.values())
+            else:
+                # Copia superficial del ETL: etapas en paralelo no se pisan los atributos
+                etl = copy.copy(self.etl)
+                for atributo, valor in entradas.items():
+                    setattr(etl, atributo, valor)
+                getattr(etl, etapa.metodo)(*etapa.argumentos, **etapa.parametros)
+                salidas = {artefacto: getattr(etl, atributo) for atributo, artefacto in etapa.salidas.items()}
+            if self.checkpoint_dir:
+                self._guardar(etapa, clave, salidas, (datetime.now() - inicio).total_seconds())
+
+        with self._lock:
+            self.artefactos.update(salidas)
+            self.claves.update(dict.fromkeys(salidas, clave))
+            self.estado[etapa.nombre] = estado
+            self.segundos[etapa.nombre] = (datetime.now() - comienzo).total_seconds()
+        if etapa.cortar_si_vacio and any(self._vacio(artefacto) for artefacto in salidas):
+            logger.info(f"✓ {etapa.nombre} no dejó transacciones: se omiten las etapas siguientes")
+            self.cortado = True
+
+    def _vacio(self, artefacto):
+        valor = self.artefactos[artefacto]
+        if isinstance(valor, _Checkpoint):
+            return valor.filas == 0
+        return isinstance(valor, pd.DataFrame) and valor.empty
+
+    def ejecutar(self):
+        """Corre el DAG completo; devuelve {etapa: 'ejecutada' | 'omitida'}"""
+        pendientes = list(self.etapas)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            en_curso = {}
+            while pendientes or en_curso:
+                if not self.cortado:
+                    for etapa in [e for e in pendientes if set(e.entradas.values()) <= set(self.artefactos)]:
+                        pendientes.remove(etapa)
+                        en_curso[pool.submit(self._ejecutar_etapa, etapa)] = etapa
+                if not en_curso:
+                    break
+                terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    etapa = en_curso.pop(futuro)
+                    try:
+                        futuro.result()
+                    except Exception:
+                        logger.error(f"✗ Falló la etapa {etapa.nombre}")
+                        for otro in en_curso:
+                            otro.cancel()
+                        raise
+        return self.estado
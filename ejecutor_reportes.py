@@ -0,0 +1,80 @@
+#!/bin/python
+
+"""
+================================================================================
+EJECUTOR CONCURRENTE DE REPORTES - CASINO POR REGIÓN
+================================================================================
+Ejecuta métodos de reporte independientes de AnalyticsCasino en paralelo
+(pool de threads o de procesos). El cálculo se hace sin imprimir; los
+resultados se devuelven en el mismo orden en que se pidieron para que la
+impresión sea determinística.
+================================================================================
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('thread', 'process')
+
+# Instancia de analytics de cada proceso worker (modo 'process')
+_analytics_worker = None
+
+
+def _inicializar_worker(analytics):
+    """Recibe la instancia una sola vez por proceso, no una vez por tarea"""
+    global _analytics_worker
+    _analytics_worker = analytics
+
+
+def _ejecutar_en_worker(metodo):
+    return getattr(_analytics_worker, metodo)(mostrar=False)
+
+
+class EjecutorReportes:
+    """
+    Ejecuta reportes independientes en paralelo sobre una instancia cargada.
+    - modo='thread': comparte el DataFrame (pandas libera el GIL en groupby/agg)
+    - modo='process': copia la instancia una vez por worker, paralelismo real
+    """
+
+    def __init__(self, analytics, max_workers=None, modo='thread'):
+        if modo not in MODOS:
+            raise ValueError(f"Modo no soportado: {modo} (opciones: {', '.join(MODOS)})")
+        self.analytics = analytics
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.modo = modo
+
+    def _crear_pool(self, n_tareas):
+        workers = max(1, min(self.max_workers, n_tareas))
+        if self.modo == 'process':
+            return ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_inicializar_worker,
+                                       initargs=(self.analytics,))
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reporte')
+
+    def ejecutar(self, metodos):
+        """
+        Ejecuta cada método (por nombre) con mostrar=False.
+        Devuelve un dict {metodo: resultado} en el orden de `metodos`.
+        """
+        metodos = list(metodos)
+        if not metodos:
+            return {}
+
+        inicio = datetime.now()
+        logger.info(f"⚙ Ejecutando {len(metodos)} reportes (modo={self.modo}, workers={self.max_workers})")
+
+        with self._crear_pool(len(metodos)) as pool:
+            if self.modo == 'process':
+                futuros = [pool.submit(_ejecutar_en_worker, metodo) for metodo in metodos]
+            else:
+                futuros = [pool.submit(getattr(self.analytics, metodo), mostrar=False) for metodo in metodos]
+            resultados = {metodo: futuro.result() for metodo, futuro in zip(metodos, futuros)}
+
+        tiempo = (datetime.now() - inicio).total_seconds()
+        logger.info(f"✓ Reportes calculados en {tiempo:.2f} segundos")
+        return resultados
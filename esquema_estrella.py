@@ -0,0 +1,153 @@
+#!/bin/python
+
+"""
+================================================================================
+ESQUEMA ESTRELLA (HEFESTO) - CASINO POR REGIÓN
+================================================================================
+Normaliza la tabla ancha del ETL en un modelo estrella:
+  - fact_deposito:   claves subrogadas enteras + medidas (monto, anomalías)
+  - dim_region:      area_code, ciudad, provincia, operador (y aglomerado de pobreza)
+  - dim_tiempo:      granularidad hora (fecha_hora, anio, mes, dia, hora, dia_semana)
+  - dim_usuario:     username, phone
+  - dim_pobreza:     índices socioeconómicos por provincia normalizada
+  - dim_transaccion: dimensión basura estado × tipo × rango_monto
+Las claves subrogadas son posiciones 0..n-1 de cada dimensión, así que unir
+una dimensión es indexar un array (dim[col][fact[clave]]), sin merge.
+================================================================================
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Dimensión → (clave subrogada, columnas naturales)
+DIMENSIONES = {
+    'dim_region': ('region_id', ['area_code', 'ciudad', 'provincia', 'operador', 'provincia_normalizada',
+                                 'ciudad_pobreza']),
+    'dim_tiempo': ('tiempo_id', ['fecha_hora']),
+    'dim_usuario': ('usuario_id', ['username', 'phone']),
+    'dim_pobreza': ('pobreza_id', ['provincia_normalizada', 'indice_pobreza_personas', 'indice_pobreza_hogares',
+                                   'indice_indigencia_personas', 'indice_indigencia_hogares',
+                                   'ingreso_promedio_familia', 'canasta_basica_total',
+                                   'brecha_pobreza_pct', 'poblacion_estimada']),
+    'dim_transaccion': ('transaccion_id', ['estado', 'tipo', 'es_exitoso', 'rango_monto']),
+}
+
+# Columnas de la tabla ancha que se reconstruyen desde dim_tiempo o se descartan
+COLUMNAS_TIEMPO = ['fecha', 'anio', 'mes', 'dia', 'hora', 'dia_semana']
+
+TABLAS = ['fact_deposito'] + list(DIMENSIONES)
+
+
+def _tipo_clave(n):
+    """Entero más angosto que representa n claves"""
+    for tipo in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def _dimension(df, columnas):
+    """Factoriza las combinaciones de `columnas` → (claves por fila, tabla de dimensión ordenada)"""
+    columnas = [c for c in columnas if c in df.columns]
+    if not columnas:
+        return None, None
+    claves = df.groupby(columnas, dropna=False, sort=True, observed=True).ngroup().to_numpy()
+    dimension = df[columnas].assign(_clave=claves).drop_duplicates('_clave').sort_values('_clave')
+    return claves.astype(_tipo_clave(len(dimension))), dimension.drop(columns='_clave').reset_index(drop=True)
+
+
+def _dim_tiempo(fecha_hora):
+    """Atributos de calendario de cada hora (mismos tipos que agregar_campos_derivados)"""
+    dim = pd.DataFrame({'fecha_hora': fecha_hora})
+    dim['fecha_dia'] = dim['fecha_hora'].dt.normalize()
+    dim['anio'] = dim['fecha_hora'].dt.year
+    dim['mes'] = dim['fecha_hora'].dt.month
+    dim['dia'] = dim['fecha_hora'].dt.day
+    dim['hora'] = dim['fecha_hora'].dt.hour
+    dim['dia_semana'] = dim['fecha_hora'].dt.day_name()
+    return dim
+
+
+def _medidas(df):
+    """Medidas de la fact: monto y columnas de anomalías, con tipos angostos"""
+    medidas = {'monto': df['monto']}
+    for columna in df.columns:
+        if columna.startswith('depositos_'):
+            medidas[columna] = pd.to_numeric(df[columna], downcast='integer')
+        elif columna.startswith('monto_') or columna in ('z_monto', 'score_anomalia'):
+            medidas[columna] = df[columna].astype(np.float32)
+        elif columna in ('flag_rafaga', 'flag_salto_monto', 'es_anomalia'):
+            medidas[columna] = df[columna].astype(bool)
+    return medidas
+
+
+def construir_estrella(df):
+    """
+    Construye fact_deposito y las dimensiones a partir de la tabla ancha procesada.
+    Devuelve un dict {nombre_tabla: DataFrame}.
+    """
+    tablas = {}
+    fact = {}
+
+    fecha_hora = df['fecha'].dt.floor('h')
+    for nombre, (clave, columnas) in DIMENSIONES.items():
+        origen = df.assign(fecha_hora=fecha_hora) if nombre == 'dim_tiempo' else df
+        claves, dimension = _dimension(origen, columnas)
+        if dimension is None:
+            continue
+        if nombre == 'dim_tiempo':
+            dimension = _dim_tiempo(dimension['fecha_hora'])
+        tablas[nombre] = dimension
+        fact[clave] = claves
+
+    # Milisegundos dentro de la hora (0..3.599.999): junto con dim_tiempo reconstruyen la fecha exacta
+    fact['milisegundo'] = ((df['fecha'] - fecha_hora) // pd.Timedelta(milliseconds=1)).astype(np.int32).to_numpy()
+    fact.update({col: valores.to_numpy() for col, valores in _medidas(df).items()})
+    tablas['fact_deposito'] = pd.DataFrame(fact)
+    return {nombre: tablas[nombre] for nombre in TABLAS if nombre in tablas}
+
+
+def expandir_estrella(tablas):
+    """
+    Inversa de construir_estrella: tabla ancha con las columnas naturales de cada dimensión,
+    la fecha exacta y las medidas (lo necesario para volver a construir el esquema)
+    """
+    fact = tablas['fact_deposito']
+    claves = {clave for clave, _ in DIMENSIONES.values()}
+    columnas = {}
+    for nombre, (clave, naturales) in DIMENSIONES.items():
+        if nombre not in tablas or clave not in fact.columns:
+            continue
+        dimension = tablas[nombre]
+        if nombre == 'dim_tiempo':
+            fecha_hora = dimension['fecha_hora'].take(fact[clave]).reset_index(drop=True)
+            columnas['fecha'] = fecha_hora + pd.to_timedelta(fact['milisegundo'], unit='ms')
+            continue
+        for columna in naturales:
+            if columna in dimension.columns and columna not in columnas:
+                columnas[columna] = dimension[columna].take(fact[clave]).reset_index(drop=True)
+    for columna in fact.columns:
+        if columna not in claves and columna != 'milisegundo':
+            columnas[columna] = fact[columna]
+    return pd.DataFrame(columnas)
+
+
+def guardar_estrella(tablas, directorio):
+    """Escribe cada tabla como Parquet en `directorio`"""
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    for nombre, tabla in tablas.items():
+        tabla.to_parquet(directorio / f"{nombre}.parquet", index=False)
+    return directorio
+
+
+def cargar_estrella(directorio, tablas=None):
+    """Lee las tablas del esquema estrella (todas o las indicadas)"""
+    directorio = Path(directorio)
+    return {nombre: pd.read_parquet(directorio / f"{nombre}.parquet")
+            for nombre in (tablas or TABLAS) if (directorio / f"{nombre}.parquet").exists()}
@@ -12,39 +12,133 @@ Fecha: 2025-10-14
 """
 
 import pandas as pd
+import numpy as np
+import glob
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 # ================================================================================
 # CONFIGURACIÓN DE LOGGING
 # ================================================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('etl_casino.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Etapas opcionales de ejecutar(): detección de anomalías y cada carga con su archivo de salida
+ETAPAS_OPCIONALES = ('anomalias', 'csv', 'parquet', 'rollup', 'alertas', 'db', 'estrella')
+ARCHIVOS_SALIDA = {
+    'csv': 'casino_procesado.csv',
+    'parquet': 'casino_procesado.parquet',
+    'rollup': 'casino_rollup_diario.parquet',
+    'alertas': 'casino_alertas.csv',
+    'db': 'casino.db',
+    'estrella': 'estrella',
+}
+
+# Modos de las cargas a archivo y SQLite: recrear la salida o sumar las filas de la corrida
+MODOS_CARGA = ('reemplazar', 'agregar')
+
+# Extensiones reconocidas al leer un directorio de exportaciones (pandas infiere la compresión)
+EXTENSIONES_CSV = ('.csv', '.csv.gz', '.csv.bz2', '.csv.zip', '.csv.xz', '.csv.zst')
+
+
+def resolver_archivos(csv_path):
+    """
+    Archivos de transacciones de `csv_path`: un archivo, una lista, un directorio
+    (CSV comprimidos o no) o un glob. Ordenados por nombre para que el resultado sea estable.
+    """
+    if isinstance(csv_path, (list, tuple)):
+        return [Path(p) for p in csv_path]
+    ruta = Path(csv_path)
+    if ruta.is_dir():
+        archivos = [p for p in ruta.iterdir() if p.is_file() and p.name.lower().endswith(EXTENSIONES_CSV)]
+    elif glob.has_magic(str(csv_path)):
+        archivos = [Path(p) for p in glob.glob(str(csv_path), recursive=True) if Path(p).is_file()]
+    else:
+        return [ruta]
+    if not archivos:
+        raise FileNotFoundError(f"No hay archivos CSV en {csv_path}")
+    return sorted(archivos)
+
+
+def _validar_modo(modo):
+    if modo not in MODOS_CARGA:
+        raise ValueError(f"Modo no soportado: {modo} (opciones: {', '.join(MODOS_CARGA)})")
+
+
+def _escribir_csv(df, output_path, modo='reemplazar'):
+    """
+    Escribe `df` como CSV. Con modo='agregar' suma las filas a un CSV existente
+    (si cambiaron las columnas lo reescribe con la unión).
+    """
+    _validar_modo(modo)
+    path = Path(output_path)
+    if modo == 'agregar' and path.exists() and path.stat().st_size:
+        columnas = list(pd.read_csv(path, nrows=0).columns)
+        if columnas == list(df.columns):
+            df.to_csv(path, mode='a', header=False, index=False, encoding='utf-8')
+            return
+        # Las filas previas se releen como texto: se reescriben tal cual estaban
+        df = pd.concat([pd.read_csv(path, dtype=str, keep_default_na=False, na_values=['']), df],
+                       ignore_index=True)
+    df.to_csv(path, index=False, encoding='utf-8')
+
+
+def _escribir_parquet(df, output_path, modo='reemplazar'):
+    """
+    Escribe `df` como Parquet. Con modo='agregar' lo concatena al Parquet existente.
+    Se escribe a un temporal y se renombra: un fallo no deja el archivo a medias.
+    """
+    _validar_modo(modo)
+    path = Path(output_path)
+    if modo == 'agregar' and path.exists():
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+    temporal = path.with_name(path.name + '.tmp')
+    df.to_parquet(temporal, index=False)
+    temporal.replace(path)
+
+
+def configurar_logging(log_path='etl_casino.log', nivel=logging.INFO):
+    """Log a consola y, si se indica `log_path`, a archivo (se llama al ejecutar, no al importar)"""
+    handlers = [logging.StreamHandler()]
+    if log_path:
+        handlers.insert(0, logging.FileHandler(log_path))
+    logging.basicConfig(
+        level=nivel,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
 class ETLCasino:
     """
     Clase que implementa el ETL para análisis regional de depósitos en casino.
     Sigue la metodología Hefesto: Extract → Transform → Load
     """
     
-    def __init__(self, csv_path, json_path, json_pobreza_path=None):
-        """Inicializa rutas de archivos"""
+    def __init__(self, csv_path, json_path, json_pobreza_path=None, lectores=8, muestra=None, semilla_muestra=42):
+        """
+        Inicializa rutas de archivos. `csv_path` puede ser un CSV, un directorio o un glob
+        de exportaciones; `lectores` acota los hilos que los leen en paralelo.
+        Con `muestra` (filas por estrato) el ETL corre sobre una muestra estratificada
+        por provincia × tipo × mes en lugar de las exportaciones completas (ver muestreo.py).
+        """
         self.csv_path = csv_path
+        self.lectores = lectores
+        self.muestra = muestra
+        self.semilla_muestra = semilla_muestra
         self.json_path = json_path
         self.json_pobreza_path = json_pobreza_path
         self.df_transacciones = None
         self.df_regiones = None
         self.df_pobreza = None
+        self.df_pobreza_ciudades = None
+        self.normalizador_provincias = None
         self.df_procesado = None
+        self.df_alertas = None
+        self.detector_anomalias = None
+        self.indice_ingesta = None
+        self.tiempos_etapas = {}
         self.area_code_set = None
         self.area_code_to_prov = None
         logger.info("ETL inicializado")
@@ -53,14 +147,42 @@ class ETLCasino:
     # ETAPA 1: EXTRACCIÓN (EXTRACT)
     # ============================================================================
     
-    def extract_csv(self):
+    def _leer_csv(self, path):
+        """Lee una exportación con el esquema compartido: todas las columnas como texto"""
+        df = pd.read_csv(path, dtype=str)
+        df.columns = df.columns.str.lower().str.strip()
+        return df
+
+    def extract_csv(self, por_estrato=None, semilla=42):
         """
         Extrae datos del CSV de transacciones del casino.
+        Con varios archivos (directorio o glob) los lee en paralelo con un pool acotado
+        y los concatena; 'archivo_origen' registra de qué archivo vino cada fila.
+        Con `por_estrato` extrae solo una muestra estratificada (ver extract_muestra).
         Maneja posibles errores de lectura.
         """
+        if por_estrato:
+            return self.extract_muestra(por_estrato, semilla)
         try:
-            logger.info(f"Extrayendo datos de {self.csv_path}")
-            self.df_transacciones = pd.read_csv(self.csv_path)
+            archivos = resolver_archivos(self.csv_path)
+            logger.info(f"Extrayendo datos de {self.csv_path} ({len(archivos)} archivo(s))")
+            if len(archivos) == 1:
+                partes = [self._leer_csv(archivos[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.lectores, len(archivos))) as pool:
+                    partes = list(pool.map(self._leer_csv, archivos))
+
+            columnas = list(partes[0].columns)
+            for archivo, parte in zip(archivos, partes):
+                if list(parte.columns) != columnas:
+                    logger.warning(f"  ⚠ {archivo} tiene columnas distintas: {list(parte.columns)}")
+
+            df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+            df['archivo_origen'] = pd.Categorical.from_codes(
+                np.repeat(np.arange(len(archivos)), [len(p) for p in partes]),
+                categories=[str(a) for a in archivos])
+
+            self.df_transacciones = df
             logger.info(f"✓ CSV extraído: {len(self.df_transacciones)} filas")
             logger.info(f"  Columnas: {list(self.df_transacciones.columns)}")
             return self.df_transacciones
@@ -71,6 +193,31 @@ class ETLCasino:
             logger.error(f"✗ Error al extraer CSV: {e}")
             raise
     
+    def extract_muestra(self, por_estrato=200, semilla=42):
+        """
+        Muestra estratificada (provincia × tipo × mes) de las exportaciones en una sola
+        pasada. Las filas traen 'peso_muestra' para expandir resultados al total.
+        """
+        from muestreo import MuestreoEstratificado
+
+        try:
+            archivos = resolver_archivos(self.csv_path)
+            logger.info(f"Muestreando {self.csv_path} ({len(archivos)} archivo(s), {por_estrato} filas por estrato)")
+            # El muestreo necesita la provincia de cada código de área antes que transform_regiones
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                regiones = pd.DataFrame(json.load(f))
+            area_code_to_prov = dict(zip(regiones['areaCode'].astype(str).str.strip(), regiones['province']))
+
+            muestreo = MuestreoEstratificado(area_code_to_prov, por_estrato=por_estrato, semilla=semilla)
+            self.df_transacciones, _ = muestreo.muestrear(archivos)
+            return self.df_transacciones
+        except FileNotFoundError as e:
+            logger.error(f"✗ Archivo no encontrado: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"✗ Error al muestrear CSV: {e}")
+            raise
+
     def extract_json_regiones(self):
         """
         Extrae datos de regiones desde JSON.
@@ -125,34 +272,25 @@ class ETLCasino:
 
     def normalizar_provincia(self, provincia):
         """
-        Normaliza nombres de provincias para hacer match entre diferentes fuentes.
-        Elimina acentos y estandariza nombres.
+        Normaliza un nombre de provincia para hacer match entre diferentes fuentes
+        (sin acentos, con alias; ver normalizacion.py). Para columnas enteras usar
+        NormalizadorProvincias.normalizar_serie, que resuelve cada nombre distinto una vez.
         """
-        if pd.isna(provincia):
-            return None
-
-        # Diccionario de normalización
-        normalizacion = {
-            'CÓRDOBA': 'CORDOBA',
-            'CORDOBA': 'CORDOBA',
-            'NEUQUÉN': 'NEUQUEN',
-            'NEUQUEN': 'NEUQUEN',
-            'RÍO NEGRO': 'RIO NEGRO',
-            'RIO NEGRO': 'RIO NEGRO',
-            'TUCUMÁN': 'TUCUMAN',
-            'TUCUMAN': 'TUCUMAN',
-            'CIUDAD DE BUENOS AIRES': 'BUENOS AIRES',  # CABA se mapea a Buenos Aires
-        }
+        from normalizacion import NormalizadorProvincias
 
-        provincia_upper = str(provincia).upper().strip()
-        return normalizacion.get(provincia_upper, provincia_upper)
+        if self.normalizador_provincias is None:
+            self.normalizador_provincias = NormalizadorProvincias()
+        return self.normalizador_provincias.normalizar(provincia)
 
     def transform_pobreza(self):
         """
         Transforma datos de pobreza:
         - Normaliza nombres de provincias
+        - Conserva los índices por aglomerado (df_pobreza_ciudades) para el JOIN por ciudad
         - Elimina duplicados por provincia (agregando promedios si hay múltiples ciudades)
         """
+        from normalizacion import NormalizadorProvincias
+
         if self.df_pobreza is None:
             logger.warning("⚠ No hay datos de pobreza para transformar")
             return None
@@ -161,8 +299,8 @@ class ETLCasino:
 
         df = self.df_pobreza.copy()
 
-        # 1. Normalizar nombres de provincias
-        df['provincia_normalizada'] = df['provincia'].apply(self.normalizar_provincia)
+        # 1. Normalizar nombres de provincias (una vez por nombre distinto)
+        df['provincia_normalizada'] = NormalizadorProvincias().normalizar_serie(df['provincia'])
 
         # Detectar cuáles provincias fueron normalizadas
         df['provincia_upper'] = df['provincia'].str.upper().str.strip()
@@ -179,6 +317,9 @@ class ETLCasino:
         # Limpiar columnas temporales
         df = df.drop(columns=['provincia_upper'])
 
+        # Índices por aglomerado: la ciudad de datos_pobreza.json identifica el aglomerado
+        self.df_pobreza_ciudades = df.rename(columns={'ciudad': 'ciudad_pobreza'})
+
         # 2. Para provincias con múltiples aglomerados, calculamos promedio ponderado por población
         # (esto es importante para Buenos Aires que tiene CABA + GBA)
         columnas_indices = [
@@ -266,12 +407,14 @@ class ETLCasino:
         df = df[mask_valid_phone].copy()
 
         # 3. Extraer código de área (solo sobre teléfonos válidos)
+        if not self.area_code_set and self.df_regiones is not None:
+            self._indexar_regiones()
         df['area_code'] = df['phone'].apply(self.extract_area_code)
         logger.info("  ✓ Códigos de área extraídos (solo teléfonos +54)")
 
 
-        # 3. Convertir fecha a datetime
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+        # 3. Convertir fecha a datetime (ISO 8601 con o sin milisegundos / 'T'; el resto queda nulo)
+        df['fecha'] = pd.to_datetime(df['fecha'], format='ISO8601', errors='coerce')
 
         # Eliminar filas con fechas nulas
         filas_antes_fecha = len(df)
@@ -342,16 +485,16 @@ class ETLCasino:
         # Normalizar areaCode sin ceros iniciales (por si vinieron como "034" o "011")
         df['areaCode'] = df['areaCode'].str.lstrip('0')
 
-        # Crear set y diccionario para matching rápido
-        self.area_code_set = set(df['areaCode'].astype(str).unique())
-        # mapping area_code -> provincia (normalizada)
-        self.area_code_to_prov = df.set_index('areaCode')['province'].to_dict()
-
-        logger.info(f"  ✓ Diccionario de códigos de área creado ({len(self.area_code_set)} códigos)")
-
-        
         self.df_regiones = df
+        self._indexar_regiones()
+        logger.info(f"  ✓ Diccionario de códigos de área creado ({len(self.area_code_set)} códigos)")
         return df
+
+    def _indexar_regiones(self):
+        """Set y diccionario para matching rápido, a partir de las regiones ya transformadas"""
+        self.area_code_set = set(self.df_regiones['areaCode'].astype(str).unique())
+        # mapping area_code -> provincia (normalizada)
+        self.area_code_to_prov = self.df_regiones.set_index('areaCode')['province'].to_dict()
     
     def merge_datos(self):
         """
@@ -373,8 +516,8 @@ class ETLCasino:
         
         # Preparar DataFrames
         trans = self.df_transacciones.copy()
-        regiones = self.df_regiones[['areaCode', 'province', 'city']].copy()
-        regiones.columns = ['area_code', 'provincia', 'ciudad']
+        regiones = self.df_regiones[['areaCode', 'province', 'city', 'carrier']].copy()
+        regiones.columns = ['area_code', 'provincia', 'ciudad', 'operador']
         
         # JOIN
         df_merge = trans.merge(
@@ -398,12 +541,31 @@ class ETLCasino:
         if filas_eliminadas_provincia > 0:
             logger.warning(f"  ⚠ Eliminadas {filas_eliminadas_provincia} filas sin match de provincia")
 
-        # JOIN con datos de pobreza (si están disponibles)
-        if self.df_pobreza is not None:
+        # JOIN con datos de pobreza (si están disponibles y quedaron filas)
+        if self.df_pobreza is not None and not df_merge.empty:
+            from normalizacion import EmparejadorCiudades, NormalizadorProvincias
+
             logger.info("🔗 Realizando JOIN con datos de pobreza...")
 
-            # Normalizar provincia en transacciones para hacer match
-            df_merge['provincia_normalizada'] = df_merge['provincia'].apply(self.normalizar_provincia)
+            # Normalizar provincia en transacciones para hacer match: se resuelve cada nombre
+            # distinto (con aproximación contra las provincias de pobreza) y se mapea por código
+            normalizador = NormalizadorProvincias(self.df_pobreza['provincia_normalizada'])
+            df_merge['provincia_normalizada'] = normalizador.normalizar_serie(df_merge['provincia'])
+
+            # Aglomerado de cada ciudad (una resolución por par provincia × ciudad distinto)
+            if self.df_pobreza_ciudades is not None:
+                emparejador = EmparejadorCiudades(
+                    self.df_pobreza_ciudades[['provincia_normalizada', 'ciudad_pobreza']].itertuples(index=False))
+                df_merge['ciudad_pobreza'] = emparejador.emparejar_columnas(df_merge['provincia_normalizada'],
+                                                                            df_merge['ciudad'])
+                con_ciudad = df_merge['ciudad_pobreza'].notna().sum()
+                logger.info(f"  ✓ Ciudades emparejadas con aglomerados: {emparejador.resumen()} "
+                            f"({100*con_ciudad/len(df_merge):.1f}% de los registros)")
+                bonaerenses = df_merge['provincia_normalizada'] == 'BUENOS AIRES'
+                if bonaerenses.any():
+                    sin_ciudad = df_merge.loc[bonaerenses, 'ciudad_pobreza'].isna().mean()
+                    logger.info(f"  ℹ Buenos Aires: {100*sin_ciudad:.1f}% de los registros sin aglomerado "
+                                f"(localidades fuera del GBA y de los aglomerados EPH)")
 
             # JOIN con datos de pobreza
             df_merge = df_merge.merge(
@@ -446,9 +608,40 @@ class ETLCasino:
         df['hora'] = df['fecha'].dt.hour
         logger.info("  ✓ Componentes de fecha extraídos")    
         
+        # 2. Clasificación de monto por terciles (BAJO ≤ P33 < MEDIO ≤ P66 < ALTO)
+        p33, p66 = df['monto'].quantile([0.33, 0.66])
+        df['rango_monto'] = 'ALTO'
+        df.loc[df['monto'] <= p66, 'rango_monto'] = 'MEDIO'
+        df.loc[df['monto'] <= p33, 'rango_monto'] = 'BAJO'
+        logger.info(f"  ✓ Rangos de monto asignados (P33=${p33:,.2f}, P66=${p66:,.2f})")
+        
+        # 3. Flag de éxito
+        df['es_exitoso'] = (df['estado'] == 'SUCCESS').astype(int)
+        logger.info("  ✓ Flag de éxito calculado")
+        
         self.df_transacciones = df
         return df
     
+    def detectar_anomalias(self, **opciones):
+        """
+        Velocidad de depósitos por usuario en ventanas de tiempo y flags de anomalía
+        (ráfagas, saltos de monto). Ver anomalias.py para las opciones del detector.
+        El detector se conserva en self.detector_anomalias: llamadas directas sucesivas
+        sobre el mismo objeto con chunks nuevos continúan las ventanas y el historial.
+        En ejecutar() la etapa corre sobre una copia del ETL, así que cada corrida
+        arranca un detector nuevo (las corridas con índice no evalúan ventanas que
+        crucen ingestas).
+        """
+        from anomalias import DetectorAnomalias
+
+        logger.info("🚨 Detectando anomalías de depósitos...")
+        if self.detector_anomalias is None or opciones:
+            self.detector_anomalias = DetectorAnomalias(**opciones)
+
+        self.df_transacciones = self.detector_anomalias.procesar(self.df_transacciones)
+        self.df_alertas = self.detector_anomalias.tabla_alertas()
+        return self.df_transacciones
+    
     def validar_calidad(self):
         """
         Realiza validaciones de calidad de datos.
@@ -514,26 +707,63 @@ class ETLCasino:
 
         logger.info("✓ Validaciones completadas")
     
+    def deduplicar(self, indice_path='casino_indice_ingesta.npy'):
+        """
+        Descarta las transacciones ya cargadas en corridas anteriores (y las repetidas
+        dentro del lote) según el índice persistente de claves (ver indice_ingesta.py).
+        El índice se actualiza en confirmar_ingesta(), después de las cargas.
+        """
+        from indice_ingesta import IndiceIngesta
+
+        logger.info(f"🔑 Deduplicando contra el índice de ingesta {indice_path}...")
+        self.indice_ingesta = IndiceIngesta(indice_path)
+        df, _, stats = self.indice_ingesta.filtrar_nuevas(self.df_transacciones)
+        logger.info(f"  ✓ {stats['nuevas']:,} filas nuevas de {stats['filas']:,} "
+                    f"(índice: {len(self.indice_ingesta):,} claves)")
+        if stats['ya_ingeridas']:
+            logger.info(f"  ℹ {stats['ya_ingeridas']:,} filas ya ingeridas en corridas anteriores")
+        if stats['repetidas_en_lote']:
+            logger.warning(f"  ⚠ {stats['repetidas_en_lote']:,} filas repetidas dentro del lote")
+
+        self.df_transacciones = df
+        return df
+
+    def confirmar_ingesta(self):
+        """Agrega al índice las claves de las transacciones cargadas en esta corrida"""
+        from indice_ingesta import claves_filas
+
+        if self.indice_ingesta is None:
+            return None
+        total = self.indice_ingesta.agregar(claves_filas(self.df_transacciones, self.indice_ingesta.campos))
+        logger.info(f"🔑 Índice de ingesta actualizado: {len(self.df_transacciones):,} claves nuevas, "
+                    f"{total:,} en total")
+        return total
+    
     # ============================================================================
     # ETAPA 3: CARGA (LOAD)
     # ============================================================================
     
-    def load_csv(self, output_path='casino_procesado.csv'):
-        """Exporta datos procesados a CSV"""
+    def load_csv(self, output_path='casino_procesado.csv', modo='reemplazar'):
+        """Exporta datos procesados a CSV (modo='agregar' suma las filas de esta corrida)"""
         try:
             logger.info(f"💾 Exportando datos a {output_path}")
 
             # Seleccionar columnas relevantes (incluir datos de pobreza si existen)
             cols_export = [
-                'username', 'phone', 'area_code', 'provincia', 'ciudad',
-                'monto', 'fecha', 'anio', 'mes', 'dia', 'hora',
-                'estado', 'tipo', 'dia_semana'
+                'username', 'phone', 'area_code', 'provincia', 'ciudad', 'operador',
+                'monto', 'fecha', 'anio', 'mes', 'dia', 'hora', 'rango_monto',
+                'estado', 'tipo', 'es_exitoso', 'dia_semana', 'archivo_origen', 'peso_muestra'
             ]
 
+            # Velocidad de depósitos y flags de anomalía (detectar_anomalias)
+            cols_export.extend(col for col in self.df_transacciones.columns
+                               if col.startswith(('depositos_', 'monto_')))
+            cols_export.extend(['z_monto', 'flag_rafaga', 'flag_salto_monto', 'score_anomalia', 'es_anomalia'])
+
             # Agregar columnas de pobreza si están disponibles
             if 'indice_pobreza_personas' in self.df_transacciones.columns:
                 cols_pobreza = [
-                    'indice_pobreza_personas', 'indice_pobreza_hogares',
+                    'provincia_normalizada', 'ciudad_pobreza', 'indice_pobreza_personas', 'indice_pobreza_hogares',
                     'indice_indigencia_personas', 'indice_indigencia_hogares',
                     'ingreso_promedio_familia', 'canasta_basica_total',
                     'brecha_pobreza_pct', 'poblacion_estimada'
@@ -545,7 +775,7 @@ class ETLCasino:
             cols_export = [col for col in cols_export if col in self.df_transacciones.columns]
 
             df_export = self.df_transacciones[cols_export].copy()
-            df_export.to_csv(output_path, index=False, encoding='utf-8')
+            _escribir_csv(df_export, output_path, modo)
 
             logger.info(f"✓ Archivo guardado: {output_path}")
             logger.info(f"  - Filas: {len(df_export)}")
@@ -555,11 +785,11 @@ class ETLCasino:
             logger.error(f"✗ Error al exportar CSV: {e}")
             raise
     
-    def load_parquet(self, output_path='casino_procesado.parquet'):
-        """Exporta datos procesados a Parquet (formato optimizado)"""
+    def load_parquet(self, output_path='casino_procesado.parquet', modo='reemplazar'):
+        """Exporta datos procesados a Parquet (formato optimizado; modo='agregar' suma las filas)"""
         try:
-            logger.info(f"💾 Exportando datos a {output_path}")
-            self.df_transacciones.to_parquet(output_path, index=False)
+            logger.info(f"💾 Exportando datos a {output_path} (modo={modo})")
+            _escribir_parquet(self.df_transacciones, output_path, modo)
             logger.info(f"✓ Archivo Parquet guardado: {output_path}")
             return output_path
         except ImportError:
@@ -568,43 +798,268 @@ class ETLCasino:
             logger.error(f"✗ Error al exportar Parquet: {e}")
             raise
     
+    def load_rollup(self, output_path='casino_rollup_diario.parquet', modo='reemplazar'):
+        """
+        Actualiza el rollup diario (día × hora × provincia × tipo) de forma incremental.
+        modo='reemplazar' reescribe los días del lote; 'sumar' acumula (ver serie_temporal.py)
+        """
+        from serie_temporal import actualizar_rollup
+
+        try:
+            logger.info(f"💾 Actualizando rollup diario en {output_path} (modo={modo})")
+            rollup = actualizar_rollup(output_path, self.df_transacciones, modo=modo)
+            logger.info(f"✓ Rollup guardado: {len(rollup)} filas "
+                        f"({rollup['fecha_dia'].min():%Y-%m-%d} a {rollup['fecha_dia'].max():%Y-%m-%d})")
+            return output_path
+        except ImportError:
+            logger.warning("⚠ pyarrow no instalado. Instala con: pip install pyarrow")
+        except Exception as e:
+            logger.error(f"✗ Error al actualizar rollup: {e}")
+            raise
+    
+    def load_alertas(self, output_path='casino_alertas.csv', modo='reemplazar'):
+        """Exporta la tabla de alertas de anomalías (una fila por depósito anómalo; modo='agregar' las suma)"""
+        if self.df_alertas is None:
+            logger.warning("⚠ No hay alertas: ejecutar detectar_anomalias primero")
+            return None
+        try:
+            logger.info(f"💾 Exportando alertas a {output_path}")
+            _escribir_csv(self.df_alertas, output_path, modo)
+            logger.info(f"✓ Alertas guardadas: {len(self.df_alertas)} filas")
+            return output_path
+        except Exception as e:
+            logger.error(f"✗ Error al exportar alertas: {e}")
+            raise
+    
+    def load_estrella(self, output_dir='estrella', modo='reemplazar'):
+        """
+        Exporta el modelo estrella Hefesto (fact_deposito + dim_region, dim_tiempo,
+        dim_usuario, dim_pobreza, dim_transaccion) como Parquet en `output_dir`.
+        modo='agregar' reconstruye el esquema con las filas previas más las de esta corrida
+        (las claves subrogadas son posiciones: no se puede anexar solo la fact)
+        """
+        from esquema_estrella import cargar_estrella, construir_estrella, expandir_estrella, guardar_estrella
+
+        _validar_modo(modo)
+        try:
+            logger.info(f"💾 Exportando esquema estrella a {output_dir} (modo={modo})")
+            df = self.df_transacciones
+            if modo == 'agregar' and (Path(output_dir) / 'fact_deposito.parquet').exists():
+                df = pd.concat([expandir_estrella(cargar_estrella(output_dir)), df], ignore_index=True)
+            tablas = construir_estrella(df)
+            guardar_estrella(tablas, output_dir)
+            for nombre, tabla in tablas.items():
+                logger.info(f"  ✓ {nombre}: {len(tabla):,} filas × {len(tabla.columns)} columnas")
+            return output_dir
+        except ImportError:
+            logger.warning("⚠ pyarrow no instalado. Instala con: pip install pyarrow")
+        except Exception as e:
+            logger.error(f"✗ Error al exportar esquema estrella: {e}")
+            raise
+    
+    def load_muestra(self, output_path='muestra.json'):
+        """
+        Marca el directorio de salida como muestreado: metadatos de la muestra (sobre las
+        transacciones extraídas, antes de limpiar) que los reportes muestran en sus títulos
+        """
+        from muestreo import ARCHIVO_MUESTRA
+
+        df = self.df_transacciones
+        metadatos = {
+            'muestra': True,
+            'fuente': str(self.csv_path),
+            'por_estrato': self.muestra,
+            'semilla': self.semilla_muestra,
+            'filas_leidas': int(round(df['peso_muestra'].sum())),
+            'filas_muestra': len(df),
+            'estratos': int(df['estrato_muestra'].nunique()),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+        }
+        if Path(output_path).name != ARCHIVO_MUESTRA:
+            logger.warning(f"⚠ Los reportes buscan los metadatos de la muestra en {ARCHIVO_MUESTRA}")
+        logger.info(f"💾 Guardando metadatos de la muestra en {output_path}")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(metadatos, f, ensure_ascii=False, indent=2)
+        return output_path
+
+    def load_db(self, db_path='casino.db', tabla='transacciones', modo='reemplazar', tam_lote=50_000):
+        """
+        Carga masiva a SQLite con esquema tipado (ver almacen_sqlite.py).
+        modo='reemplazar' recrea la tabla; 'agregar' suma las filas de esta corrida
+        """
+        from almacen_sqlite import AlmacenSQLite
+
+        try:
+            logger.info(f"💾 Cargando datos en SQLite {db_path} (tabla={tabla}, modo={modo})")
+            stats = AlmacenSQLite(db_path, tabla=tabla, tam_lote=tam_lote).cargar(self.df_transacciones, modo=modo)
+            logger.info(f"✓ {stats['filas']:,} filas cargadas en {stats['segundos']:.2f} segundos "
+                        f"({stats['filas_por_segundo']:,.0f} filas/s, {stats['filas_previas']:,} previas)")
+            return db_path
+        except Exception as e:
+            logger.error(f"✗ Error al cargar SQLite: {e}")
+            raise
+    
     # ============================================================================
     # EJECUCIÓN DEL ETL COMPLETO
     # ============================================================================
     
-    def ejecutar(self):
-        """Ejecuta todas las etapas del ETL"""
+    def etapas_dag(self, output_dir='./datos_salida', etapas=ETAPAS_OPCIONALES, modo_db='reemplazar',
+                   indice_path=None):
+        """
+        El ETL como DAG (ver dag_etl.py): cada etapa con los artefactos que lee y produce.
+        Regiones y pobreza se preparan en paralelo con la extracción de transacciones.
+        Con `indice_path` las cargas a archivo agregan las filas nuevas (el rollup las suma).
+        """
+        from dag_etl import Etapa
+
+        output_dir = Path(output_dir)
+        muestreo = {'por_estrato': self.muestra, 'semilla': self.semilla_muestra} if self.muestra else {}
+        dag = [
+            Etapa('extract_csv', salidas={'df_transacciones': 'transacciones_crudas'}, parametros=muestreo,
+                  archivos=resolver_archivos(self.csv_path) + ([self.json_path] if self.muestra else []),
+                  modulos=['muestreo'] if self.muestra else []),
+            Etapa('extract_json_regiones', salidas={'df_regiones': 'regiones_crudas'}, archivos=[self.json_path]),
+            Etapa('extract_json_pobreza', salidas={'df_pobreza': 'pobreza_cruda'},
+                  archivos=[self.json_pobreza_path] if self.json_pobreza_path else []),
+            Etapa('transform_regiones', {'df_regiones': 'regiones_crudas'}, {'df_regiones': 'regiones'}),
+            Etapa('transform_pobreza', {'df_pobreza': 'pobreza_cruda'},
+                  {'df_pobreza': 'pobreza', 'df_pobreza_ciudades': 'pobreza_ciudades'},
+                  modulos=['normalizacion'], opcional=True),
+            Etapa('transform_transacciones', {'df_transacciones': 'transacciones_crudas', 'df_regiones': 'regiones'},
+                  {'df_transacciones': 'transacciones'}, cortar_si_vacio=True),
+        ]
+        transacciones = 'transacciones'
+        if indice_path:
+            dag.append(Etapa('deduplicar', {'df_transacciones': 'transacciones'}, {'df_transacciones': 'nuevas'},
+                             argumentos=[str(indice_path)], archivos=[indice_path], modulos=['indice_ingesta'],
+                             cortar_si_vacio=True))
+            transacciones = 'nuevas'
+
+        dag += [
+            Etapa('merge_datos', {'df_transacciones': transacciones, 'df_regiones': 'regiones', 'df_pobreza': 'pobreza',
+                                  'df_pobreza_ciudades': 'pobreza_ciudades'},
+                  {'df_transacciones': 'unidas'}, modulos=['normalizacion'], cortar_si_vacio=True),
+            Etapa('agregar_campos_derivados', {'df_transacciones': 'unidas'}, {'df_transacciones': 'derivadas'}),
+            # validar_calidad descarta filas con campos críticos nulos: las etapas siguientes leen su salida
+            Etapa('validar_calidad', {'df_transacciones': 'derivadas'}, {'df_transacciones': 'validadas'}),
+        ]
+        procesadas = 'validadas'
+        if 'anomalias' in etapas:
+            dag.append(Etapa('detectar_anomalias', {'df_transacciones': 'validadas'},
+                             {'df_transacciones': 'procesadas', 'df_alertas': 'alertas'}, modulos=['anomalias']))
+            procesadas = 'procesadas'
+        elif 'alertas' in etapas:
+            logger.warning("⚠ La etapa 'alertas' necesita 'anomalias': se omite")
+
+        if self.muestra:
+            path = str(output_dir / 'muestra.json')
+            dag.append(Etapa('load_muestra', {'df_transacciones': 'transacciones_crudas'}, argumentos=[path],
+                             modulos=['muestreo'], produce=[path]))
+
+        # Con índice cada corrida trae solo filas nuevas: reemplazar las salidas perdería las anteriores
+        modo = 'agregar' if indice_path else 'reemplazar'
+        cargas = {
+            'csv': ({'modo': modo}, []),
+            'parquet': ({'modo': modo}, []),
+            'rollup': ({'modo': 'sumar' if indice_path else 'reemplazar'}, ['serie_temporal']),
+            'alertas': ({'modo': modo}, []),
+            'db': ({'modo': modo_db}, ['almacen_sqlite', 'convertir']),
+            'estrella': ({'modo': modo}, ['esquema_estrella']),
+        }
+        for etapa, (parametros, modulos) in cargas.items():
+            if etapa not in etapas or (etapa == 'alertas' and 'anomalias' not in etapas):
+                continue
+            entradas = {'df_alertas': 'alertas'} if etapa == 'alertas' else {'df_transacciones': procesadas}
+            path = str(output_dir / ARCHIVOS_SALIDA[etapa])
+            dag.append(Etapa(f'load_{etapa}', entradas, argumentos=[path], parametros=parametros,
+                             modulos=modulos, produce=[path]))
+        return dag, procesadas
+
+    def ejecutar(self, output_dir='./datos_salida', etapas=ETAPAS_OPCIONALES, modo_db=None,
+                 indice_path=None, checkpoint_dir=None, forzar=False, max_workers=4, medir_etapa=None):
+        """
+        Ejecuta el ETL como DAG de etapas (ver etapas_dag). Extracción, transformación y
+        validación siempre corren; `etapas` elige las opcionales (ver ETAPAS_OPCIONALES)
+        y `output_dir` dónde se escriben.
+        `modo_db='agregar'` acumula en la base SQLite en lugar de recrearla (por defecto
+        'agregar' con índice y 'reemplazar' sin él).
+        Con `indice_path` solo se procesan las transacciones no ingeridas antes: CSV, Parquet,
+        alertas, esquema estrella y SQLite agregan esas filas y el rollup las suma
+        ('reemplazar' se rechaza: el índice marcaría como cargadas filas que se borran).
+        Con `muestra` (ver __init__) las salidas quedan marcadas con muestra.json y 'peso_muestra'.
+        Con `checkpoint_dir` cada etapa guarda su resultado y una corrida posterior
+        retoma desde la primera etapa cuyo código, parámetros o entradas cambiaron
+        (`forzar=True` ignora los checkpoints).
+        `medir_etapa` envuelve cada etapa (ver EjecutorDAG; lo usa benchmark_casino.py).
+        """
+        from dag_etl import EjecutorDAG
+
+        desconocidas = set(etapas) - set(ETAPAS_OPCIONALES)
+        if desconocidas:
+            raise ValueError(f"Etapas no soportadas: {', '.join(sorted(desconocidas))} "
+                             f"(opciones: {', '.join(ETAPAS_OPCIONALES)})")
+        if self.muestra and indice_path:
+            raise ValueError("El índice de ingesta no se usa con muestra: marcaría como cargadas solo las filas muestreadas")
+        if modo_db is None:
+            modo_db = 'agregar' if indice_path else 'reemplazar'
+        elif indice_path and modo_db == 'reemplazar':
+            raise ValueError("Con índice de ingesta la base se carga en modo 'agregar': 'reemplazar' dejaría "
+                             "solo las filas nuevas y el índice marcaría las anteriores como cargadas")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if not self.muestra:
+            # Una corrida completa sobre un directorio de vista previa deja de estar muestreada
+            (output_dir / 'muestra.json').unlink(missing_ok=True)
+        
         inicio = datetime.now()
         logger.info("=" * 80)
         logger.info("INICIANDO ETL CASINO")
         logger.info("=" * 80)
         
         try:
-            # EXTRACT
-            logger.info("\n📥 ETAPA 1: EXTRACCIÓN")
-            self.extract_csv()
-            self.extract_json_regiones()
-            self.extract_json_pobreza()
-
-            # TRANSFORM
-            logger.info("\n🔄 ETAPA 2: TRANSFORMACIÓN")
-            self.transform_regiones()
-            if self.df_pobreza is not None:
-                self.transform_pobreza()
-            self.transform_transacciones()
-            self.merge_datos()
-            self.agregar_campos_derivados()
-            self.validar_calidad()
-            
-            # LOAD
-            logger.info("\n📤 ETAPA 3: CARGA")
-            self.load_csv('./datos_salida/casino_procesado.csv')
-            self.load_parquet('./datos_salida/casino_procesado.parquet')
+            etapas_dag, procesadas = self.etapas_dag(output_dir, etapas, modo_db, indice_path)
+            dag = EjecutorDAG(self, etapas_dag, checkpoint_dir=checkpoint_dir, max_workers=max_workers,
+                              forzar=forzar, medir_etapa=medir_etapa)
+            estado = dag.ejecutar()
+            self.tiempos_etapas = dict(dag.segundos)
+
+            # Resultado en el ETL (desde memoria o desde el checkpoint)
+            atributos = {'df_regiones': 'regiones', 'df_pobreza': 'pobreza', 'df_alertas': 'alertas'}
+            for atributo, artefacto in atributos.items():
+                if artefacto in dag.artefactos:
+                    setattr(self, atributo, dag.artefacto(artefacto))
+            if self.df_regiones is not None:
+                self._indexar_regiones()
+
+            if dag.cortado:
+                ultima = next(a for a in ('unidas', 'nuevas', 'transacciones') if a in dag.artefactos)
+                self.df_transacciones = dag.artefacto(ultima)
+                if indice_path:
+                    logger.info("✓ Sin transacciones nuevas: nada para cargar")
+                    return self.df_transacciones
+                # Corrida completa sin filas válidas (export vacío o malformado): las salidas de una
+                # corrida anterior siguen en output_dir y los reportes las leerían como actuales
+                previas = [str(output_dir / ARCHIVOS_SALIDA[etapa]) for etapa in etapas
+                           if etapa in ARCHIVOS_SALIDA and (output_dir / ARCHIVOS_SALIDA[etapa]).exists()]
+                logger.warning("⚠ No quedaron transacciones válidas: no se cargó nada")
+                if previas:
+                    logger.warning(f"⚠ Las salidas existentes NO se actualizaron (son de una corrida anterior): "
+                                   f"{', '.join(previas)}")
+                return self.df_transacciones
+            self.df_transacciones = dag.artefacto(procesadas)
+
+            if indice_path:
+                from indice_ingesta import IndiceIngesta
+                self.indice_ingesta = IndiceIngesta(indice_path)
+                self.confirmar_ingesta()
             
             # RESUMEN
+            omitidas = [nombre for nombre, e in estado.items() if e == 'omitida']
             tiempo_total = (datetime.now() - inicio).total_seconds()
             logger.info("\n" + "=" * 80)
             logger.info(f"✅ ETL COMPLETADO EXITOSAMENTE en {tiempo_total:.2f} segundos")
+            if omitidas:
+                logger.info(f"   {len(omitidas)} etapas sin cambios tomadas del checkpoint: {', '.join(omitidas)}")
             logger.info("=" * 80)
             
             return self.df_transacciones
@@ -618,24 +1073,8 @@ class ETLCasino:
 # ================================================================================
 
 if __name__ == "__main__":
-    # Configurar rutas
-    csv_file = "./datos_entrada/casino_transacciones.csv"           # Tu archivo CSV
-    json_file = "./datos_entrada/regiones_argentina.json"           # Tu archivo JSON regiones
-    json_pobreza_file = "./datos_entrada/datos_pobreza.json"        # Tu archivo JSON pobreza
-
-    # Crear instancia y ejecutar ETL
-    etl = ETLCasino(csv_file, json_file, json_pobreza_file)
-    df_final = etl.ejecutar()
-    
-    # Mostrar muestra de datos finales
-    logger.info("\n📊 MUESTRA DE DATOS PROCESADOS:")
-    logger.info(df_final.head(10).to_string())
-    
-    # Estadísticas finales
-    logger.info("\n📈 ESTADÍSTICAS FINALES:")
-    logger.info(f"Total depósitos: {len(df_final):,}")
-    logger.info(f"Monto total: ${df_final['monto'].sum():,.2f}")
-    logger.info(f"Monto promedio: ${df_final['monto'].mean():,.2f}")
-    logger.info(f"Provincias: {df_final['provincia'].nunique()}")
-    logger.info(f"Ciudades: {df_final['ciudad'].nunique()}")
-    logger.info(f"\nDepositos por provincia:\n{df_final.groupby('provincia')['monto'].agg(['count', 'sum', 'mean']).round(2)}")
+    # Rutas y etapas por argumento: python etl_casino.py --help (ver casino.py)
+    import sys
+    from casino import main
+
+    sys.exit(main(['etl'] + sys.argv[1:]))
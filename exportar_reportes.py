@@ -0,0 +1,189 @@
+#!/bin/python
+
+"""
+================================================================================
+EXPORTACIÓN DE REPORTES - CASINO POR REGIÓN
+================================================================================
+Calcula las hojas de reporte a partir de una instancia de AnalyticsCasino ya
+cargada (o de resultados precalculados) sin imprimir en consola, y las escribe:
+  - En Excel con un writer en streaming (memoria constante)
+  - Como bundle Parquet / CSV / JSON para herramientas de BI
+================================================================================
+"""
+
+import json
+import logging
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Hoja del reporte → método de AnalyticsCasino que la calcula
+HOJAS_REPORTE = [
+    ('Por Provincia', 'analisis_por_provincia'),
+    ('Por Operador', 'analisis_por_operador'),
+    ('Temporal Mensual', 'analisis_por_mes'),
+    ('Por Hora', 'analisis_por_hora'),
+    ('Rangos Monto', 'analisis_rangos_monto'),
+    ('Segmentación Usuarios', 'usuarios_por_volume'),
+    ('Top Ciudades', 'analisis_por_ciudad'),
+]
+
+FORMATOS_BUNDLE = ('parquet', 'csv', 'json')
+
+
+# ================================================================================
+# CÁLCULO DE HOJAS
+# ================================================================================
+
+def calcular_hojas(analytics, hojas=None, max_workers=None):
+    """
+    Calcula las hojas del reporte sobre una instancia ya cargada, sin imprimir
+    (en paralelo con EjecutorReportes).
+    Devuelve un dict {nombre_hoja: DataFrame} en el orden de HOJAS_REPORTE.
+    """
+    from ejecutor_reportes import EjecutorReportes
+
+    hojas = hojas or HOJAS_REPORTE
+    resultados = EjecutorReportes(analytics, max_workers=max_workers).ejecutar(metodo for _, metodo in hojas)
+    return {nombre: resultados[metodo] for nombre, metodo in hojas}
+
+
+def _resolver_resultados(fuente):
+    """Acepta resultados precalculados (dict) o una instancia de AnalyticsCasino"""
+    if isinstance(fuente, dict):
+        return fuente
+    return calcular_hojas(fuente)
+
+
+def _preparar_tabla(resultado):
+    """
+    Aplana un resultado a una tabla plana serializable:
+    índice como columna, periodos/categorías como texto y nombres de columna str.
+    """
+    tabla = resultado.reset_index()
+    tabla.columns = [str(col) for col in tabla.columns]
+    for col in tabla.columns:
+        dtype = tabla[col].dtype
+        if isinstance(dtype, (pd.PeriodDtype, pd.CategoricalDtype)):
+            tabla[col] = tabla[col].astype(str)
+    return tabla
+
+
+def _nombre_archivo(nombre_hoja):
+    """'Segmentación Usuarios' → 'segmentacion_usuarios'"""
+    sin_acentos = unicodedata.normalize('NFKD', nombre_hoja).encode('ascii', 'ignore').decode('ascii')
+    return '_'.join(sin_acentos.lower().split())
+
+
+def _filas(tabla):
+    """Itera filas como tuplas de valores nativos (NaN → None)"""
+    valores = tabla.astype(object).where(tabla.notna(), None)
+    for fila in valores.itertuples(index=False, name=None):
+        yield [v.item() if hasattr(v, 'item') else v for v in fila]
+
+
+# ================================================================================
+# EXCEL EN STREAMING
+# ================================================================================
+
+def _escribir_xlsxwriter(tablas, output_path):
+    """Escribe con xlsxwriter en modo constant_memory (fila por fila)"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    try:
+        negrita = workbook.add_format({'bold': True})
+        for nombre, tabla in tablas.items():
+            worksheet = workbook.add_worksheet(nombre[:31])
+            worksheet.write_row(0, 0, list(tabla.columns), negrita)
+            for i, fila in enumerate(_filas(tabla), start=1):
+                worksheet.write_row(i, 0, fila)
+    finally:
+        workbook.close()
+
+
+def _escribir_openpyxl(tablas, output_path):
+    """Escribe con openpyxl en modo write_only (fila por fila)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for nombre, tabla in tablas.items():
+        worksheet = workbook.create_sheet(nombre[:31])
+        worksheet.append(list(tabla.columns))
+        for fila in _filas(tabla):
+            worksheet.append(fila)
+    workbook.save(output_path)
+
+
+def exportar_excel(fuente, output_path='./datos_salida/casino_reportes.xlsx'):
+    """
+    Exporta las hojas del reporte a Excel con un writer en streaming.
+    `fuente` puede ser una instancia de AnalyticsCasino o un dict de resultados.
+    Usa xlsxwriter (constant_memory) y, si no está, openpyxl (write_only).
+    """
+    inicio = datetime.now()
+    tablas = {nombre: _preparar_tabla(r) for nombre, r in _resolver_resultados(fuente).items()}
+
+    logger.info(f"💾 Exportando {len(tablas)} hojas a {output_path}")
+    try:
+        _escribir_xlsxwriter(tablas, output_path)
+    except ImportError:
+        try:
+            _escribir_openpyxl(tablas, output_path)
+        except ImportError:
+            logger.warning("⚠ Ni xlsxwriter ni openpyxl instalados. Instala con: pip install xlsxwriter")
+            return None
+
+    tiempo = (datetime.now() - inicio).total_seconds()
+    logger.info(f"✓ Reportes exportados a {output_path} en {tiempo:.2f} segundos")
+    return output_path
+
+
+# ================================================================================
+# BUNDLE PARA BI (PARQUET / CSV / JSON)
+# ================================================================================
+
+def exportar_bundle(fuente, output_dir='./datos_salida/reportes', formato='parquet'):
+    """
+    Escribe cada hoja del reporte como un archivo independiente en `output_dir`
+    (parquet, csv o json) más un manifest.json con el índice del bundle.
+    Devuelve la lista de archivos generados.
+    """
+    if formato not in FORMATOS_BUNDLE:
+        raise ValueError(f"Formato no soportado: {formato} (opciones: {', '.join(FORMATOS_BUNDLE)})")
+
+    inicio = datetime.now()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    resultados = _resolver_resultados(fuente)
+    logger.info(f"💾 Exportando bundle {formato} ({len(resultados)} reportes) a {output_dir}")
+
+    archivos = []
+    manifest = []
+    for nombre, resultado in resultados.items():
+        tabla = _preparar_tabla(resultado)
+        archivo = output_dir / f"{_nombre_archivo(nombre)}.{formato}"
+
+        if formato == 'parquet':
+            tabla.to_parquet(archivo, index=False)
+        elif formato == 'csv':
+            tabla.to_csv(archivo, index=False, encoding='utf-8')
+        else:
+            tabla.to_json(archivo, orient='records', force_ascii=False, date_format='iso')
+
+        archivos.append(archivo)
+        manifest.append({'reporte': nombre, 'archivo': archivo.name, 'filas': len(tabla),
+                         'columnas': list(tabla.columns)})
+
+    with open(output_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump({'generado': datetime.now().isoformat(timespec='seconds'),
+                   'formato': formato, 'reportes': manifest}, f, ensure_ascii=False, indent=2)
+
+    tiempo = (datetime.now() - inicio).total_seconds()
+    logger.info(f"✓ Bundle exportado: {len(archivos)} archivos en {tiempo:.2f} segundos")
+    return archivos
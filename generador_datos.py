@@ -0,0 +1,276 @@
+#!/bin/python
+
+"""
+================================================================================
+GENERADOR DE DATOS SINTÉTICOS - CASINO POR REGIÓN
+================================================================================
+Genera un casino_transacciones.csv determinístico (misma semilla → mismo
+archivo) para pruebas y benchmarks a cualquier escala:
+  - Usuarios con teléfono fijo sobre los códigos de área reales de
+    regiones_argentina.json (celular +549, fijo +54, con 0 de más)
+  - Actividad por usuario con cola larga, horario con pico nocturno
+  - Formatos de fecha ISO mezclados (con y sin milisegundos, separador 'T')
+  - Estado / tipo con mayúsculas mezcladas
+  - Filas sucias a tasas configurables (ver TASAS_SUCIAS)
+Se escribe por bloques de FILAS_BLOQUE filas: la memoria no depende del tamaño.
+================================================================================
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Filas por bloque de escritura; fijo para que el archivo dependa solo de (filas, semilla, tasas)
+FILAS_BLOQUE = 250_000
+
+# Fracción de filas de cada tipo de suciedad (excluyentes entre sí)
+TASAS_SUCIAS = {
+    'telefono_invalido': 0.010,   # sin +54: vacío, 'N/A', nacional con 0, extranjero
+    'area_desconocida': 0.005,    # +54 con un código de área inexistente
+    'fecha_invalida': 0.005,      # vacía, texto o formato no ISO (DD/MM/AAAA)
+    'monto_invalido': 0.005,      # 0, negativo, texto o vacío
+    'duplicado': 0.002,           # copia exacta de una fila anterior del bloque
+}
+
+# Formatos válidos de fecha y su peso (todos ISO 8601)
+FORMATOS_FECHA = {
+    'milisegundos': 0.85,   # 2025-10-14 19:30:58.954
+    'segundos': 0.10,       # 2025-10-14 19:30:58
+    'iso_t': 0.05,          # 2025-10-14T19:30:58
+}
+
+ESTADOS = {'SUCCESS': 0.85, 'FAILED': 0.10, 'PENDING': 0.05}
+TIPOS = {'DEPOSIT': 0.70, 'WITHDRAWAL': 0.30}
+MONTOS = {100: 0.10, 200: 0.12, 500: 0.25, 1000: 0.20, 1500: 0.08, 2000: 0.10,
+          2500: 0.05, 5000: 0.06, 10000: 0.03, 20000: 0.01}
+
+# Peso relativo de cada hora del día (pico nocturno)
+PERFIL_HORARIO = np.array([6, 5, 4, 3, 2, 1, 1, 1, 2, 3, 3, 4,
+                           4, 4, 4, 4, 5, 5, 6, 7, 8, 9, 9, 8], dtype=float)
+
+NOMBRES = ['marco', 'lucia', 'juan', 'sofia', 'diego', 'valen', 'martin', 'caro', 'nico', 'flor',
+           'pablo', 'agus', 'santi', 'cami', 'mati', 'juli', 'fede', 'romi', 'gonza', 'mica']
+
+
+def _elegir(rng, pesos, n):
+    """n valores de las claves de `pesos` según su probabilidad"""
+    claves = np.array(list(pesos))
+    probabilidades = np.array(list(pesos.values()), dtype=float)
+    return claves[rng.choice(len(claves), size=n, p=probabilidades / probabilidades.sum())]
+
+
+def _mezclar(rng, n, opciones):
+    """Para cada una de n filas, el valor de una de `opciones` (escalar o array de largo n) al azar"""
+    eleccion = rng.integers(0, len(opciones), size=n)
+    resultado = np.empty(n, dtype=object)
+    for i, opcion in enumerate(opciones):
+        mascara = eleccion == i
+        resultado[mascara] = opcion[mascara] if isinstance(opcion, np.ndarray) else opcion
+    return resultado
+
+
+def _semilla(semilla, *clave):
+    """Generador independiente por bloque: el bloque i no depende de cuántos se generen antes"""
+    return np.random.default_rng(np.random.SeedSequence(semilla, spawn_key=clave))
+
+
+def _digitos(rng, n, largo):
+    """n strings de `largo` dígitos (con ceros a la izquierda)"""
+    return pd.Series(rng.integers(0, 10 ** largo, size=n)).astype(str).str.zfill(largo)
+
+
+class GeneradorTransacciones:
+    """Generador determinístico de transacciones de casino sobre los códigos de área reales"""
+
+    def __init__(self, regiones_path='./datos_entrada/regiones_argentina.json', semilla=42,
+                 usuarios=None, fecha_inicio='2025-01-01', dias=180, tasas_sucias=None,
+                 tasa_mayusculas_mixtas=0.02):
+        with open(regiones_path, 'r', encoding='utf-8') as f:
+            regiones = json.load(f)
+
+        # Un código por ciudad: los códigos con más localidades reciben más usuarios
+        self.codigos = np.array([r['areaCode'] for r in regiones])
+        self.codigos_desconocidos = self._prefijos_desconocidos(set(self.codigos))
+        self.semilla = semilla
+        self.usuarios = usuarios
+        self.fecha_inicio = np.datetime64(fecha_inicio, 'ms')
+        self.dias = dias
+        self.tasas_sucias = {**TASAS_SUCIAS, **(tasas_sucias or {})}
+        self.tasa_mayusculas_mixtas = tasa_mayusculas_mixtas
+
+        desconocidas = set(self.tasas_sucias) - set(TASAS_SUCIAS)
+        if desconocidas:
+            raise ValueError(f"Tasas no soportadas: {', '.join(sorted(desconocidas))} "
+                             f"(opciones: {', '.join(TASAS_SUCIAS)})")
+        if sum(self.tasas_sucias.values()) >= 1:
+            raise ValueError("La suma de las tasas de filas sucias debe ser menor a 1")
+
+    @staticmethod
+    def _prefijos_desconocidos(codigos):
+        """Prefijos de 4 dígitos que no empiezan con ningún código de área real (2, 3 o 4 dígitos)"""
+        return np.array([p for p in map(str, range(1000, 10000))
+                         if p[:2] not in codigos and p[:3] not in codigos and p not in codigos])
+
+    # ========================================================================
+    # USUARIOS
+    # ========================================================================
+
+    def _crear_usuarios(self, rng, n):
+        """Username, teléfono y peso de actividad de cada usuario"""
+        codigos = self.codigos[rng.integers(0, len(self.codigos), size=n)]
+        largo_codigo = pd.Series(codigos).str.len().to_numpy()
+
+        # Número nacional de 10 dígitos: código de área + abonado
+        abonado = pd.Series(rng.integers(0, 10 ** 8, size=n)).astype(str).str.zfill(8)
+        abonado = pd.Series([a[:10 - largo] for a, largo in zip(abonado, largo_codigo)])
+        prefijo = _elegir(rng, {'+549': 0.85, '+54': 0.12, '+5490': 0.03}, n)
+
+        # Sufijo numérico sin repetir: cada username es un usuario distinto
+        nombres = np.array(NOMBRES)[rng.integers(0, len(NOMBRES), size=n)]
+        largo = max(6, len(str(n)) + 1)
+        sufijos = pd.Series(rng.choice(10 ** largo, size=n, replace=False)).astype(str).str.zfill(largo)
+        usuarios = pd.DataFrame({
+            'username': pd.Series(nombres) + sufijos,
+            'phone': pd.Series(prefijo) + pd.Series(codigos) + abonado,
+        })
+        # Actividad con cola larga (Pareto): pocos usuarios concentran muchas transacciones
+        pesos = rng.pareto(1.5, size=n) + 1
+        return usuarios, pesos / pesos.sum()
+
+    # ========================================================================
+    # BLOQUES
+    # ========================================================================
+
+    def _fechas(self, rng, n, desde, hasta):
+        """Fechas ordenadas en [desde, hasta) con el perfil horario, en formatos ISO mezclados"""
+        dias = rng.integers(desde, hasta, size=n).astype('timedelta64[D]')
+        horas = rng.choice(24, size=n, p=PERFIL_HORARIO / PERFIL_HORARIO.sum()).astype('timedelta64[h]')
+        ms = rng.integers(0, 3_600_000, size=n).astype('timedelta64[ms]')
+        fechas = np.sort(self.fecha_inicio + dias + horas + ms)
+
+        formato = _elegir(rng, FORMATOS_FECHA, n)
+        texto = pd.Series(np.datetime_as_string(fechas, unit='ms')).str.replace('T', ' ', regex=False)
+        sin_ms = formato != 'milisegundos'
+        texto[sin_ms] = texto[sin_ms].str[:19]
+        iso_t = formato == 'iso_t'
+        texto[iso_t] = texto[iso_t].str.replace(' ', 'T', regex=False)
+        return texto
+
+    def _ensuciar(self, rng, bloque):
+        """
+        Reemplaza una fracción de filas por cada tipo de suciedad.
+        Devuelve el conteo por tipo y cuántas filas debería descartar el ETL.
+        """
+        n = len(bloque)
+        limites = np.cumsum(list(self.tasas_sucias.values()))
+        tipo_sucio = np.searchsorted(limites, rng.random(n), side='right')
+        descartable = np.isin(tipo_sucio, [i for i, nombre in enumerate(self.tasas_sucias) if nombre != 'duplicado'])
+        conteo = {}
+
+        for i, nombre in enumerate(self.tasas_sucias):
+            filas = np.flatnonzero(tipo_sucio == i)
+            k = len(filas)
+            conteo[nombre] = k
+            if nombre == 'telefono_invalido':
+                nacional = _digitos(rng, k, 10)
+                bloque.loc[filas, 'phone'] = _mezclar(rng, k, [
+                    '', 'N/A', ('0' + nacional).to_numpy(), ('+1' + nacional).to_numpy()])
+            elif nombre == 'area_desconocida':
+                prefijos = self.codigos_desconocidos[rng.integers(0, len(self.codigos_desconocidos), size=k)]
+                bloque.loc[filas, 'phone'] = ('+549' + pd.Series(prefijos) + _digitos(rng, k, 6)).to_numpy()
+            elif nombre == 'fecha_invalida':
+                fechas = pd.to_datetime(bloque.loc[filas, 'fecha'], format='ISO8601')
+                bloque.loc[filas, 'fecha'] = _mezclar(rng, k, [
+                    '', 'sin fecha', fechas.dt.strftime('%d/%m/%Y %H:%M').to_numpy()])
+            elif nombre == 'monto_invalido':
+                bloque.loc[filas, 'monto'] = _mezclar(rng, k, ['0', '-500', 'abc', ''])
+            elif nombre == 'duplicado':
+                # Copia exacta de una fila anterior del bloque (hereda si era descartable)
+                filas = filas[filas > 0]
+                origen = (rng.random(len(filas)) * filas).astype(int)
+                bloque.iloc[filas] = bloque.iloc[origen].to_numpy()
+                descartable[filas] = descartable[origen]
+                conteo[nombre] = len(filas)
+        return conteo, int(descartable.sum())
+
+    def generar_bloque(self, indice, filas, usuarios, pesos, total_bloques):
+        """Bloque `indice` de `total_bloques`: cubre su tramo del período, así el archivo queda ordenado"""
+        rng = _semilla(self.semilla, indice + 1)
+        desde = self.dias * indice // total_bloques
+        hasta = max(desde + 1, self.dias * (indice + 1) // total_bloques)
+
+        elegidos = rng.choice(len(usuarios), size=filas, p=pesos)
+        monto = pd.Series(_elegir(rng, MONTOS, filas)).astype(str)
+        # Una parte de los montos no son redondos (cargas con centavos)
+        libres = rng.random(filas) < 0.10
+        monto[libres] = pd.Series(rng.lognormal(7, 1, size=libres.sum()) + 0.01).map('{:.2f}'.format).to_numpy()
+
+        bloque = pd.DataFrame({
+            'username': usuarios['username'].to_numpy()[elegidos],
+            'phone': usuarios['phone'].to_numpy()[elegidos],
+            'monto': monto.to_numpy(),
+            'fecha': self._fechas(rng, filas, desde, hasta).to_numpy(),
+            'estado': _elegir(rng, ESTADOS, filas),
+            'tipo': _elegir(rng, TIPOS, filas),
+        })
+        for columna in ('estado', 'tipo'):
+            mixtas = rng.random(filas) < self.tasa_mayusculas_mixtas
+            bloque.loc[mixtas, columna] = bloque.loc[mixtas, columna].str.capitalize()
+        return (bloque, *self._ensuciar(rng, bloque))
+
+    # ========================================================================
+    # ARCHIVO
+    # ========================================================================
+
+    def generar(self, output_path, filas):
+        """
+        Escribe `filas` transacciones en `output_path` (CSV con el formato de entrada del ETL).
+        Devuelve un resumen con las filas sucias por tipo y las filas válidas esperadas.
+        """
+        inicio = datetime.now()
+        rng = _semilla(self.semilla, 0)
+        n_usuarios = self.usuarios or max(100, filas // 40)
+        usuarios, pesos = self._crear_usuarios(rng, n_usuarios)
+
+        total_bloques = max(1, -(-filas // FILAS_BLOQUE))
+        logger.info(f"🎲 Generando {filas:,} transacciones ({n_usuarios:,} usuarios, semilla={self.semilla}) "
+                    f"→ {output_path}")
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        sucias = dict.fromkeys(self.tasas_sucias, 0)
+        descartadas = 0
+        for indice in range(total_bloques):
+            n = min(FILAS_BLOQUE, filas - indice * FILAS_BLOQUE)
+            bloque, conteo, descartables = self.generar_bloque(indice, n, usuarios, pesos, total_bloques)
+            bloque.to_csv(output_path, mode='w' if indice == 0 else 'a', header=indice == 0,
+                          index=False, encoding='utf-8')
+            for nombre, cantidad in conteo.items():
+                sucias[nombre] += cantidad
+            descartadas += descartables
+
+        tiempo = (datetime.now() - inicio).total_seconds()
+        logger.info(f"✓ {filas:,} filas en {tiempo:.2f} segundos; sucias: "
+                    + ', '.join(f"{k}={v:,}" for k, v in sucias.items()))
+        return {'filas': filas, 'usuarios': n_usuarios, 'semilla': self.semilla, 'sucias': sucias,
+                'filas_validas_esperadas': filas - descartadas, 'segundos': tiempo}
+
+
+def generar_transacciones(output_path='./datos_entrada/casino_transacciones.csv', filas=100_000, semilla=42,
+                          regiones_path='./datos_entrada/regiones_argentina.json', **opciones):
+    """Atajo: GeneradorTransacciones(...).generar(output_path, filas)"""
+    generador = GeneradorTransacciones(regiones_path, semilla=semilla, **opciones)
+    return generador.generar(output_path, filas)
+
+
+if __name__ == "__main__":
+    # python casino.py generate --help
+    import sys
+    from casino import main
+
+    sys.exit(main(['generate'] + sys.argv[1:]))
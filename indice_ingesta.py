@@ -0,0 +1,132 @@
+#!/bin/python
+
+"""
+================================================================================
+ÍNDICE DE INGESTA - CASINO POR REGIÓN
+================================================================================
+Ingesta exactamente-una-vez de exportaciones que se solapan (cada dump diario
+repite los últimos días):
+  - Cada transacción se resume en una clave de 64 bits (hash de sus campos
+    identificatorios ya normalizados por el ETL)
+  - Las claves ya cargadas se guardan ordenadas en un .npy; la búsqueda es
+    np.searchsorted vectorizado, sin falsos positivos (a diferencia de un
+    filtro de Bloom, que descartaría filas nuevas)
+  - Las claves del lote se agregan recién cuando la carga terminó bien:
+    una corrida fallida no marca filas como vistas
+Con 64 bits la probabilidad de colisión es ~n²/2⁶⁵ (≈3·10⁻⁶ con 10M filas).
+================================================================================
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Campos que identifican una transacción. El estado queda afuera: una exportación
+# posterior puede traer la misma transacción con otro estado y no es una fila nueva.
+CAMPOS_CLAVE = ('username', 'phone', 'fecha', 'monto', 'tipo')
+
+
+def claves_filas(df, campos=CAMPOS_CLAVE):
+    """
+    Clave uint64 por fila. Fechas y montos se llevan a una representación fija
+    (ns / float64) para que la clave no dependa de cómo se parseó cada archivo.
+    """
+    faltantes = [c for c in campos if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para la clave de ingesta: {', '.join(faltantes)}")
+
+    normalizado = {}
+    for campo in campos:
+        serie = df[campo]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = serie.astype('datetime64[ns]').astype('int64')
+        elif pd.api.types.is_numeric_dtype(serie):
+            serie = serie.astype('float64')
+        else:
+            serie = serie.astype(str).str.strip()
+        normalizado[campo] = serie.to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame(normalizado), index=False).to_numpy()
+
+
+class IndiceIngesta:
+    """Conjunto persistente de claves de 64 bits de las transacciones ya cargadas"""
+
+    def __init__(self, path='./datos_salida/casino_indice_ingesta.npy', campos=CAMPOS_CLAVE):
+        self.path = Path(path)
+        self.campos = tuple(campos)
+        self.claves = self._leer()
+
+    def _leer(self):
+        if not self.path.exists():
+            return np.empty(0, dtype=np.uint64)
+        return np.load(self.path)
+
+    def __len__(self):
+        return len(self.claves)
+
+    def _contiene_ordenadas(self, ordenadas):
+        """contiene() para claves ya ordenadas: la búsqueda recorre el índice en orden (amigable con la caché)"""
+        if not len(self.claves):
+            return np.zeros(len(ordenadas), dtype=bool)
+        posiciones = np.searchsorted(self.claves, ordenadas)
+        posiciones[posiciones == len(self.claves)] = 0
+        return self.claves[posiciones] == ordenadas
+
+    def contiene(self, claves):
+        """Máscara booleana: qué claves ya están en el índice (búsqueda binaria vectorizada)"""
+        claves = np.asarray(claves, dtype=np.uint64)
+        orden = np.argsort(claves)
+        mascara = np.empty(len(claves), dtype=bool)
+        mascara[orden] = self._contiene_ordenadas(claves[orden])
+        return mascara
+
+    def filtrar_nuevas(self, df):
+        """
+        Filas de `df` que no fueron ingeridas antes (ni repetidas dentro del mismo lote,
+        se conserva la primera). Devuelve (df_nuevas, claves_nuevas, estadísticas).
+        El índice no se modifica: confirmar con agregar() después de cargar.
+        """
+        claves = claves_filas(df, self.campos)
+        # Un solo ordenamiento (estable) resuelve la búsqueda y las repetidas del lote
+        orden = np.argsort(claves, kind='stable')
+        ordenadas = claves[orden]
+        primera_vez = np.ones(len(claves), dtype=bool)
+        primera_vez[1:] = ordenadas[1:] != ordenadas[:-1]
+
+        vistas = np.empty(len(claves), dtype=bool)
+        vistas[orden] = self._contiene_ordenadas(ordenadas)
+        primera = np.empty(len(claves), dtype=bool)
+        primera[orden] = primera_vez
+
+        nuevas = ~vistas & primera
+        stats = {
+            'filas': len(df),
+            'nuevas': int(nuevas.sum()),
+            'ya_ingeridas': int(vistas.sum()),
+            'repetidas_en_lote': int((~vistas & ~primera).sum()),
+        }
+        return df[nuevas], claves[nuevas], stats
+
+    def agregar(self, claves):
+        """
+        Agrega `claves` y guarda el índice. Se relee el archivo antes de unir para no
+        perder claves que otra corrida haya agregado mientras tanto.
+        """
+        self.claves = self._leer()
+        # np.sort + máscara de vecinos en lugar de np.unique (bastante más lento con uint64)
+        nuevas = np.sort(np.asarray(claves, dtype=np.uint64))
+        nuevas = nuevas[np.concatenate([[True], nuevas[1:] != nuevas[:-1]])]
+        nuevas = nuevas[~self._contiene_ordenadas(nuevas)]
+        self.claves = np.sort(np.concatenate([self.claves, nuevas]))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.path.with_name(self.path.name + '.tmp')
+        with open(temporal, 'wb') as f:
+            np.save(f, self.claves)
+        os.replace(temporal, self.path)
+        return len(self.claves)
@@ -0,0 +1,134 @@
+#!/bin/python
+
+"""
+================================================================================
+MUESTREO ESTRATIFICADO - MODO VISTA PREVIA
+================================================================================
+Muestra chica pero representativa de las exportaciones de transacciones para
+corridas de desarrollo (a diferencia de head(), que por venir ordenado por
+fecha cubre pocos días y pocas provincias):
+  - Una sola pasada en streaming (lectura por chunks): la memoria depende de
+    la cantidad de estratos, no del tamaño del archivo
+  - Estrato = provincia (por prefijo telefónico) × tipo × mes
+  - Reservoir sampling por estrato con prioridades aleatorias: cada fila recibe
+    una prioridad uniforme y el estrato conserva las `por_estrato` de menor
+    prioridad (muestra aleatoria simple dentro del estrato, vectorizada por chunk)
+  - peso_muestra = filas del estrato / filas muestreadas del estrato: expande
+    la muestra al total
+  - Semilla fija: misma entrada → misma muestra
+Las filas sucias (teléfono o fecha inválidos) forman sus propios estratos, así
+las validaciones del ETL también se ejercitan sobre la muestra.
+================================================================================
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FILAS_CHUNK = 250_000
+ARCHIVO_MUESTRA = 'muestra.json'   # metadatos que marcan un directorio de salida como muestreado
+
+
+def leer_muestra(ruta):
+    """Metadatos de la muestra si `ruta` (archivo o directorio de salida del ETL) viene de una corrida muestreada"""
+    path = Path(ruta).parent / ARCHIVO_MUESTRA
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class MuestreoEstratificado:
+    """Muestra estratificada por provincia × tipo × mes en una pasada sobre los CSV"""
+
+    def __init__(self, area_code_to_prov, por_estrato=200, semilla=42, filas_chunk=FILAS_CHUNK):
+        self.area_code_to_prov = {str(codigo): provincia for codigo, provincia in area_code_to_prov.items()}
+        self.por_estrato = por_estrato
+        self.semilla = semilla
+        self.filas_chunk = filas_chunk
+
+    # ========================================================================
+    # ESTRATOS
+    # ========================================================================
+
+    def _provincia(self, prefijo):
+        """Provincia del código de área más largo que coincide (4, 3 y 2 dígitos, como en el ETL)"""
+        if not prefijo:
+            return 'TELEFONO_INVALIDO'
+        for largo in (4, 3, 2):
+            provincia = self.area_code_to_prov.get(prefijo[:largo])
+            if provincia is not None:
+                return str(provincia).upper()
+        return 'DESCONOCIDA'
+
+    def estratos(self, df):
+        """Clave 'PROVINCIA|TIPO|AAAA-MM' por fila. La provincia se resuelve una vez por prefijo distinto"""
+        telefono = df['phone'].fillna('').astype(str).str.strip()
+        prefijo = telefono.str[3:].str.removeprefix('9').str.lstrip('0').str[:4]
+        prefijo = prefijo.where(telefono.str.startswith('+54'), '')
+        provincias = {p: self._provincia(p) for p in prefijo.unique()}
+
+        tipo = df['tipo'].fillna('').astype(str).str.strip().str.upper()
+        mes = df['fecha'].fillna('').astype(str).str.strip().str[:7]
+        mes = mes.where(mes.str.fullmatch(r'\d{4}-\d{2}'), 'FECHA_INVALIDA')
+        return prefijo.map(provincias) + '|' + tipo + '|' + mes
+
+    # ========================================================================
+    # MUESTREO
+    # ========================================================================
+
+    def muestrear(self, archivos):
+        """
+        Recorre `archivos` una sola vez y devuelve (muestra, resumen). La muestra conserva
+        el orden de lectura y agrega 'archivo_origen', 'estrato_muestra' y 'peso_muestra'.
+        """
+        inicio = time.perf_counter()
+        archivos = [str(a) for a in archivos]
+        rng = np.random.default_rng(self.semilla)
+        reservas = None
+        conteos = pd.Series(dtype='int64')
+        leidas = 0
+
+        for archivo in archivos:
+            for chunk in pd.read_csv(archivo, dtype=str, chunksize=self.filas_chunk):
+                chunk.columns = chunk.columns.str.lower().str.strip()
+                chunk.index = pd.RangeIndex(leidas, leidas + len(chunk))
+                leidas += len(chunk)
+                chunk['archivo_origen'] = archivo
+                chunk['estrato_muestra'] = self.estratos(chunk)
+                chunk['_prioridad'] = rng.random(len(chunk))
+                conteos = conteos.add(chunk['estrato_muestra'].value_counts(), fill_value=0)
+
+                # Reservas + chunk → las `por_estrato` filas de menor prioridad de cada estrato
+                candidatas = pd.concat([reservas, chunk]) if reservas is not None else chunk
+                reservas = (candidatas.sort_values('_prioridad', kind='stable')
+                            .groupby('estrato_muestra', sort=False).head(self.por_estrato))
+
+        if reservas is None:
+            raise ValueError("No hay transacciones para muestrear")
+
+        muestra = reservas.sort_index().drop(columns='_prioridad')
+        muestreadas = muestra['estrato_muestra'].map(muestra['estrato_muestra'].value_counts())
+        muestra['peso_muestra'] = muestra['estrato_muestra'].map(conteos).astype('float64') / muestreadas
+        muestra['archivo_origen'] = pd.Categorical(muestra['archivo_origen'], categories=archivos)
+        muestra = muestra.reset_index(drop=True)
+
+        resumen = {
+            'filas_leidas': leidas,
+            'filas_muestra': len(muestra),
+            'estratos': int(len(conteos)),
+            'provincias': int(muestra['estrato_muestra'].str.split('|').str[0].nunique()),
+            'por_estrato': self.por_estrato,
+            'semilla': self.semilla,
+            'segundos': round(time.perf_counter() - inicio, 3),
+        }
+        logger.info(f"🎯 Muestra estratificada: {resumen['filas_muestra']:,} de {leidas:,} filas "
+                    f"({resumen['estratos']} estratos, {resumen['provincias']} provincias) "
+                    f"en {resumen['segundos']:.2f} s")
+        return muestra, resumen
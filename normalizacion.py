@@ -0,0 +1,230 @@
+#!/bin/python
+
+"""
+================================================================================
+NORMALIZACIÓN DE NOMBRES - PROVINCIAS, CIUDADES Y AGLOMERADOS
+================================================================================
+Reconciliación de nombres geográficos entre regiones_argentina.json, los datos
+de pobreza (aglomerados EPH) y las transacciones:
+  - Plegado Unicode: sin acentos ni signos, mayúsculas y espacios simples
+    ('Córdoba' / 'CORDOBA ' → 'CORDOBA'; 'Ñ' → 'N')
+  - Tablas de alias: nombres alternativos de provincias y localidades que
+    forman parte de un aglomerado ('MAIPU' → 'GRAN MENDOZA')
+  - Coincidencia aproximada (difflib) contra los nombres canónicos, para
+    errores de tipeo ('RESISTENSIA' → 'GRAN RESISTENCIA')
+Todo se resuelve sobre los valores distintos de una columna y se mapea de
+vuelta por código (pd.factorize): el costo depende de la cantidad de nombres
+distintos, no de la cantidad de filas.
+================================================================================
+"""
+
+import difflib
+import logging
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_DIFUSO = 0.85
+
+# Nombre plegado → provincia canónica (la unidad de los datos de pobreza).
+# CABA comparte índices con Buenos Aires en datos_pobreza.json.
+ALIAS_PROVINCIAS = {
+    'CIUDAD DE BUENOS AIRES': 'BUENOS AIRES',
+    'CIUDAD AUTONOMA DE BUENOS AIRES': 'BUENOS AIRES',
+    'CAPITAL FEDERAL': 'BUENOS AIRES',
+    'CABA': 'BUENOS AIRES',
+    'PROVINCIA DE BUENOS AIRES': 'BUENOS AIRES',
+    'SGO DEL ESTERO': 'SANTIAGO DEL ESTERO',
+    'STGO DEL ESTERO': 'SANTIAGO DEL ESTERO',
+    'TIERRA DEL FUEGO ANTARTIDA E ISLAS DEL ATLANTICO SUR': 'TIERRA DEL FUEGO',
+}
+
+# (provincia canónica, localidad plegada) → ciudad del aglomerado EPH en datos_pobreza.json
+ALIAS_CIUDADES = {
+    ('BUENOS AIRES', 'AMBA'): 'BUENOS AIRES',
+    ('BUENOS AIRES', 'CAPITAL FEDERAL'): 'BUENOS AIRES',
+    ('BUENOS AIRES', 'ENSENADA'): 'GRAN LA PLATA',
+    ('BUENOS AIRES', 'BERISSO'): 'GRAN LA PLATA',
+    ('BUENOS AIRES', 'BATAN'): 'MAR DEL PLATA',
+    # Conurbano: localidades de los partidos del GBA (aglomerado EPH 'PARTIDOS GBA')
+    ('BUENOS AIRES', 'MERLO'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'LIBERTAD'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'PONTEVEDRA'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'MORENO'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'FRANCISCO ALVAREZ'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'JOSE C PAZ'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'PILAR'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'DEL VISO'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'TORTUGUITAS'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'ESCOBAR'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'LOMA VERDE'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'GONZALEZ CATAN'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'VIRREY DEL PINO'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'GLEW'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'EL PATO'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'GUERNICA'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'ALEJANDRO KORN'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'SAN VICENTE'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'MARCOS PAZ'): 'PARTIDOS GBA',
+    ('BUENOS AIRES', 'GENERAL RODRIGUEZ'): 'PARTIDOS GBA',
+    ('MENDOZA', 'GODOY CRUZ'): 'GRAN MENDOZA',
+    ('MENDOZA', 'GUAYMALLEN'): 'GRAN MENDOZA',
+    ('MENDOZA', 'LAS HERAS'): 'GRAN MENDOZA',
+    ('MENDOZA', 'LUJAN DE CUYO'): 'GRAN MENDOZA',
+    ('MENDOZA', 'MAIPU'): 'GRAN MENDOZA',
+    ('MENDOZA', 'CHACRAS DE CORIA'): 'GRAN MENDOZA',
+    ('SAN JUAN', 'CHIMBAS'): 'GRAN SAN JUAN',
+    ('SAN JUAN', 'RAWSON'): 'GRAN SAN JUAN',
+    ('SAN JUAN', 'RIVADAVIA'): 'GRAN SAN JUAN',
+    ('SAN JUAN', 'SANTA LUCIA'): 'GRAN SAN JUAN',
+    ('SAN LUIS', 'JUANA KOSLAY'): 'GRAN SAN LUIS',
+    ('CHACO', 'BARRANQUERAS'): 'GRAN RESISTENCIA',
+    ('CHACO', 'FONTANA'): 'GRAN RESISTENCIA',
+    ('CHACO', 'PUERTO VILELAS'): 'GRAN RESISTENCIA',
+    ('CATAMARCA', 'SAN FERNANDO DEL VALLE DE CATAMARCA'): 'GRAN CATAMARCA',
+    ('TUCUMAN', 'SAN MIGUEL DE TUCUMAN'): 'GRAN TUCUMAN',
+    ('TUCUMAN', 'TAFI VIEJO'): 'GRAN TUCUMAN',
+    ('TUCUMAN', 'YERBA BUENA'): 'GRAN TUCUMAN',
+    ('TUCUMAN', 'BANDA DEL RIO SALI'): 'GRAN TUCUMAN',
+    ('JUJUY', 'SAN SALVADOR DE JUJUY'): 'JUJUY-PALPALA',
+    ('SANTIAGO DEL ESTERO', 'LA BANDA'): 'SANTIAGO DEL ESTERO',
+    ('CORDOBA', 'CORDOBA CAPITAL'): 'GRAN CORDOBA',
+    ('SANTA FE', 'VILLA GOBERNADOR GALVEZ'): 'GRAN ROSARIO',
+    ('SANTA FE', 'GRANADERO BAIGORRIA'): 'GRAN ROSARIO',
+    ('SANTA FE', 'FUNES'): 'GRAN ROSARIO',
+    ('SANTA FE', 'SANTO TOME'): 'GRAN SANTA FE',
+    ('CHUBUT', 'TRELEW'): 'RAWSON',
+    ('CHUBUT', 'PLAYA UNION'): 'RAWSON',
+    ('CHUBUT', 'RADA TILLY'): 'COMODORO RIVADAVIA',
+    ('NEUQUEN', 'PLOTTIER'): 'NEUQUEN',
+    ('NEUQUEN', 'CENTENARIO'): 'NEUQUEN',
+    ('TIERRA DEL FUEGO', 'RIO GRANDE'): 'USHUAIA',
+    ('LA PAMPA', 'TOAY'): 'SANTA ROSA',
+}
+
+_NO_ALFANUMERICO = re.compile(r'[^A-Z0-9]+')
+
+
+def plegar(texto):
+    """Forma comparable de un nombre: sin acentos ni signos, en mayúsculas, espacios simples"""
+    if texto is None or (not isinstance(texto, str) and pd.isna(texto)):
+        return None
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).upper()
+    return _NO_ALFANUMERICO.sub(' ', texto).strip() or None
+
+
+def por_valores_distintos(valores, funcion):
+    """
+    Aplica `funcion` una vez por valor distinto de `valores` (Series, o DataFrame para
+    claves compuestas: una llamada por combinación) y devuelve el resultado por fila,
+    mapeado por código.
+    """
+    if isinstance(valores, pd.DataFrame):
+        # Código compuesto a partir de los códigos de cada columna (más rápido que un MultiIndex)
+        compuesto = np.zeros(len(valores), dtype=np.int64)
+        for columna in valores.columns:
+            codigos_columna, distintos_columna = pd.factorize(valores[columna], use_na_sentinel=False)
+            compuesto = compuesto * len(distintos_columna) + codigos_columna
+        codigos, _ = pd.factorize(compuesto)
+        primera = np.empty(codigos.max() + 1 if len(codigos) else 0, dtype=np.int64)
+        primera[codigos[::-1]] = np.arange(len(codigos))[::-1]
+        resultados = [funcion(*valor) for valor in valores.iloc[primera].itertuples(index=False)]
+    else:
+        codigos, distintos = pd.factorize(valores)
+        resultados = [funcion(valor) for valor in distintos]
+    # Los nulos tienen código -1: toman el último elemento (None)
+    resultados = np.array(resultados + [None], dtype=object)
+    return pd.Series(resultados[codigos], index=valores.index)
+
+
+class NormalizadorProvincias:
+    """Provincia canónica (plegada, con alias y aproximada contra `canonicas`) con caché por nombre"""
+
+    def __init__(self, canonicas=(), alias=None, umbral=UMBRAL_DIFUSO):
+        self.alias = dict(ALIAS_PROVINCIAS if alias is None else alias)
+        self.canonicas = sorted({plegar(c) for c in canonicas if plegar(c)} | set(self.alias.values()))
+        self.umbral = umbral
+        self.resueltos = {}      # nombre original → (canónico, método)
+
+    def normalizar(self, nombre):
+        if nombre not in self.resueltos:
+            self.resueltos[nombre] = self._resolver(nombre)
+        return self.resueltos[nombre][0]
+
+    def _resolver(self, nombre):
+        plegado = plegar(nombre)
+        if plegado is None:
+            return None, 'nulo'
+        if plegado in self.alias:
+            return self.alias[plegado], 'alias'
+        if not self.canonicas or plegado in self.canonicas:
+            return plegado, 'exacto'
+        parecidos = difflib.get_close_matches(plegado, self.canonicas, n=1, cutoff=self.umbral)
+        if parecidos:
+            return parecidos[0], 'difuso'
+        return plegado, 'sin_match'
+
+    def normalizar_serie(self, serie):
+        """Provincia canónica por fila (una resolución por nombre distinto)"""
+        return por_valores_distintos(serie, self.normalizar)
+
+
+class EmparejadorCiudades:
+    """
+    Ciudad del aglomerado EPH (datos de pobreza) que corresponde a una localidad.
+    Por provincia: alias, coincidencia exacta contra las variantes de cada aglomerado
+    ('GRAN ROSARIO' → 'ROSARIO', 'JUJUY-PALPALA' → 'JUJUY', 'PALPALA') y aproximada.
+    """
+
+    def __init__(self, aglomerados, alias=None, umbral=UMBRAL_DIFUSO):
+        """`aglomerados`: pares (provincia canónica, ciudad del aglomerado)"""
+        self.alias = dict(ALIAS_CIUDADES if alias is None else alias)
+        self.umbral = umbral
+        self.variantes = {}      # provincia → {variante plegada: ciudad del aglomerado}
+        for provincia, ciudad in aglomerados:
+            if plegar(ciudad) is None:
+                continue
+            variantes = self.variantes.setdefault(plegar(provincia), {})
+            for variante in self._variantes(ciudad):
+                variantes.setdefault(variante, ciudad)
+        self.resueltos = {}      # (provincia, localidad) → (ciudad del aglomerado, método)
+
+    @staticmethod
+    def _variantes(ciudad):
+        plegada = plegar(ciudad)
+        variantes = [plegada, plegada.removeprefix('GRAN ')]
+        variantes += [plegar(parte) for parte in re.split(r'[-/]', ciudad) if plegar(parte)]
+        return variantes
+
+    def emparejar(self, provincia, localidad):
+        clave = (provincia, localidad)
+        if clave not in self.resueltos:
+            self.resueltos[clave] = self._resolver(plegar(provincia), plegar(localidad))
+        return self.resueltos[clave][0]
+
+    def _resolver(self, provincia, localidad):
+        variantes = self.variantes.get(provincia)
+        if localidad is None or not variantes:
+            return None, 'sin_match'
+        if self.alias.get((provincia, localidad)) in variantes.values():
+            return self.alias[(provincia, localidad)], 'alias'
+        if localidad in variantes:
+            return variantes[localidad], 'exacto'
+        parecidos = difflib.get_close_matches(localidad, list(variantes), n=1, cutoff=self.umbral)
+        if parecidos:
+            return variantes[parecidos[0]], 'difuso'
+        return None, 'sin_match'
+
+    def emparejar_columnas(self, provincias, localidades):
+        """Ciudad del aglomerado por fila (una resolución por par provincia × localidad distinto)"""
+        return por_valores_distintos(pd.DataFrame({'provincia': provincias, 'localidad': localidades}),
+                                     self.emparejar)
+
+    def resumen(self):
+        """Cantidad de localidades por método de resolución"""
+        return pd.Series([metodo for _, metodo in self.resueltos.values()]).value_counts().to_dict()
@@ -0,0 +1,155 @@
+#!/bin/python
+
+"""
+================================================================================
+ROLLUP DIARIO Y SERIES TEMPORALES - CASINO POR REGIÓN
+================================================================================
+Tabla compacta día × hora × provincia × tipo con medidas aditivas
+(transacciones, total_ars, exitosas). El ETL la mantiene de forma incremental
+(ETLCasino.load_rollup) y los reportes temporales se sirven desde ella sin
+volver a recorrer las transacciones:
+  - Resampleo diario / semanal / mensual
+  - Ventanas móviles
+  - Crecimiento período contra período
+================================================================================
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CLAVES_ROLLUP = ['fecha_dia', 'hora', 'provincia', 'tipo']
+MEDIDAS_ROLLUP = ['transacciones', 'total_ars', 'exitosas']
+MODOS_ACTUALIZACION = ('reemplazar', 'sumar')
+
+# Frecuencias de resampleo → argumentos de DataFrame.resample (períodos etiquetados por su inicio)
+FRECUENCIAS = {
+    'D': {'rule': 'D'},
+    'W': {'rule': 'W-MON', 'label': 'left', 'closed': 'left'},  # semanas de lunes a domingo
+    'M': {'rule': 'MS'},
+}
+
+
+# ================================================================================
+# CONSTRUCCIÓN Y ACTUALIZACIÓN DEL ROLLUP
+# ================================================================================
+
+def construir_rollup(df):
+    """
+    Agrega transacciones procesadas (con 'hora' y 'es_exitoso' del ETL)
+    a nivel día × hora × provincia × tipo.
+    """
+    base = df.assign(fecha_dia=df['fecha'].dt.normalize())
+    rollup = base.groupby(CLAVES_ROLLUP, dropna=False, observed=True).agg(
+        transacciones=('monto', 'count'),
+        total_ars=('monto', 'sum'),
+        exitosas=('es_exitoso', 'sum'),
+    ).reset_index()
+    return rollup
+
+
+def combinar_rollup(existente, nuevo, modo='reemplazar'):
+    """
+    Integra un rollup nuevo sobre uno existente:
+    - 'reemplazar': los días presentes en `nuevo` reemplazan a los existentes
+      (idempotente si se re-procesa el mismo archivo)
+    - 'sumar': suma las medidas (para lotes sin solapamiento, p. ej. ya deduplicados)
+    """
+    if modo not in MODOS_ACTUALIZACION:
+        raise ValueError(f"Modo no soportado: {modo} (opciones: {', '.join(MODOS_ACTUALIZACION)})")
+    if existente is None or existente.empty:
+        return nuevo
+
+    if modo == 'reemplazar':
+        conservado = existente[~existente['fecha_dia'].isin(nuevo['fecha_dia'].unique())]
+        combinado = pd.concat([conservado, nuevo], ignore_index=True)
+    else:
+        combinado = pd.concat([existente, nuevo], ignore_index=True)
+        combinado = combinado.groupby(CLAVES_ROLLUP, dropna=False, observed=True)[MEDIDAS_ROLLUP].sum().reset_index()
+
+    return combinado.sort_values(CLAVES_ROLLUP, ignore_index=True)
+
+
+def actualizar_rollup(path, df, modo='reemplazar'):
+    """Construye el rollup de `df`, lo integra con el guardado en `path` y lo reescribe"""
+    nuevo = construir_rollup(df)
+    existente = pd.read_parquet(path) if Path(path).exists() else None
+    rollup = combinar_rollup(existente, nuevo, modo)
+    rollup.to_parquet(path, index=False)
+    return rollup
+
+
+# ================================================================================
+# API DE SERIES TEMPORALES
+# ================================================================================
+
+class SerieTemporal:
+    """Consultas temporales sobre el rollup diario"""
+
+    def __init__(self, rollup):
+        self.rollup = rollup
+
+    @classmethod
+    def desde_parquet(cls, path='./datos_salida/casino_rollup_diario.parquet'):
+        logger.info(f"Cargando rollup diario desde {path}")
+        return cls(pd.read_parquet(path))
+
+    def filtrar(self, provincia=None, tipo='DEPOSIT', desde=None, hasta=None):
+        """Filas del rollup para una provincia (o todas), un tipo y un rango de fechas"""
+        r = self.rollup
+        mascara = pd.Series(True, index=r.index)
+        if tipo is not None:
+            mascara &= r['tipo'] == tipo
+        if provincia is not None:
+            mascara &= r['provincia'] == provincia
+        if desde is not None:
+            mascara &= r['fecha_dia'] >= pd.Timestamp(desde)
+        if hasta is not None:
+            mascara &= r['fecha_dia'] <= pd.Timestamp(hasta)
+        return r[mascara]
+
+    def serie(self, frecuencia='D', **filtros):
+        """
+        Serie resampleada ('D', 'W' o 'M') con Transacciones, Total_ARS, Exitosas,
+        Promedio y % Exitoso. Los períodos sin actividad quedan en cero.
+        """
+        if frecuencia not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia no soportada: {frecuencia} (opciones: {', '.join(FRECUENCIAS)})")
+
+        diario = self.filtrar(**filtros).groupby('fecha_dia')[MEDIDAS_ROLLUP].sum()
+        serie = diario.resample(**FRECUENCIAS[frecuencia]).sum()
+        serie.index.name = 'periodo'
+        serie.columns = ['Transacciones', 'Total_ARS', 'Exitosas']
+        serie['Promedio'] = (serie['Total_ARS'] / serie['Transacciones']).round(2)
+        serie['% Exitoso'] = (serie['Exitosas'] / serie['Transacciones'] * 100).round(1)
+        return serie
+
+    def media_movil(self, ventana=7, frecuencia='D', columna='Total_ARS', **filtros):
+        """Media móvil de `columna` sobre `ventana` períodos"""
+        serie = self.serie(frecuencia, **filtros)[[columna]]
+        serie[f'Media_Movil_{ventana}'] = serie[columna].rolling(ventana, min_periods=1).mean().round(2)
+        return serie
+
+    def crecimiento(self, frecuencia='M', periodos=1, columna='Total_ARS', **filtros):
+        """Crecimiento % de `columna` contra `periodos` períodos atrás"""
+        serie = self.serie(frecuencia, **filtros)[[columna]]
+        serie['Variacion'] = serie[columna].diff(periodos)
+        serie['% Crecimiento'] = (serie[columna].pct_change(periodos, fill_method=None) * 100).round(1)
+        return serie
+
+    def agregar(self, clave, **filtros):
+        """
+        Totales por clave temporal: 'anio_mes', 'hora', 'dia_semana' o 'fecha_dia'.
+        Devuelve transacciones, total_ars y exitosas indexados por la clave.
+        """
+        r = self.filtrar(**filtros)
+        if clave == 'anio_mes':
+            grupos = r['fecha_dia'].dt.to_period('M').rename('anio_mes')
+        elif clave == 'dia_semana':
+            grupos = r['fecha_dia'].dt.day_name().rename('dia_semana')
+        else:
+            grupos = r[clave]
+        return r.groupby(grupos)[MEDIDAS_ROLLUP].sum()
@@ -0,0 +1,486 @@
+#!/bin/python
+
+"""
+================================================================================
+SERVICIO LOCAL DE CONSULTAS ANALÍTICAS (HTTP/JSON) - CASINO POR REGIÓN
+================================================================================
+Proceso de larga duración que carga el dataset procesado una sola vez y
+responde los reportes de AnalyticsCasino como endpoints JSON:
+  - Datos en memoria (o consultas DuckDB) siempre calientes
+  - Requests concurrentes (un thread por conexión)
+  - Recarga automática cuando el ETL publica una salida nueva
+  - Caché de resultados por versión de datos y métricas de latencia
+
+Endpoints:
+  GET  /salud                      Estado, versión de datos y registros
+  GET  /reportes                   Reportes disponibles y sus parámetros
+  GET  /reportes/<metodo>?p=v      Resultado de un reporte (p. ej. /reportes/analisis_por_dia?ultimos_dias=7)
+  GET  /series?frecuencia=M&...    Serie temporal (SerieTemporal.serie)
+  GET  /metricas                   Latencia por endpoint (p50/p95/máx)
+  POST /recargar                   Fuerza la recarga de los datos
+================================================================================
+"""
+
+import glob
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Métodos que no se exponen como reporte (imprimen directo o no devuelven tablas)
+REPORTES_EXCLUIDOS = {'generar_reporte_ejecutivo'}
+
+MAX_BOOTSTRAP = 20000
+
+# Parámetros que acepta cada reporte por HTTP → valores permitidos. El resto de los
+# argumentos del método (rutas de archivos como json_pobreza_path) no se exponen.
+PARAMETROS_REPORTES = {
+    'analisis_por_dia': {'ultimos_dias': range(1, 3661)},
+    'analisis_pobreza': {'nivel': ('provincia', 'aglomerado', 'ciudad'),
+                         'n_bootstrap': range(100, MAX_BOOTSTRAP + 1)},
+    'top_usuarios_por_provincia': {'top_n': range(1, 101)},
+}
+
+# Rutas fijas; las demás se registran en las métricas bajo una etiqueta común
+RUTAS = ('/salud', '/reportes', '/series', '/metricas', '/recargar')
+
+FILTROS_SERIE = ('provincia', 'tipo', 'desde', 'hasta')
+
+MAX_CACHE = 256
+MAX_MUESTRAS = 1000
+
+
+class ErrorConsulta(ValueError):
+    """Error de parámetros o reporte inexistente (respuesta 400/404)"""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# ================================================================================
+# SERIALIZACIÓN Y PARÁMETROS
+# ================================================================================
+
+def _valor_json(valor):
+    """Convierte escalares de numpy/pandas a tipos nativos para json.dumps"""
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return None
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor if isinstance(valor, (str, int, float, bool, type(None))) else str(valor)
+
+
+def resultado_a_json(resultado):
+    """Serializa el resultado de un reporte (DataFrame o dict) a texto JSON"""
+    from exportar_reportes import _preparar_tabla
+
+    if isinstance(resultado, dict):
+        return json.dumps({str(k): _valor_json(v) for k, v in resultado.items()}, ensure_ascii=False)
+    return _preparar_tabla(resultado).to_json(orient='records', force_ascii=False, date_format='iso')
+
+
+def _convertir(texto, default):
+    """Convierte un parámetro de query string al tipo de su valor por defecto"""
+    if isinstance(default, bool):
+        if texto.lower() not in ('1', '0', 'true', 'false', 'si', 'no'):
+            raise ValueError(f"booleano inválido: {texto}")
+        return texto.lower() in ('1', 'true', 'si')
+    if isinstance(default, int):
+        return int(texto)
+    if isinstance(default, float):
+        return float(texto)
+    return texto
+
+
+def parametros_de(funcion, extra=()):
+    """Parámetros configurables de `funcion` → valor por defecto (sin 'mostrar' ni **kwargs)"""
+    parametros = {
+        nombre: p.default for nombre, p in inspect.signature(funcion).parameters.items()
+        if nombre != 'mostrar' and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+    }
+    parametros.update({nombre: None for nombre in extra})
+    return parametros
+
+
+def _describir(permitidos):
+    if isinstance(permitidos, range):
+        return f"{permitidos.start}..{permitidos.stop - 1}"
+    return ', '.join(map(str, permitidos))
+
+
+def convertir_parametros(funcion, query, extra=(), permitidos=None):
+    """
+    Valida y convierte los parámetros de la query string para llamar a `funcion`.
+    `permitidos` (nombre → valores válidos) restringe los parámetros aceptados y sus valores.
+    """
+    aceptados = parametros_de(funcion, extra)
+    if permitidos is not None:
+        aceptados = {nombre: default for nombre, default in aceptados.items() if nombre in permitidos}
+    convertidos = {}
+    for nombre, texto in query.items():
+        if nombre not in aceptados:
+            raise ErrorConsulta(f"Parámetro desconocido: {nombre} (acepta: {', '.join(aceptados) or 'ninguno'})")
+        try:
+            convertidos[nombre] = _convertir(texto, aceptados[nombre])
+        except ValueError as e:
+            raise ErrorConsulta(f"Parámetro {nombre}: {e}")
+        if permitidos is not None and convertidos[nombre] not in permitidos[nombre]:
+            raise ErrorConsulta(f"Parámetro {nombre}: {texto} fuera de rango (permitido: {_describir(permitidos[nombre])})")
+    return convertidos
+
+
+# ================================================================================
+# MÉTRICAS DE LATENCIA
+# ================================================================================
+
+class MetricasLatencia:
+    """Latencias por endpoint (últimas MAX_MUESTRAS) y contadores, seguras entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._muestras = defaultdict(lambda: deque(maxlen=MAX_MUESTRAS))
+        self._requests = defaultdict(int)
+        self._errores = defaultdict(int)
+        self._aciertos_cache = defaultdict(int)
+
+    def registrar(self, endpoint, ms, error=False, cacheado=False):
+        with self._lock:
+            self._muestras[endpoint].append(ms)
+            self._requests[endpoint] += 1
+            self._errores[endpoint] += int(error)
+            self._aciertos_cache[endpoint] += int(cacheado)
+
+    def resumen(self):
+        with self._lock:
+            copia = {endpoint: np.array(muestras) for endpoint, muestras in self._muestras.items()}
+            contadores = {endpoint: (self._requests[endpoint], self._errores[endpoint], self._aciertos_cache[endpoint])
+                          for endpoint in copia}
+
+        resumen = {}
+        for endpoint, ms in sorted(copia.items()):
+            requests, errores, aciertos = contadores[endpoint]
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            resumen[endpoint] = {
+                'requests': requests, 'errores': errores, 'aciertos_cache': aciertos,
+                'ms_promedio': round(float(ms.mean()), 3), 'ms_p50': round(float(p50), 3),
+                'ms_p95': round(float(p95), 3), 'ms_p99': round(float(p99), 3),
+                'ms_max': round(float(ms.max()), 3),
+            }
+        return resumen
+
+
+# ================================================================================
+# SERVICIO
+# ================================================================================
+
+class ServicioAnalytics:
+    """
+    Mantiene una instancia de AnalyticsCasino cargada y la reemplaza cuando
+    cambian los archivos de salida del ETL. Las consultas en curso terminan
+    sobre la instancia anterior; las nuevas usan la recargada.
+    """
+
+    def __init__(self, ruta='./datos_salida/casino_procesado.parquet', backend='pandas', rollup_path=None,
+                 intervalo_recarga=2.0, json_pobreza_path=None, **opciones):
+        """
+        - ruta / backend / opciones: como crear_analytics (Parquet recomendado: recarga más rápida)
+        - rollup_path: rollup diario del ETL para los reportes temporales (backend pandas)
+        - intervalo_recarga: segundos entre chequeos de cambios (0 = sin recarga automática)
+        - json_pobreza_path: datos_pobreza.json para analisis_pobreza a nivel aglomerado/ciudad
+          (la ruta la fija el servicio; no se acepta por query string)
+        """
+        self.ruta = ruta
+        self.json_pobreza_path = json_pobreza_path
+        self.backend = backend
+        self.rollup_path = rollup_path
+        self.intervalo_recarga = intervalo_recarga
+        self.opciones = dict(opciones)
+        if rollup_path and backend == 'pandas':
+            self.opciones['rollup_path'] = rollup_path
+
+        self.metricas = MetricasLatencia()
+        self.analytics = None
+        self.version = 0
+        self.cargado = None
+        self._firma = None
+        self._lock_carga = threading.Lock()
+        self._lock_cache = threading.Lock()
+        self._cache = OrderedDict()
+        self._detener = threading.Event()
+        self._vigilante = None
+
+        self.recargar()
+
+    # ========================================================================
+    # CARGA Y RECARGA
+    # ========================================================================
+
+    def _archivos(self):
+        """Archivos vigilados: el dataset (o glob) y el rollup"""
+        rutas = self.ruta if isinstance(self.ruta, (list, tuple)) else [self.ruta]
+        if self.rollup_path:
+            rutas = list(rutas) + [self.rollup_path]
+        archivos = []
+        for ruta in rutas:
+            if Path(ruta).is_dir():  # backend estrella: tablas Parquet del directorio
+                ruta = Path(ruta) / '*.parquet'
+            archivos.extend(sorted(glob.glob(str(ruta))) or [str(ruta)])
+        return archivos
+
+    def firma(self):
+        """(archivo, mtime, tamaño) de cada archivo vigilado; cambia cuando el ETL publica"""
+        firma = []
+        for archivo in self._archivos():
+            try:
+                stat = Path(archivo).stat()
+                firma.append((archivo, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                firma.append((archivo, None, None))
+        return tuple(firma)
+
+    def recargar(self):
+        """Carga los datos en una instancia nueva y la publica de forma atómica"""
+        from analytics_casino import crear_analytics
+
+        with self._lock_carga:
+            inicio = time.perf_counter()
+            firma = self.firma()
+            analytics = crear_analytics(self.ruta, backend=self.backend, **self.opciones)
+
+            self.analytics = analytics
+            self.version += 1
+            self.cargado = datetime.now()
+            self._firma = firma
+            with self._lock_cache:
+                self._cache.clear()
+
+            tiempo = time.perf_counter() - inicio
+            logger.info(f"✓ Datos cargados (versión {self.version}) en {tiempo:.2f} segundos")
+            return self.version
+
+    def _vigilar(self):
+        """
+        Recarga cuando la firma de los archivos cambia y se mantiene estable
+        durante un intervalo (evita leer un archivo que el ETL todavía está escribiendo).
+        """
+        pendiente = None
+        while not self._detener.wait(self.intervalo_recarga):
+            firma = self.firma()
+            if firma == self._firma:
+                pendiente = None
+            elif firma != pendiente:
+                pendiente = firma
+            else:
+                logger.info("🔄 Nueva salida del ETL detectada, recargando datos...")
+                try:
+                    self.recargar()
+                except Exception as e:
+                    logger.error(f"✗ Error al recargar, se siguen sirviendo los datos anteriores: {e}")
+                    self._firma = firma
+                pendiente = None
+
+    def iniciar_vigilancia(self):
+        if self.intervalo_recarga and self._vigilante is None:
+            self._vigilante = threading.Thread(target=self._vigilar, name='vigilante-etl', daemon=True)
+            self._vigilante.start()
+
+    def detener(self):
+        self._detener.set()
+
+    # ========================================================================
+    # CONSULTAS
+    # ========================================================================
+
+    def reportes(self):
+        """Reportes disponibles → parámetros aceptados con sus valores por defecto"""
+        disponibles = {}
+        for metodo in self.analytics.TITULOS:
+            if not self.es_reporte(metodo):
+                continue
+            permitidos = PARAMETROS_REPORTES.get(metodo, {})
+            disponibles[metodo] = {nombre: _valor_json(default) for nombre, default
+                                   in parametros_de(getattr(self.analytics, metodo)).items()
+                                   if nombre in permitidos}
+        return disponibles
+
+    def es_reporte(self, metodo):
+        return metodo in self.analytics.TITULOS and metodo not in REPORTES_EXCLUIDOS
+
+    def _cacheado(self, clave, calcular):
+        """Devuelve (json, cacheado) reutilizando resultados de la misma versión de datos"""
+        with self._lock_cache:
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                return self._cache[clave], True
+
+        texto = calcular()
+        with self._lock_cache:
+            if clave[0] == self.version:
+                self._cache[clave] = texto
+                while len(self._cache) > MAX_CACHE:
+                    self._cache.popitem(last=False)
+        return texto, False
+
+    def consultar_reporte(self, metodo, query):
+        """Ejecuta un reporte con parámetros de query string; devuelve (json, cacheado)"""
+        analytics, version = self.analytics, self.version
+        if metodo not in analytics.TITULOS or metodo in REPORTES_EXCLUIDOS:
+            raise ErrorConsulta(f"Reporte desconocido: {metodo}", estado=404)
+
+        funcion = getattr(analytics, metodo)
+        parametros = convertir_parametros(funcion, query, permitidos=PARAMETROS_REPORTES.get(metodo, {}))
+        clave = (version, metodo, tuple(sorted(parametros.items())))
+
+        fijos = {'json_pobreza_path': self.json_pobreza_path} if metodo == 'analisis_pobreza' else {}
+
+        def calcular():
+            try:
+                return resultado_a_json(funcion(mostrar=False, **parametros, **fijos))
+            except ValueError as e:
+                raise ErrorConsulta(str(e))
+
+        return self._cacheado(clave, calcular)
+
+    def consultar_serie(self, query):
+        """Serie temporal resampleada (ver SerieTemporal.serie); devuelve (json, cacheado)"""
+        from serie_temporal import SerieTemporal
+
+        analytics, version = self.analytics, self.version
+        parametros = convertir_parametros(SerieTemporal.serie, query, extra=FILTROS_SERIE)
+        clave = (version, 'series', tuple(sorted(parametros.items())))
+
+        def calcular():
+            try:
+                return resultado_a_json(analytics.serie_temporal().serie(**parametros))
+            except ValueError as e:
+                raise ErrorConsulta(str(e))
+
+        return self._cacheado(clave, calcular)
+
+    def salud(self):
+        return {
+            'estado': 'ok',
+            'backend': self.backend,
+            'ruta': str(self.ruta),
+            'version_datos': self.version,
+            'cargado': self.cargado.isoformat(timespec='seconds'),
+            'registros': self.analytics.cantidad_registros(),
+            'recarga_automatica': bool(self.intervalo_recarga),
+        }
+
+    # ========================================================================
+    # SERVIDOR HTTP
+    # ========================================================================
+
+    def crear_servidor(self, host='127.0.0.1', puerto=8765):
+        """Servidor HTTP con un thread por request, ligado a este servicio"""
+        manejador = type('ManejadorAnalytics', (_ManejadorHTTP,), {'servicio': self})
+        servidor = ThreadingHTTPServer((host, puerto), manejador)
+        servidor.daemon_threads = True
+        return servidor
+
+    def servir(self, host='127.0.0.1', puerto=8765):
+        """Atiende requests hasta Ctrl+C"""
+        servidor = self.crear_servidor(host, puerto)
+        self.iniciar_vigilancia()
+        logger.info(f"🌐 Servicio de analíticas en http://{host}:{servidor.server_address[1]} "
+                    f"(reportes en /reportes, métricas en /metricas)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Servicio detenido")
+        finally:
+            self.detener()
+            servidor.server_close()
+
+
+class _ManejadorHTTP(BaseHTTPRequestHandler):
+    """Traduce rutas HTTP a consultas del ServicioAnalytics"""
+
+    servicio = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        logger.debug(f"{self.address_string()} - {formato % args}")
+
+    def _responder(self, estado, cuerpo, inicio, endpoint, cacheado=False):
+        datos = cuerpo.encode('utf-8')
+        ms = (time.perf_counter() - inicio) * 1000
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        self.send_header('X-Tiempo-Respuesta-ms', f"{ms:.3f}")
+        self.send_header('X-Version-Datos', str(self.servicio.version))
+        self.send_header('X-Cache', 'HIT' if cacheado else 'MISS')
+        self.end_headers()
+        self.wfile.write(datos)
+        self.servicio.metricas.registrar(endpoint, ms, error=estado >= 400, cacheado=cacheado)
+
+    def _atender(self, metodo_http):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        partes = [p for p in url.path.split('/') if p]
+        ruta = endpoint = '/' + '/'.join(partes)
+        servicio = self.servicio
+        # Etiqueta de métricas acotada: una ruta inexistente no crea una serie nueva
+        if len(partes) == 2 and partes[0] == 'reportes':
+            if not servicio.es_reporte(partes[1]):
+                endpoint = '/reportes/(desconocido)'
+        elif endpoint not in RUTAS:
+            endpoint = '(desconocida)'
+
+        try:
+            cacheado = False
+            if metodo_http == 'POST' and partes == ['recargar']:
+                cuerpo = json.dumps({'version_datos': servicio.recargar()})
+            elif metodo_http != 'GET':
+                raise ErrorConsulta(f"Método no soportado: {metodo_http} {ruta}", estado=405)
+            elif partes == ['salud']:
+                cuerpo = json.dumps(servicio.salud(), ensure_ascii=False)
+            elif partes == ['reportes']:
+                cuerpo = json.dumps(servicio.reportes(), ensure_ascii=False)
+            elif len(partes) == 2 and partes[0] == 'reportes':
+                cuerpo, cacheado = servicio.consultar_reporte(partes[1], query)
+            elif partes == ['series']:
+                cuerpo, cacheado = servicio.consultar_serie(query)
+            elif partes == ['metricas']:
+                cuerpo = json.dumps(servicio.metricas.resumen())
+            else:
+                raise ErrorConsulta(f"Ruta desconocida: {ruta}", estado=404)
+            self._responder(200, cuerpo, inicio, endpoint, cacheado)
+        except ErrorConsulta as e:
+            self._responder(e.estado, json.dumps({'error': str(e)}, ensure_ascii=False), inicio, endpoint)
+        except Exception as e:
+            logger.error(f"✗ Error en {ruta}: {e}")
+            self._responder(500, json.dumps({'error': str(e)}, ensure_ascii=False), inicio, endpoint)
+
+    def do_GET(self):
+        self._atender('GET')
+
+    def do_POST(self):
+        self._atender('POST')
+
+
+# ================================================================================
+# EJECUCIÓN
+# ================================================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    servicio = ServicioAnalytics('./datos_salida/casino_procesado.parquet',
+                                 rollup_path='./datos_salida/casino_rollup_diario.parquet')
+    servicio.servir()